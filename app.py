@@ -6,7 +6,8 @@ from PySide6.QtCore import QSettings, Qt, QSize, Signal
 from PySide6.QtGui import QFont
 from ui.auth_window import AuthWindow, RegisterWindow
 from ui.main_app import MainApp
-from config.database import SupabaseClient
+from config.database import get_supabase_client, sign_out_in_background
+from config.session_cache import clear_session
 
 # Añadir el directorio actual al path para importar los módulos
 sys.path.append(str(Path(__file__).parent))
@@ -50,7 +51,7 @@ class AppManager(QMainWindow):
         # Obtener IllustratorWindow dinámicamente
         self.IllustratorWindow = get_illustrator_window()
         
-        self.main_app = MainApp(self.show_auth, self.show_entorno_java)
+        self.main_app = MainApp(self.handle_logout, self.show_entorno_java)
         self.auth = AuthWindow(self.stack, self.handle_login_success) 
         self.register = RegisterWindow(self.stack)
         
@@ -65,6 +66,9 @@ class AppManager(QMainWindow):
 
         self.load_window_state()
 
+        # Reentrar con la sesión del arranque anterior sin pedir contraseña
+        self.auth.restore_session()
+
     def set_auth_window_size(self):
         """Tamaño pequeño fijo para auth (800x600)"""
         self.setFixedSize(800, 600)
@@ -122,6 +126,12 @@ class AppManager(QMainWindow):
         """Método que se llama cuando el login es exitoso"""
         self.show_main_app()
 
+    def handle_logout(self):
+        """Cierra la sesión: olvida el token guardado y la cierra en el servidor (solo este equipo) en segundo plano"""
+        clear_session()
+        sign_out_in_background()
+        self.show_auth()
+
     def handle_entorno_closed(self):
         """Cuando se cierra el entorno Java"""
         self.show()
@@ -133,7 +143,7 @@ class AppManager(QMainWindow):
 
 def main():
     try:
-        SupabaseClient().get_client()
+        get_supabase_client()
         
         app = QApplication(sys.argv)
         
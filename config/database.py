@@ -1,6 +1,9 @@
 from supabase import create_client
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+from config.session_cache import save_session
 
 load_dotenv()
 
@@ -15,4 +18,72 @@ class SupabaseClient:
         self.client = create_client(url, key)
     
     def get_client(self):
-        return self.client
\ No newline at end of file
+        return self.client
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+# Escrituras que no deben hacer esperar a la interfaz (p. ej. last_login)
+_background = ThreadPoolExecutor(max_workers=2, thread_name_prefix="supabase-bg")
+# Último cierre de sesión lanzado: un login nuevo lo espera para que no le borre la sesión
+_pending_sign_out = None
+
+
+def get_supabase_client():
+    """Cliente compartido: se crea la primera vez que se pide y reutiliza sus conexiones (keep-alive)"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = SupabaseClient().get_client()
+            _shared_client.auth.on_auth_state_change(_remember_session)
+        return _shared_client
+
+
+def _remember_session(event, session):
+    """Supabase rota el refresh token en cada renovación: se guarda el nuevo"""
+    if event == "TOKEN_REFRESHED" and session is not None:
+        try:
+            save_session(session)
+        except OSError as e:
+            print(f"⚠️ No se pudo guardar la sesión: {e}")
+
+
+def run_in_background(description, fn, *args, **kwargs):
+    """Lanza fn en el pool de fondo sin esperar el resultado; los errores solo se registran"""
+    def run():
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            print(f"⚠️ Error en segundo plano ({description}): {e}")
+    return _background.submit(run)
+
+
+def sign_out_in_background(after=None):
+    """Cierra la sesión solo en este equipo (scope local) sin hacer esperar a la interfaz
+
+    after es el futuro de una petición que abre sesión y se dejó de esperar: se
+    aguarda a que termine y solo se cierra la sesión si llegó a abrirse.
+    """
+    global _pending_sign_out
+    client = get_supabase_client()
+    previous = _pending_sign_out
+
+    def sign_out():
+        if previous is not None:
+            previous.result()
+        if after is not None:
+            try:
+                after.result()
+            except Exception:
+                return
+        client.auth.sign_out({"scope": "local"})
+
+    _pending_sign_out = run_in_background("sign_out", sign_out)
+    return _pending_sign_out
+
+
+def wait_for_sign_out(timeout=None):
+    """Espera al cierre de sesión pendiente; llamar antes de iniciar una sesión nueva"""
+    future = _pending_sign_out
+    if future is not None:
+        future.result(timeout)
@@ -0,0 +1,47 @@
+import json
+import os
+from pathlib import Path
+
+SESSION_FILE = Path.home() / ".myapp_projects" / "session.json"
+
+
+def load_session(session_file=SESSION_FILE):
+    """Sesión guardada ({"user_id", "email", "refresh_token"}) o None"""
+    try:
+        with open(session_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or not data.get("refresh_token"):
+        return None
+    return data
+
+
+def save_session(session, session_file=SESSION_FILE):
+    """Guarda el refresh token de la sesión para reentrar sin contraseña en el próximo arranque"""
+    if session is None or not getattr(session, "refresh_token", None):
+        return
+    user = getattr(session, "user", None)
+    data = {
+        "user_id": getattr(user, "id", None),
+        "email": getattr(user, "email", None),
+        "refresh_token": session.refresh_token,
+    }
+    session_file = Path(session_file)
+    session_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = session_file.with_suffix(".tmp")
+    # Solo legible por el usuario: el token equivale a la contraseña
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, session_file)
+
+
+def clear_session(session_file=SESSION_FILE):
+    """Olvida la sesión guardada (cierre de sesión o token rechazado)"""
+    try:
+        os.remove(session_file)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"⚠️ No se pudo borrar la sesión guardada: {e}")
@@ -0,0 +1,235 @@
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QRectF, QSize, Qt
+from PySide6.QtGui import QColor, QImage, QPainter, QPicture
+from PySide6.QtSvg import QSvgGenerator
+from PySide6.QtWidgets import QGraphicsItem
+
+# Factores de escala de Android respecto a mdpi (1dp = 1px)
+ANDROID_DENSITIES = {
+    "mdpi": 1.0,
+    "hdpi": 1.5,
+    "xhdpi": 2.0,
+    "xxhdpi": 3.0,
+    "xxxhdpi": 4.0,
+}
+
+DEFAULT_TILE_HEIGHT = 512
+
+
+class PngStreamWriter:
+    """Escribe un PNG RGBA por franjas de filas sin tener nunca la imagen completa en memoria
+
+    Los datos se comprimen en streaming y se vuelcan como chunks IDAT; el
+    fichero se escribe a uno temporal y se renombra al cerrar.
+    """
+
+    def __init__(self, path, width, height, level=6):
+        self.path = path
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._tmp_path = path + ".tmp"
+        self._file = open(self._tmp_path, "wb")
+        self._compressor = zlib.compressobj(level)
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        # 8 bits por canal, tipo de color 6 (RGBA), sin entrelazado
+        self._write_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0))
+
+    def _write_chunk(self, kind, data):
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(kind)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(kind)) & 0xFFFFFFFF))
+
+    def write_rows(self, image):
+        """Añade las filas de una QImage del mismo ancho que el PNG"""
+        image = image.convertToFormat(QImage.Format_RGBA8888)
+        stride = image.bytesPerLine()
+        row_bytes = self.width * 4
+        data = image.constBits().tobytes()
+
+        rows = bytearray()
+        for y in range(image.height()):
+            rows.append(0)  # filtro "None"
+            rows += data[y * stride:y * stride + row_bytes]
+        compressed = self._compressor.compress(bytes(rows))
+        if compressed:
+            self._write_chunk(b"IDAT", compressed)
+        self.rows_written += image.height()
+
+    def close(self):
+        if self.rows_written != self.height:
+            self.abort()
+            raise ValueError(f"PNG incompleto: {self.rows_written}/{self.height} filas")
+        self._write_chunk(b"IDAT", self._compressor.flush())
+        self._write_chunk(b"IEND", b"")
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def record_scene(scene, source, hidden=()):
+    """Graba una vez el render de la escena en un QPicture reutilizable
+
+    El QPicture guarda los comandos de dibujo en coordenadas de escena, así que
+    se puede reproducir en paralelo a cualquier escala y sobre cualquier
+    dispositivo (QImage, QSvgGenerator) sin volver a tocar la escena.
+    """
+    hidden = [item for item in hidden if item.isVisible()]
+    for item in hidden:
+        item.setVisible(False)
+
+    picture = QPicture()
+    painter = QPainter(picture)
+    try:
+        scene.render(painter, source, source, Qt.IgnoreAspectRatio)
+    finally:
+        painter.end()
+        for item in hidden:
+            item.setVisible(True)
+    return picture
+
+
+def record_canvas(canvas, source):
+    """Graba solo el contenido de diseño del lienzo, con su aspecto original
+
+    Oculta guías, handles y elementos temporales, devuelve a los items
+    seleccionados su pen original y desactiva la caché por item mientras graba.
+    """
+    content = set(canvas.index)
+    hidden = [item for item in canvas.scene.items()
+              if item.parentItem() is None and item not in content]
+
+    selected_pens = {}
+    for item, (original_pen, _) in getattr(canvas, 'selection_originals', {}).items():
+        if original_pen is not None:
+            selected_pens[item] = item.pen()
+            item.setPen(original_pen)
+
+    cache_modes = {}
+    for item in content:
+        if item.cacheMode() != QGraphicsItem.NoCache:
+            cache_modes[item] = item.cacheMode()
+            item.setCacheMode(QGraphicsItem.NoCache)
+
+    try:
+        return record_scene(canvas.scene, source, hidden)
+    finally:
+        for item, pen in selected_pens.items():
+            item.setPen(pen)
+        for item, mode in cache_modes.items():
+            item.setCacheMode(mode)
+
+
+def _output_size(source, scale):
+    return max(1, round(source.width() * scale)), max(1, round(source.height() * scale))
+
+
+def rasterize_png(picture, source, scale, path, tile_height=DEFAULT_TILE_HEIGHT, background=None):
+    """Reproduce el QPicture a la escala dada y lo escribe como PNG franja a franja"""
+    width, height = _output_size(source, scale)
+    writer = PngStreamWriter(path, width, height)
+    try:
+        for top in range(0, height, tile_height):
+            rows = min(tile_height, height - top)
+            tile = QImage(width, rows, QImage.Format_ARGB32_Premultiplied)
+            tile.fill(background if background is not None else Qt.transparent)
+
+            painter = QPainter(tile)
+            painter.setRenderHints(QPainter.Antialiasing | QPainter.SmoothPixmapTransform |
+                                   QPainter.TextAntialiasing)
+            painter.translate(0, -top)
+            painter.scale(scale, scale)
+            painter.translate(-source.left(), -source.top())
+            painter.drawPicture(0, 0, picture)
+            painter.end()
+
+            writer.write_rows(tile)
+        writer.close()
+    except Exception:
+        writer.abort()
+        raise
+    return path
+
+
+def export_svg(picture, source, scale, path, title=""):
+    """Reproduce el QPicture en un SVG vectorial de tamaño source * scale"""
+    width, height = _output_size(source, scale)
+    generator = QSvgGenerator()
+    generator.setFileName(path)
+    generator.setSize(QSize(width, height))
+    generator.setViewBox(QRectF(0, 0, width, height))
+    if title:
+        generator.setTitle(title)
+
+    painter = QPainter(generator)
+    painter.scale(scale, scale)
+    painter.translate(-source.left(), -source.top())
+    painter.drawPicture(0, 0, picture)
+    painter.end()
+    return path
+
+
+def export_picture(picture, source, out_dir, name, base_density=1.0, densities=None,
+                   svg=True, tile_height=DEFAULT_TILE_HEIGHT, background=None, workers=None):
+    """Exporta un QPicture grabado a PNG por densidad (drawable-<densidad>/) y a SVG en paralelo
+
+    base_density es la densidad a la que está la escena (px de escena por dp).
+    Devuelve un diccionario {densidad o 'svg': ruta}.
+    """
+    densities = ANDROID_DENSITIES if densities is None else densities
+    os.makedirs(out_dir, exist_ok=True)
+
+    jobs = {}
+    with ThreadPoolExecutor(max_workers=workers or min(len(densities) + 1, os.cpu_count() or 1)) as pool:
+        for density, factor in densities.items():
+            density_dir = os.path.join(out_dir, f"drawable-{density}")
+            os.makedirs(density_dir, exist_ok=True)
+            path = os.path.join(density_dir, f"{name}.png")
+            # Cada worker recibe su propia copia (implícitamente compartida) del QPicture
+            jobs[density] = pool.submit(rasterize_png, QPicture(picture), source,
+                                        factor / base_density, path, tile_height, background)
+        if svg:
+            path = os.path.join(out_dir, f"{name}.svg")
+            jobs["svg"] = pool.submit(export_svg, QPicture(picture), source,
+                                      1.0 / base_density, path, name)
+        return {key: job.result() for key, job in jobs.items()}
+
+
+def export_canvas(canvas, out_dir, name="design", source=None, base_density=1.0, **options):
+    """Graba el lienzo una sola vez y exporta todas las densidades y el SVG"""
+    if source is None:
+        source = canvas.scene.itemsBoundingRect()
+    picture = record_canvas(canvas, QRectF(source))
+    return export_picture(picture, QRectF(source), out_dir, name, base_density, **options)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from modules.illustrator_tools import AdvancedIllustratorCanvas
+    from modules.canvas_index import generate_benchmark_scene
+
+    app = QApplication(sys.argv)
+    out_dir = sys.argv[1] if len(sys.argv) > 1 else "export"
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    canvas = AdvancedIllustratorCanvas()
+    generate_benchmark_scene(canvas, count, width=1233, height=2193)
+
+    start = time.perf_counter()
+    results = export_canvas(canvas, out_dir, "benchmark", QRectF(0, 0, 1233, 2193),
+                            base_density=3.0, background=QColor(Qt.white))
+    elapsed = time.perf_counter() - start
+    for key, path in results.items():
+        print(f"{key}: {path}")
+    print(f"⏱️ Exportación completa en {elapsed:.2f}s")
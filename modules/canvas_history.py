@@ -0,0 +1,325 @@
+import time
+from abc import ABC, abstractmethod
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtWidgets import QGraphicsPathItem, QGraphicsPolygonItem
+
+# Estimación aproximada del coste en memoria de cada tipo de dato guardado
+ITEM_OVERHEAD = 256
+PATH_ELEMENT_COST = 24
+TRANSFORM_COST = 96
+
+
+def path_cost(path):
+    """Coste de un QPainterPath o de un QPolygonF"""
+    if hasattr(path, "elementCount"):
+        return PATH_ELEMENT_COST * path.elementCount()
+    return PATH_ELEMENT_COST * len(path)
+
+
+def set_item_path(item, path):
+    """Aplica la geometría guardada: path en QGraphicsPathItem, polígono en QGraphicsPolygonItem"""
+    if isinstance(item, QGraphicsPolygonItem):
+        item.setPolygon(path)
+    else:
+        item.setPath(path)
+
+
+def item_cost(item):
+    cost = ITEM_OVERHEAD
+    if isinstance(item, QGraphicsPathItem):
+        cost += path_cost(item.path())
+    return cost
+
+
+def capture_geometry(item):
+    """Estado de transformación de un item: (pos, transform, rotación, escala)"""
+    return (item.pos(), item.transform(), item.rotation(), item.scale())
+
+
+def apply_geometry(item, state):
+    pos, transform, rotation, scale = state
+    item.setPos(pos)
+    item.setTransform(transform)
+    item.setRotation(rotation)
+    item.setScale(scale)
+
+
+class CanvasCommand(ABC):
+    """Comando deshacible del lienzo; se registra ya aplicado (push no llama a redo)"""
+
+    # Ventana en segundos para fusionar pasos consecutivos del mismo gesto
+    MERGE_WINDOW = 0.6
+
+    def __init__(self, canvas, text):
+        self.canvas = canvas
+        self.text = text
+        self.timestamp = time.monotonic()
+
+    @abstractmethod
+    def undo(self):
+        """Devuelve el lienzo al estado anterior al comando"""
+
+    @abstractmethod
+    def redo(self):
+        """Vuelve a aplicar el comando"""
+
+    def merge_with(self, other):
+        """Intenta absorber un comando posterior; devuelve True si lo hizo"""
+        return False
+
+    def cost(self):
+        return ITEM_OVERHEAD
+
+    def affected_items(self):
+        """Items cuyo estado cambia al aplicar o deshacer el comando"""
+        return []
+
+
+class AddItemsCommand(CanvasCommand):
+    """Items creados (pluma, lápiz, pincel)"""
+
+    def __init__(self, canvas, items, text="Añadir"):
+        super().__init__(canvas, text)
+        self.items = list(items)
+
+    def undo(self):
+        for item in self.items:
+            self.canvas.remove_content_item(item)
+
+    def redo(self):
+        for item in self.items:
+            self.canvas.add_content_item(item)
+
+    def cost(self):
+        return sum(item_cost(item) for item in self.items)
+
+    def affected_items(self):
+        return self.items
+
+
+class RemoveItemsCommand(AddItemsCommand):
+    """Items eliminados; el propio item fuera de la escena sirve de instantánea"""
+
+    def __init__(self, canvas, items, text="Eliminar"):
+        super().__init__(canvas, items, text)
+
+    def undo(self):
+        AddItemsCommand.redo(self)
+
+    def redo(self):
+        AddItemsCommand.undo(self)
+
+
+class TransformCommand(CanvasCommand):
+    """Mover, escalar o rotar items: solo guarda los estados de transformación"""
+
+    def __init__(self, canvas, before, after, text="Transformar"):
+        super().__init__(canvas, text)
+        self.before = before  # item -> estado
+        self.after = after
+
+    def undo(self):
+        for item, state in self.before.items():
+            apply_geometry(item, state)
+        self.canvas.index.update_many(self.before)
+
+    def redo(self):
+        for item, state in self.after.items():
+            apply_geometry(item, state)
+        self.canvas.index.update_many(self.after)
+
+    def merge_with(self, other):
+        if (not isinstance(other, TransformCommand) or
+                other.after.keys() != self.after.keys() or
+                other.timestamp - self.timestamp > self.MERGE_WINDOW):
+            return False
+        self.after = other.after
+        self.timestamp = other.timestamp
+        return True
+
+    def cost(self):
+        return TRANSFORM_COST * 2 * len(self.before)
+
+    def affected_items(self):
+        return list(self.before)
+
+
+class PenCommand(CanvasCommand):
+    """Cambio de pen (grosor, color) de un item"""
+
+    def __init__(self, canvas, item, old_pen, new_pen, text="Cambiar trazo"):
+        super().__init__(canvas, text)
+        self.item = item
+        self.old_pen = old_pen
+        self.new_pen = new_pen
+
+    def undo(self):
+        self.item.setPen(self.old_pen)
+        self.canvas.index.update(self.item)
+
+    def redo(self):
+        self.item.setPen(self.new_pen)
+        self.canvas.index.update(self.item)
+
+    def merge_with(self, other):
+        if (not isinstance(other, PenCommand) or other.item is not self.item or
+                other.timestamp - self.timestamp > self.MERGE_WINDOW):
+            return False
+        self.new_pen = other.new_pen
+        self.timestamp = other.timestamp
+        return True
+
+    def affected_items(self):
+        return [self.item]
+
+
+class PathEditCommand(CanvasCommand):
+    """Cambios de geometría de paths (borrador, nodos, operaciones booleanas)
+
+    Guarda solo los paths (o polígonos) antes/después de los items tocados más
+    los items creados y eliminados; ambos son implícitamente compartidos.
+    """
+
+    def __init__(self, canvas, text="Editar trazado"):
+        super().__init__(canvas, text)
+        self.paths = {}      # item -> [path anterior, path nuevo]
+        self.added = []
+        self.removed = []
+
+    def is_empty(self):
+        return not (self.paths or self.added or self.removed)
+
+    def record_path(self, item, old_path, new_path):
+        if item in self.paths:
+            self.paths[item][1] = new_path
+        else:
+            self.paths[item] = [old_path, new_path]
+
+    def record_added(self, item):
+        self.added.append(item)
+
+    def record_removed(self, item):
+        if item in self.added:
+            # Creado y eliminado dentro del mismo comando: no hay nada que deshacer
+            self.added.remove(item)
+            self.paths.pop(item, None)
+        else:
+            self.removed.append(item)
+
+    def undo(self):
+        for item in self.added:
+            self.canvas.remove_content_item(item)
+        for item in self.removed:
+            self.canvas.add_content_item(item)
+        for item, (old_path, _) in self.paths.items():
+            set_item_path(item, old_path)
+            self.canvas.index.update(item)
+
+    def redo(self):
+        for item, (_, new_path) in self.paths.items():
+            set_item_path(item, new_path)
+            self.canvas.index.update(item)
+        for item in self.removed:
+            self.canvas.remove_content_item(item)
+        for item in self.added:
+            self.canvas.add_content_item(item)
+
+    def cost(self):
+        cost = sum(path_cost(old) + path_cost(new) for old, new in self.paths.values())
+        return cost + sum(item_cost(item) for item in self.added + self.removed)
+
+    def affected_items(self):
+        return list(self.paths) + self.added + self.removed
+
+
+class CanvasHistory(QObject):
+    """Pila de deshacer/rehacer del lienzo con límite por presupuesto de memoria"""
+
+    changed = Signal()
+    # Comando aplicado (push, undo o redo); permite registrar los items afectados
+    command_applied = Signal(object)
+
+    def __init__(self, memory_budget=32 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.memory_budget = memory_budget
+        self._commands = []
+        self._costs = []
+        self._index = 0  # comandos [0, _index) están aplicados
+        self._total_cost = 0
+
+    def can_undo(self):
+        return self._index > 0
+
+    def can_redo(self):
+        return self._index < len(self._commands)
+
+    def undo_text(self):
+        return self._commands[self._index - 1].text if self.can_undo() else ""
+
+    def redo_text(self):
+        return self._commands[self._index].text if self.can_redo() else ""
+
+    def memory_usage(self):
+        return self._total_cost
+
+    def push(self, command):
+        """Registra un comando ya aplicado, descartando la rama de rehacer"""
+        self._discard_from(self._index)
+
+        if self._commands and self._commands[-1].merge_with(command):
+            self._total_cost -= self._costs[-1]
+            self._costs[-1] = self._commands[-1].cost()
+            self._total_cost += self._costs[-1]
+        else:
+            cost = command.cost()
+            self._commands.append(command)
+            self._costs.append(cost)
+            self._total_cost += cost
+            self._index += 1
+
+        self._trim()
+        self.command_applied.emit(self._commands[-1])
+        self.changed.emit()
+
+    def undo(self):
+        if not self.can_undo():
+            return False
+        self._index -= 1
+        self._commands[self._index].undo()
+        self.command_applied.emit(self._commands[self._index])
+        self.changed.emit()
+        return True
+
+    def redo(self):
+        if not self.can_redo():
+            return False
+        self._commands[self._index].redo()
+        self.command_applied.emit(self._commands[self._index])
+        self._index += 1
+        self.changed.emit()
+        return True
+
+    def clear(self):
+        self._commands = []
+        self._costs = []
+        self._index = 0
+        self._total_cost = 0
+        self.changed.emit()
+
+    def _discard_from(self, index):
+        if index < len(self._commands):
+            self._total_cost -= sum(self._costs[index:])
+            del self._commands[index:]
+            del self._costs[index:]
+
+    def _trim(self):
+        """Elimina los comandos más antiguos hasta volver al presupuesto (conserva el último)"""
+        drop = 0
+        while self._total_cost > self.memory_budget and drop < len(self._commands) - 1:
+            self._total_cost -= self._costs[drop]
+            drop += 1
+        if drop:
+            del self._commands[:drop]
+            del self._costs[:drop]
+            self._index = max(0, self._index - drop)
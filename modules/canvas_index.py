@@ -0,0 +1,305 @@
+import math
+import random
+import time
+
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QBrush, QColor, QPainterPath, QPen
+from PySide6.QtWidgets import QGraphicsEllipseItem, QGraphicsRectItem
+
+from .canvas_rendering import LodPathItem
+
+
+class SpatialIndex:
+    """Índice espacial por rejilla uniforme sobre los bounding boxes en coordenadas de escena"""
+
+    # Items que ocupan más celdas que esto van a una lista aparte que siempre se revisa
+    MAX_CELLS_PER_ITEM = 64
+
+    def __init__(self, cell_size=128):
+        self.cell_size = cell_size
+        self._cells = {}
+        self._bounds = {}   # item -> (left, top, right, bottom)
+        self._large = set()
+
+    def __len__(self):
+        return len(self._bounds)
+
+    def __contains__(self, item):
+        return item in self._bounds
+
+    def _cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        return (math.floor(left / size), math.floor(top / size),
+                math.floor(right / size), math.floor(bottom / size))
+
+    def insert(self, item, rect=None):
+        """Inserta (o reubica) un item usando su sceneBoundingRect"""
+        if item in self._bounds:
+            self.remove(item)
+        rect = rect if rect is not None else item.sceneBoundingRect()
+        bounds = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        self._bounds[item] = bounds
+
+        x0, y0, x1, y1 = self._cell_range(*bounds)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > self.MAX_CELLS_PER_ITEM:
+            self._large.add(item)
+            return
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                self._cells.setdefault((cx, cy), set()).add(item)
+
+    def remove(self, item):
+        bounds = self._bounds.pop(item, None)
+        if bounds is None:
+            return
+        if item in self._large:
+            self._large.discard(item)
+            return
+        x0, y0, x1, y1 = self._cell_range(*bounds)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                cell = self._cells.get((cx, cy))
+                if cell is not None:
+                    cell.discard(item)
+                    if not cell:
+                        del self._cells[(cx, cy)]
+
+    def clear(self):
+        self._cells.clear()
+        self._bounds.clear()
+        self._large.clear()
+
+    def query_rect(self, rect):
+        """Items cuyo bounding box intersecta el rectángulo (en escena)"""
+        left, top, right, bottom = rect.left(), rect.top(), rect.right(), rect.bottom()
+        x0, y0, x1, y1 = self._cell_range(left, top, right, bottom)
+
+        candidates = set(self._large)
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(self._cells):
+            # Consulta más grande que la rejilla ocupada: recorrer celdas existentes
+            for (cx, cy), cell in self._cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    candidates.update(cell)
+        else:
+            for cx in range(x0, x1 + 1):
+                for cy in range(y0, y1 + 1):
+                    cell = self._cells.get((cx, cy))
+                    if cell:
+                        candidates.update(cell)
+
+        bounds = self._bounds
+        return [
+            item for item in candidates
+            if bounds[item][0] <= right and bounds[item][2] >= left
+            and bounds[item][1] <= bottom and bounds[item][3] >= top
+        ]
+
+    def query_point(self, point):
+        return self.query_rect(QRectF(point, point))
+
+
+class ColorIndex:
+    """Índice de items agrupados por color en cubetas RGB de 16 niveles por canal"""
+
+    BUCKET_SHIFT = 4
+
+    def __init__(self):
+        self._buckets = {}
+        self._colors = {}   # item -> (r, g, b)
+
+    def __len__(self):
+        return len(self._colors)
+
+    def insert(self, item, color):
+        if item in self._colors:
+            self.remove(item)
+        if not color.isValid():
+            return
+        rgb = (color.red(), color.green(), color.blue())
+        self._colors[item] = rgb
+        self._buckets.setdefault(self._bucket(rgb), set()).add(item)
+
+    def remove(self, item):
+        rgb = self._colors.pop(item, None)
+        if rgb is None:
+            return
+        key = self._bucket(rgb)
+        bucket = self._buckets.get(key)
+        if bucket is not None:
+            bucket.discard(item)
+            if not bucket:
+                del self._buckets[key]
+
+    def clear(self):
+        self._buckets.clear()
+        self._colors.clear()
+
+    def _bucket(self, rgb):
+        shift = self.BUCKET_SHIFT
+        return (rgb[0] >> shift, rgb[1] >> shift, rgb[2] >> shift)
+
+    def query(self, color, tolerance):
+        """Items cuya suma de diferencias RGB con color es <= tolerance"""
+        if not color.isValid():
+            return []
+        target = (color.red(), color.green(), color.blue())
+        shift = self.BUCKET_SHIFT
+        ranges = [
+            range(max(0, c - tolerance) >> shift, (min(255, c + tolerance) >> shift) + 1)
+            for c in target
+        ]
+
+        matches = []
+        colors = self._colors
+        for br in ranges[0]:
+            for bg in ranges[1]:
+                for bb in ranges[2]:
+                    for item in self._buckets.get((br, bg, bb), ()):
+                        r, g, b = colors[item]
+                        if abs(r - target[0]) + abs(g - target[1]) + abs(b - target[2]) <= tolerance:
+                            matches.append(item)
+        return matches
+
+
+class CanvasIndex:
+    """Índice del contenido del lienzo: geometría en rejilla y colores de relleno por cubetas"""
+
+    def __init__(self, cell_size=128):
+        self.spatial = SpatialIndex(cell_size)
+        self.colors = ColorIndex()
+        self._order = {}
+        self._next_order = 0
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, item):
+        return item in self._order
+
+    def __iter__(self):
+        return iter(self._order)
+
+    def add(self, item):
+        """Registra un item de contenido (no handles ni elementos temporales)"""
+        if item not in self._order:
+            self._order[item] = self._next_order
+            self._next_order += 1
+        self.update(item)
+
+    def update(self, item):
+        """Reindexa un item tras moverlo, transformarlo o cambiar su estilo"""
+        if item not in self._order:
+            return
+        self.spatial.insert(item)
+        if hasattr(item, 'brush'):
+            self.colors.insert(item, item.brush().color())
+
+    def update_many(self, items):
+        for item in items:
+            self.update(item)
+
+    def remove(self, item):
+        if self._order.pop(item, None) is None:
+            return
+        self.spatial.remove(item)
+        self.colors.remove(item)
+
+    def clear(self):
+        self.spatial.clear()
+        self.colors.clear()
+        self._order.clear()
+
+    def items_in_rect(self, rect, mode=Qt.IntersectsItemShape):
+        """Items que intersectan el rectángulo según su forma real"""
+        path = QPainterPath()
+        path.addRect(rect)
+        return [
+            item for item in self.spatial.query_rect(rect)
+            if item.collidesWithPath(item.mapFromScene(path), mode)
+        ]
+
+    def items_at(self, pos):
+        """Items bajo el punto, el de más arriba primero"""
+        hits = [
+            item for item in self.spatial.query_point(pos)
+            if item.contains(item.mapFromScene(pos))
+        ]
+        hits.sort(key=lambda item: (item.zValue(), self._order[item]), reverse=True)
+        return hits
+
+    def items_with_color(self, color, tolerance):
+        return self.colors.query(color, tolerance)
+
+    def paint_order(self):
+        """Items de abajo hacia arriba, en el orden en que los apila la escena"""
+        return self.stacked(self._order)
+
+    def stacked(self, items):
+        """Los items indexados dados, ordenados de abajo hacia arriba"""
+        return sorted(items, key=lambda item: (item.zValue(), self._order[item]))
+
+
+def generate_benchmark_scene(canvas, count=20000, width=4000, height=4000, seed=1):
+    """Llena el lienzo con formas aleatorias (rectángulos, elipses y trazos) para medir rendimiento"""
+    rng = random.Random(seed)
+    palette = [QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(64)]
+
+    for i in range(count):
+        x = rng.uniform(0, width)
+        y = rng.uniform(0, height)
+        w = rng.uniform(4, 60)
+        h = rng.uniform(4, 60)
+        kind = i % 3
+        if kind == 0:
+            item = QGraphicsRectItem(x, y, w, h)
+        elif kind == 1:
+            item = QGraphicsEllipseItem(x, y, w, h)
+        else:
+            path = QPainterPath(QPointF(x, y))
+            for _ in range(8):
+                path.lineTo(x + rng.uniform(0, w), y + rng.uniform(0, h))
+            item = LodPathItem(path)
+        item.setBrush(QBrush(rng.choice(palette)))
+        item.setPen(QPen(Qt.black, 1))
+        canvas.add_content_item(item)
+
+
+def run_benchmark(canvas, queries=200, width=4000, height=4000, seed=2):
+    """Mide consultas de marquesina, varita mágica y borrador con el índice frente a un recorrido lineal"""
+    rng = random.Random(seed)
+    rects = [QRectF(rng.uniform(0, width), rng.uniform(0, height), 200, 200) for _ in range(queries)]
+    items = list(canvas.index)
+    colors = [items[rng.randrange(len(items))].brush().color() for _ in range(queries)] if items else []
+
+    def timed(fn):
+        start = time.perf_counter()
+        fn()
+        return (time.perf_counter() - start) * 1000
+
+    results = {
+        "items": len(items),
+        "marquee_indexed_ms": timed(lambda: [canvas.index.items_in_rect(r) for r in rects]),
+        "marquee_scene_ms": timed(lambda: [canvas.scene.items(r, Qt.IntersectsItemShape) for r in rects]),
+        "magic_wand_indexed_ms": timed(lambda: [
+            canvas.index.items_with_color(c, canvas.magic_wand_tolerance) for c in colors]),
+        "magic_wand_linear_ms": timed(lambda: [
+            [i for i in canvas.scene.items()
+             if hasattr(i, 'brush') and canvas.colors_similar(c, i.brush().color(), canvas.magic_wand_tolerance)]
+            for c in colors]),
+    }
+    return results
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from modules.illustrator_tools import AdvancedIllustratorCanvas
+
+    app = QApplication(sys.argv)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    canvas = AdvancedIllustratorCanvas()
+    generate_benchmark_scene(canvas, count)
+    for key, value in run_benchmark(canvas).items():
+        print(f"{key}: {value:.1f}" if isinstance(value, float) else f"{key}: {value}")
@@ -0,0 +1,374 @@
+import math
+import random
+import statistics
+import time
+
+from PySide6.QtCore import QObject, QPointF, QRectF, QTimer, Qt
+from PySide6.QtGui import QColor, QFont, QPainter, QPainterPath, QPen, QPixmap
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsPathItem, QGraphicsView, QStyleOptionGraphicsItem
+
+
+class LodPathItem(QGraphicsPathItem):
+    """QGraphicsPathItem que se dibuja simplificado cuando el zoom es bajo
+
+    Por debajo de LOD_THRESHOLD el path se aplana y se decima a una
+    tolerancia de ~1 píxel de pantalla (cacheada por potencia de 2); si el item
+    ocupa menos de MIN_SCREEN_SIZE píxeles se dibuja solo su bounding box.
+    """
+
+    LOD_THRESHOLD = 0.6
+    MIN_ELEMENTS = 16
+    MIN_SCREEN_SIZE = 2.0
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._lod_cache = {}
+
+    def setPath(self, path):
+        self._lod_cache = {}
+        super().setPath(path)
+
+    def simplified_path(self, lod):
+        """Versión simplificada del path para un nivel de detalle dado"""
+        level = max(0, math.ceil(math.log2(1.0 / lod)))
+        cached = self._lod_cache.get(level)
+        if cached is not None:
+            return cached
+
+        # Decimación radial O(n): basta con ~1px de error a este nivel de zoom
+        tolerance = float(2 ** level)
+        simplified = QPainterPath()
+        for polygon in self.path().toSubpathPolygons():
+            points = list(polygon)
+            if len(points) < 2:
+                continue
+            simplified.moveTo(points[0])
+            last = points[0]
+            for point in points[1:-1]:
+                if abs(point.x() - last.x()) + abs(point.y() - last.y()) >= tolerance:
+                    simplified.lineTo(point)
+                    last = point
+            simplified.lineTo(points[-1])
+        self._lod_cache[level] = simplified
+        return simplified
+
+    def paint(self, painter, option, widget=None):
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        if lod >= self.LOD_THRESHOLD or self.path().elementCount() < self.MIN_ELEMENTS:
+            super().paint(painter, option, widget)
+            return
+
+        rect = self.boundingRect()
+        if max(rect.width(), rect.height()) * lod < self.MIN_SCREEN_SIZE:
+            painter.fillRect(rect, self.pen().color())
+            return
+
+        painter.setPen(self.pen())
+        painter.setBrush(self.brush())
+        painter.drawPath(self.simplified_path(lod))
+
+
+class InteractiveRenderController(QObject):
+    """Baja la calidad de render mientras se interactúa y repinta en alta calidad al quedar inactivo
+
+    En modo "performance" además asigna una política de caché a cada item:
+    DeviceCoordinateCache para paths complejos estáticos (pan barato) e
+    ItemCoordinateCache para los que se están transformando.
+    """
+
+    IDLE_DELAY = 150
+    CACHE_MIN_ELEMENTS = 64
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.mode = "quality"
+        self.interacting = False
+
+        self.idle_timer = QTimer(self)
+        self.idle_timer.setSingleShot(True)
+        self.idle_timer.setInterval(self.IDLE_DELAY)
+        self.idle_timer.timeout.connect(self.finish_interaction)
+
+    def set_mode(self, mode):
+        """Cambia entre 'quality' (sin caché) y 'performance' (caché por item)"""
+        self.mode = mode
+        for item in self.view.index:
+            self.apply_cache_policy(item)
+        self.view.viewport().update()
+
+    def apply_cache_policy(self, item, transforming=False):
+        if self.mode != "performance":
+            item.setCacheMode(QGraphicsItem.NoCache)
+        elif transforming:
+            item.setCacheMode(QGraphicsItem.ItemCoordinateCache)
+        elif isinstance(item, QGraphicsPathItem) and item.path().elementCount() >= self.CACHE_MIN_ELEMENTS:
+            item.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+        else:
+            item.setCacheMode(QGraphicsItem.NoCache)
+
+    def interaction(self):
+        """Llamar en cada paso de pan, zoom o arrastre"""
+        if not self.interacting:
+            self.interacting = True
+            self.view.setRenderHint(QPainter.Antialiasing, False)
+            self.view.setRenderHint(QPainter.SmoothPixmapTransform, False)
+        self.idle_timer.start()
+
+    def finish_interaction(self):
+        """Pasada final con antialiasing cuando la interacción se detiene"""
+        self.interacting = False
+        self.view.setRenderHint(QPainter.Antialiasing, True)
+        self.view.setRenderHint(QPainter.SmoothPixmapTransform, True)
+        self.view.viewport().update()
+
+
+class GuideLayer:
+    """Capa de guías dibujada por la vista: rejilla de snap, keylines de margen y reglas
+
+    No añade items a la escena. La rejilla y las reglas se rasterizan una vez por
+    nivel de zoom en pixmaps que luego solo se copian; las keylines son cuatro
+    líneas cosméticas.
+    """
+
+    GRID_COLOR = QColor(0, 0, 0, 18)
+    KEYLINE_COLOR = QColor(200, 200, 200, 160)
+    RULER_SIZE = 18
+    RULER_BACKGROUND = QColor("#f3f3f3")
+    RULER_COLOR = QColor("#888888")
+    MIN_GRID_PIXELS = 4
+    MAX_CACHED_ZOOMS = 8
+
+    def __init__(self, view):
+        self.view = view
+        self.page = QRectF()
+        self.grid_size = 8
+        self.keylines = [16]
+        self.show_grid = True
+        self.show_keylines = True
+        self.show_rulers = False
+        self._grid_cache = {}
+        self._ruler_cache = {}
+
+    def set_page(self, width, height):
+        """Área del dispositivo en coordenadas de escena (dp)"""
+        self.page = QRectF(0, 0, width, height)
+        self._ruler_cache.clear()
+        self.view.viewport().update()
+
+    def set_grid_size(self, size):
+        self.grid_size = size
+        self._grid_cache.clear()
+        self.view.viewport().update()
+
+    def set_visible(self, grid=None, keylines=None, rulers=None):
+        if grid is not None:
+            self.show_grid = grid
+        if keylines is not None:
+            self.show_keylines = keylines
+        if rulers is not None:
+            self.show_rulers = rulers
+            # Las reglas van fijas al viewport: desplazar sus píxeles al hacer scroll las dejaría corridas
+            self.view.setViewportUpdateMode(
+                QGraphicsView.FullViewportUpdate if rulers else QGraphicsView.SmartViewportUpdate)
+        self.view.viewport().update()
+
+    def _scale(self):
+        return self.view.transform().m11()
+
+    @staticmethod
+    def _remember(cache, key, value, limit):
+        if len(cache) >= limit:
+            cache.pop(next(iter(cache)))
+        cache[key] = value
+        return value
+
+    def _grid_tile(self, cell):
+        """Pixmap con N celdas de rejilla; N se elige para que el tile mida un número casi entero de píxeles"""
+        key = round(cell, 3)
+        tile = self._grid_cache.get(key)
+        if tile is not None:
+            return tile
+        count = min(range(1, 17), key=lambda n: abs(n * cell - round(n * cell)))
+        size = max(1, round(count * cell))
+        tile = QPixmap(size, size)
+        tile.fill(Qt.transparent)
+        painter = QPainter(tile)
+        painter.setPen(QPen(self.GRID_COLOR, 1))
+        for i in range(count):
+            offset = round(i * cell)
+            painter.drawLine(offset, 0, offset, size)
+            painter.drawLine(0, offset, size, offset)
+        painter.end()
+        return self._remember(self._grid_cache, key, (tile, size), self.MAX_CACHED_ZOOMS)
+
+    def draw_background(self, painter, rect):
+        """Rejilla de snap dentro de la página, copiada desde el tile cacheado"""
+        if not self.show_grid or self.page.isEmpty():
+            return
+        scale = self._scale()
+        cell = self.grid_size * scale
+        if cell < self.MIN_GRID_PIXELS:
+            return
+        tile, _ = self._grid_tile(cell)
+
+        # Se pinta en coordenadas del viewport para que los píxeles del tile no se reescalen
+        area = self.view.mapFromScene(rect.intersected(self.page)).boundingRect()
+        origin = self.view.mapFromScene(self.page.topLeft())
+        if area.isEmpty():
+            return
+        painter.save()
+        painter.resetTransform()
+        painter.drawTiledPixmap(QRectF(area), tile, QPointF(area.left() - origin.x(), area.top() - origin.y()))
+        painter.restore()
+
+    def draw_foreground(self, painter, rect):
+        if self.page.isEmpty():
+            return
+        if self.show_keylines:
+            pen = QPen(self.KEYLINE_COLOR, 1, Qt.DashLine)
+            pen.setCosmetic(True)
+            painter.save()
+            painter.setPen(pen)
+            width, height = self.page.width(), self.page.height()
+            for margin in self.keylines:
+                painter.drawLine(QPointF(margin, 0), QPointF(margin, height))
+                painter.drawLine(QPointF(width - margin, 0), QPointF(width - margin, height))
+                painter.drawLine(QPointF(0, margin), QPointF(width, margin))
+                painter.drawLine(QPointF(0, height - margin), QPointF(width, height - margin))
+            painter.restore()
+        if self.show_rulers:
+            self._draw_rulers(painter)
+
+    def _ruler(self, length_dp, horizontal):
+        """Regla completa de la página a la escala actual: marcas cada grid_size dp y etiqueta cada 8 marcas"""
+        scale = self._scale()
+        key = (round(scale, 3), length_dp, horizontal)
+        cached = self._ruler_cache.get(key)
+        if cached is not None:
+            return cached
+        length = max(1, round(length_dp * scale))
+        size = self.RULER_SIZE
+        pixmap = QPixmap(length, size) if horizontal else QPixmap(size, length)
+        pixmap.fill(self.RULER_BACKGROUND)
+        painter = QPainter(pixmap)
+        painter.setPen(self.RULER_COLOR)
+        font = QFont()
+        font.setPixelSize(9)
+        painter.setFont(font)
+
+        step = self.grid_size
+        # Con poco zoom solo se dibujan las marcas largas para que no se amontonen
+        minor = step * scale >= self.MIN_GRID_PIXELS
+        value = 0
+        index = 0
+        while value <= length_dp:
+            offset = round(value * scale)
+            major = index % 8 == 0
+            if major or minor:
+                tick = size if major else size // 3
+                if horizontal:
+                    painter.drawLine(offset, size - tick, offset, size)
+                    if major:
+                        painter.drawText(offset + 2, 10, str(int(value)))
+                else:
+                    painter.drawLine(size - tick, offset, size, offset)
+                    if major:
+                        painter.save()
+                        painter.translate(10, offset + 2)
+                        painter.rotate(90)
+                        painter.drawText(0, 0, str(int(value)))
+                        painter.restore()
+            value += step
+            index += 1
+        painter.end()
+        return self._remember(self._ruler_cache, key, pixmap, 2 * self.MAX_CACHED_ZOOMS)
+
+    def _draw_rulers(self, painter):
+        origin = self.view.mapFromScene(self.page.topLeft())
+        viewport = self.view.viewport().rect()
+        size = self.RULER_SIZE
+        painter.save()
+        painter.resetTransform()
+        painter.fillRect(0, 0, viewport.width(), size, self.RULER_BACKGROUND)
+        painter.fillRect(0, 0, size, viewport.height(), self.RULER_BACKGROUND)
+        painter.drawPixmap(origin.x(), 0, self._ruler(self.page.width(), True))
+        painter.drawPixmap(0, origin.y(), self._ruler(self.page.height(), False))
+        painter.fillRect(0, 0, size, size, self.RULER_BACKGROUND)
+        painter.restore()
+
+
+def measure_pan_zoom_fps(view, frames=120, pan_step=40, zoom_factor=1.05):
+    """Benchmark automático: alterna pan y zoom repintando de forma síncrona y devuelve los fps"""
+    view.resize(max(view.width(), 800), max(view.height(), 600))
+    view.show()
+    hbar = view.horizontalScrollBar()
+    vbar = view.verticalScrollBar()
+
+    start = time.perf_counter()
+    for frame in range(frames):
+        phase = (frame // 20) % 4
+        if phase == 0:
+            hbar.setValue(hbar.value() + pan_step)
+        elif phase == 1:
+            vbar.setValue(vbar.value() + pan_step)
+        elif phase == 2:
+            view.scale(1 / zoom_factor, 1 / zoom_factor)
+        else:
+            view.scale(zoom_factor, zoom_factor)
+        if hasattr(view, 'render_controller'):
+            view.render_controller.interaction()
+        # grab() fuerza un pintado síncrono incluso con la plataforma offscreen
+        view.viewport().grab()
+    elapsed = time.perf_counter() - start
+    return frames / elapsed if elapsed > 0 else float("inf")
+
+
+def add_benchmark_strokes(canvas, count, width=4000, height=4000, points=200, seed=3):
+    """Añade trazos largos (como los del lápiz) para medir la caché del modo rendimiento"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        x = rng.uniform(0, width)
+        y = rng.uniform(0, height)
+        path = QPainterPath(QPointF(x, y))
+        for k in range(1, points):
+            path.lineTo(x + k * 1.5, y + 12 * math.sin(k / 6))
+        item = LodPathItem(path)
+        item.setPen(QPen(QColor(rng.randrange(256), rng.randrange(256), rng.randrange(256)), 2))
+        canvas.add_content_item(item)
+
+
+def compare_render_modes(canvas, frames=120, rounds=3, warmup=10):
+    """fps de cada modo sobre la misma escena: rondas alternas con calentamiento y mediana
+
+    Medir cada modo una sola vez y en lienzos distintos da diferencias que
+    son ruido (orden, cachés del sistema), no efecto de la política de caché.
+    """
+    samples = {"quality": [], "performance": []}
+    for _ in range(rounds):
+        for mode in samples:
+            canvas.render_controller.set_mode(mode)
+            canvas.resetTransform()
+            canvas.horizontalScrollBar().setValue(0)
+            canvas.verticalScrollBar().setValue(0)
+            measure_pan_zoom_fps(canvas, warmup)
+            samples[mode].append(measure_pan_zoom_fps(canvas, frames))
+    return {mode: statistics.median(values) for mode, values in samples.items()}
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from modules.illustrator_tools import AdvancedIllustratorCanvas
+    from modules.canvas_index import generate_benchmark_scene
+
+    app = QApplication(sys.argv)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    canvas = AdvancedIllustratorCanvas()
+    generate_benchmark_scene(canvas, count)
+    # Solo los paths de CACHE_MIN_ELEMENTS o más se cachean: sin ellos ambos modos son iguales
+    add_benchmark_strokes(canvas, max(1, count // 10))
+    for mode, fps in compare_render_modes(canvas).items():
+        print(f"{mode}: {fps:.1f} fps")
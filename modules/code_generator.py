@@ -1,4 +1,36 @@
 from .common_imports import *
+from array import array
+from collections.abc import MutableMapping
+from itertools import count
+
+# Valores por defecto compartidos por todos los UIElement (no se copian por instancia)
+DEFAULT_PROPERTIES = {
+    "backgroundColor": "#FFFFFF",
+    "textColor": "#000000",
+    "textSize": "14sp",
+    "text": "",
+    "cornerRadius": "0dp",
+    "hint": "",
+    "inputType": "text",
+    "orientation": "horizontal"
+}
+
+_WIDGET_TYPES = {
+    "rectangle": "View",
+    "text": "TextView",
+    "button": "Button",
+    "circle": "ImageView",
+    "input": "EditText",
+    "switch": "Switch",
+    "checkbox": "CheckBox",
+    "radio": "RadioButton",
+    "slider": "SeekBar",
+    "image": "ImageView",
+    "list": "ListView",
+    "card": "CardView"
+}
+
+_element_ids = count(1)
 
 class CodeGenerator:
     """Clase para generar código completo de Android"""
@@ -6,12 +38,15 @@ class CodeGenerator:
     def __init__(self, project_name, package_name="com.example.app"):
         self.project_name = project_name
         self.package_name = package_name
-        self.elements = []
+        self.elements = ElementStore()
         self.layouts = {}
         self.drawables = {}
         
     def addElement(self, element):
-        self.elements.append(element)
+        self.elements.add(element)
+
+    def removeElement(self, element):
+        self.elements.remove(element)
         
     def generateLayoutXML(self, layout_name="activity_main"):
         """Genera el XML completo del layout"""
@@ -21,21 +56,23 @@ class CodeGenerator:
     android:layout_height="match_parent"
     android:orientation="vertical"
     android:padding="16dp">\n'''
+        parts = [xml_content]
         
         for element in self.elements:
-            xml_content += "    " + element.toXML().replace("\n", "\n    ") + "\n"
+            parts.append("    " + element.toXML().replace("\n", "\n    ") + "\n")
             
 
-            if element.properties.get("cornerRadius", "0dp") != "0dp":
+            if element.getProperty("cornerRadius", "0dp") != "0dp":
                 drawable_name = f"bg_{element.id}"
                 drawable_xml, _ = element.generateShapeDrawable(
                     drawable_name, 
-                    element.properties.get("backgroundColor", "#FFFFFF"),
-                    element.properties.get("cornerRadius", "0dp")
+                    element.getProperty("backgroundColor", "#FFFFFF"),
+                    element.getProperty("cornerRadius", "0dp")
                 )
                 self.drawables[drawable_name] = drawable_xml
         
-        xml_content += '</LinearLayout>'
+        parts.append('</LinearLayout>')
+        xml_content = "".join(parts)
         self.layouts[layout_name] = xml_content
         return xml_content
     
@@ -79,10 +116,10 @@ public class {activity_name} extends AppCompatActivity {{
         """Genera strings.xml con todos los textos"""
         strings = set()
         for element in self.elements:
-            if element.properties.get("text"):
-                strings.add(f'    <string name="{element.id}_text">{element.properties["text"]}</string>')
-            if element.properties.get("hint"):
-                strings.add(f'    <string name="{element.id}_hint">{element.properties["hint"]}</string>')
+            if element.getProperty("text"):
+                strings.add(f'    <string name="{element.id}_text">{element.getProperty("text")}</string>')
+            if element.getProperty("hint"):
+                strings.add(f'    <string name="{element.id}_hint">{element.getProperty("hint")}</string>')
         
         strings_xml = '''<?xml version="1.0" encoding="utf-8"?>
 <resources>\n'''
@@ -94,8 +131,8 @@ public class {activity_name} extends AppCompatActivity {{
         """Genera colors.xml con todos los colores utilizados"""
         colors = set()
         for element in self.elements:
-            bg_color = element.properties.get("backgroundColor")
-            text_color = element.properties.get("textColor")
+            bg_color = element.getProperty("backgroundColor")
+            text_color = element.getProperty("textColor")
             
             if bg_color and bg_color.startswith("#"):
                 colors.add(f'    <color name="{element.id}_bg">{bg_color}</color>')
@@ -206,51 +243,138 @@ dependencies {
         with open(os.path.join(directory, "app", "build.gradle"), "w") as f:
             f.write(gradle)
 
+class _PropertiesView(MutableMapping):
+    """Propiedades de un UIElement sin copiar los valores por defecto; escribir pasa por setProperty"""
+
+    __slots__ = ("_element",)
+
+    def __init__(self, element):
+        self._element = element
+
+    def __getitem__(self, key):
+        props = self._element._props
+        if props is not None and key in props:
+            return props[key]
+        return DEFAULT_PROPERTIES[key]
+
+    def __setitem__(self, key, value):
+        self._element.setProperty(key, value)
+
+    def __delitem__(self, key):
+        props = self._element._props
+        if props is None or key not in props:
+            raise KeyError(key)
+        del props[key]
+        if self._element._store is not None and key == "backgroundColor":
+            self._element._store.sync(self._element)
+
+    def __iter__(self):
+        props = self._element._props or {}
+        yield from props
+        for key in DEFAULT_PROPERTIES:
+            if key not in props:
+                yield key
+
+    def __len__(self):
+        props = self._element._props or {}
+        return len(props) + sum(1 for key in DEFAULT_PROPERTIES if key not in props)
+
 class UIElement:
     """Clase que representa un elemento de UI con todas sus propiedades"""
+
+    __slots__ = ("uid", "type", "_x", "_y", "_width", "_height", "_props",
+                 "androidWidgetType", "graphicsItem", "_store")
+
     def __init__(self, element_type, x, y, width, height):
-        self.id = str(uuid.uuid4())[:8] 
-        self.type = element_type
-        self.x = x
-        self.y = y
-        self.width = width
-        self.height = height
-        self.properties = {
-            "backgroundColor": "#FFFFFF",
-            "textColor": "#000000",
-            "textSize": "14sp",
-            "text": "",
-            "cornerRadius": "0dp",
-            "hint": "",
-            "inputType": "text",
-            "orientation": "horizontal"
-        }
+        self.uid = next(_element_ids)
+        self.type = sys.intern(element_type)
+        self._store = None
+        self._x = x
+        self._y = y
+        self._width = width
+        self._height = height
+        # Solo se guardan los valores modificados; el resto sale de DEFAULT_PROPERTIES
+        self._props = None
         self.androidWidgetType = self.determineAndroidWidgetType()
         self.graphicsItem = None
-        
+
+    @property
+    def id(self):
+        """Identificador legible para XML/Java derivado del id entero"""
+        return f"{self.type}_{self.uid}"
+
+    # La geometría se sincroniza con el store en cada asignación
+    @property
+    def x(self):
+        return self._x
+
+    @x.setter
+    def x(self, value):
+        self._x = value
+        if self._store is not None:
+            self._store.sync_geometry(self)
+
+    @property
+    def y(self):
+        return self._y
+
+    @y.setter
+    def y(self, value):
+        self._y = value
+        if self._store is not None:
+            self._store.sync_geometry(self)
+
+    @property
+    def width(self):
+        return self._width
+
+    @width.setter
+    def width(self, value):
+        self._width = value
+        if self._store is not None:
+            self._store.sync_geometry(self)
+
+    @property
+    def height(self):
+        return self._height
+
+    @height.setter
+    def height(self, value):
+        self._height = value
+        if self._store is not None:
+            self._store.sync_geometry(self)
+
+    @property
+    def properties(self):
+        """Vista escribible de las propiedades (valores propios sobre los valores por defecto)"""
+        return _PropertiesView(self)
+
+    def setGeometry(self, x, y, width, height):
+        """Actualiza la geometría y la sincroniza con el store si pertenece a uno"""
+        self._x = x
+        self._y = y
+        self._width = width
+        self._height = height
+        if self._store is not None:
+            self._store.sync_geometry(self)
+
     def determineAndroidWidgetType(self):
         """Determina el tipo de widget Android basado en el tipo de elemento"""
-        mapping = {
-            "rectangle": "View",
-            "text": "TextView",
-            "button": "Button",
-            "circle": "ImageView",
-            "input": "EditText",
-            "switch": "Switch",
-            "checkbox": "CheckBox",
-            "radio": "RadioButton",
-            "slider": "SeekBar",
-            "image": "ImageView",
-            "list": "ListView",
-            "card": "CardView"
-        }
-        return mapping.get(self.type, "View")
+        return _WIDGET_TYPES.get(self.type, "View")
     
     def setProperty(self, key, value):
-        self.properties[key] = value
+        if self._props is None:
+            self._props = {}
+        if isinstance(value, str):
+            value = sys.intern(value)
+        self._props[sys.intern(key)] = value
+        if self._store is not None and key == "backgroundColor":
+            self._store.sync(self)
         
-    def getProperty(self, key):
-        return self.properties.get(key, "")
+    def getProperty(self, key, default=""):
+        if self._props is not None and key in self._props:
+            return self._props[key]
+        return DEFAULT_PROPERTIES.get(key, default)
         
     def toXML(self):
         """Convierte el elemento a código XML Android"""
@@ -267,8 +391,8 @@ class UIElement:
     
     def generateGenericXML(self):
         """Genera XML genérico para cualquier View"""
-        bg_color = self.properties.get("backgroundColor", "#FFFFFF")
-        corner_radius = self.properties.get("cornerRadius", "0dp")
+        bg_color = self.getProperty("backgroundColor", "#FFFFFF")
+        corner_radius = self.getProperty("cornerRadius", "0dp")
         
         if corner_radius != "0dp":
            
@@ -288,9 +412,9 @@ class UIElement:
     
     def generateTextViewXML(self):
         """Genera XML para TextView"""
-        text = self.properties.get("text", "")
-        text_color = self.properties.get("textColor", "#000000")
-        text_size = self.properties.get("textSize", "14sp")
+        text = self.getProperty("text", "")
+        text_color = self.getProperty("textColor", "#000000")
+        text_size = self.getProperty("textSize", "14sp")
         
         return f'''<TextView
             android:id="@+id/{self.id}"
@@ -304,9 +428,9 @@ class UIElement:
     
     def generateButtonXML(self):
         """Genera XML para Button"""
-        text = self.properties.get("text", "Button")
-        bg_color = self.properties.get("backgroundColor", "#6200EE")
-        text_color = self.properties.get("textColor", "#FFFFFF")
+        text = self.getProperty("text", "Button")
+        bg_color = self.getProperty("backgroundColor", "#6200EE")
+        text_color = self.getProperty("textColor", "#FFFFFF")
         
         return f'''<Button
             android:id="@+id/{self.id}"
@@ -320,8 +444,8 @@ class UIElement:
     
     def generateEditTextXML(self):
         """Genera XML para EditText"""
-        hint = self.properties.get("hint", "")
-        input_type = self.properties.get("inputType", "text")
+        hint = self.getProperty("hint", "")
+        input_type = self.getProperty("inputType", "text")
         
         return f'''<EditText
             android:id="@+id/{self.id}"
@@ -363,3 +487,177 @@ class UIElement:
         """Genera código Java para EditText"""
         return f'''EditText {self.id} = findViewById(R.id.{self.id});
             // Add text change listeners or validation as needed\n'''
+
+def _color_to_argb(value):
+    """Convierte '#RRGGBB' o '#AARRGGBB' a un entero ARGB (0 si no es válido)"""
+    if not isinstance(value, str) or not value.startswith("#"):
+        return 0
+    digits = value[1:]
+    if len(digits) == 6:
+        digits = "FF" + digits
+    if len(digits) != 8:
+        return 0
+    try:
+        return int(digits, 16)
+    except ValueError:
+        return 0
+
+class ElementStore:
+    """Almacén columnar de UIElement: geometría, tipo y color en arrays compactos con índice inverso por id
+
+    Borrar deja una lápida (None) en la fila para conservar el orden de
+    inserción, que es el orden del layout generado; las lápidas se compactan
+    cuando superan a los elementos vivos.
+    """
+
+    COMPACT_MIN = 32
+
+    def __init__(self):
+        self._elements = []
+        self._index = {}  # uid -> fila
+        self._dead = 0
+        self._x = array("d")
+        self._y = array("d")
+        self._w = array("d")
+        self._h = array("d")
+        self._type = array("H")
+        self._bg = array("L")
+        self._type_codes = {}
+        self._type_names = []
+
+    def _columns(self):
+        return (self._x, self._y, self._w, self._h, self._type, self._bg)
+
+    def __len__(self):
+        return len(self._elements) - self._dead
+
+    def __iter__(self):
+        return (element for element in self._elements if element is not None)
+
+    def __getitem__(self, row):
+        self._compact()
+        return self._elements[row]
+
+    def __contains__(self, element):
+        return element._store is self
+
+    def _type_code(self, element_type):
+        code = self._type_codes.get(element_type)
+        if code is None:
+            code = len(self._type_names)
+            self._type_codes[element_type] = code
+            self._type_names.append(element_type)
+        return code
+
+    def add(self, element):
+        """Añade un elemento al final del almacén"""
+        if element._store is self:
+            return
+        if element._store is not None:
+            element._store.remove(element)
+        self._index[element.uid] = len(self._elements)
+        self._elements.append(element)
+        self._x.append(element.x)
+        self._y.append(element.y)
+        self._w.append(element.width)
+        self._h.append(element.height)
+        self._type.append(self._type_code(element.type))
+        self._bg.append(_color_to_argb(element.getProperty("backgroundColor")))
+        element._store = self
+
+    def remove(self, element):
+        """Elimina un elemento en O(1) dejando una lápida; el resto conserva su orden"""
+        row = self._index.pop(element.uid, None)
+        if row is None:
+            return
+        self._elements[row] = None
+        # NaN no cumple ninguna comparación: las consultas geométricas la ignoran solas
+        self._x[row] = self._y[row] = self._w[row] = self._h[row] = float("nan")
+        self._dead += 1
+        element._store = None
+        if self._dead >= self.COMPACT_MIN and self._dead > len(self):
+            self._compact()
+
+    def _compact(self):
+        """Quita las lápidas conservando el orden y rehace el índice"""
+        if not self._dead:
+            return
+        live = [row for row, element in enumerate(self._elements) if element is not None]
+        self._elements = [self._elements[row] for row in live]
+        self._x, self._y, self._w, self._h, self._type, self._bg = (
+            array(column.typecode, (column[row] for row in live)) for column in self._columns()
+        )
+        self._index = {element.uid: row for row, element in enumerate(self._elements)}
+        self._dead = 0
+
+    def clear(self):
+        for element in self._elements:
+            if element is not None:
+                element._store = None
+        self._elements.clear()
+        self._index.clear()
+        self._dead = 0
+        for column in self._columns():
+            del column[:]
+
+    def sync_geometry(self, element):
+        """Vuelve a copiar solo la geometría del elemento en las columnas"""
+        row = self._index.get(element.uid)
+        if row is None:
+            return
+        self._x[row] = element.x
+        self._y[row] = element.y
+        self._w[row] = element.width
+        self._h[row] = element.height
+
+    def sync(self, element):
+        """Vuelve a copiar la geometría y el color del elemento en las columnas"""
+        row = self._index.get(element.uid)
+        if row is None:
+            return
+        self._x[row] = element.x
+        self._y[row] = element.y
+        self._w[row] = element.width
+        self._h[row] = element.height
+        self._type[row] = self._type_code(element.type)
+        self._bg[row] = _color_to_argb(element.getProperty("backgroundColor"))
+
+    def get(self, uid):
+        """Busca un elemento por su id entero"""
+        row = self._index.get(uid)
+        return None if row is None else self._elements[row]
+
+    def items_at(self, x, y):
+        """Elementos que contienen el punto, del más reciente al más antiguo"""
+        hits = []
+        for row in range(len(self._elements) - 1, -1, -1):
+            left = self._x[row]
+            top = self._y[row]
+            if left <= x <= left + self._w[row] and top <= y <= top + self._h[row]:
+                hits.append(self._elements[row])
+        return hits
+
+    def items_in_rect(self, left, top, right, bottom):
+        """Elementos cuyo rectángulo intersecta el área dada"""
+        elements = self._elements
+        return [
+            elements[row]
+            for row, (x, y, w, h) in enumerate(zip(self._x, self._y, self._w, self._h))
+            if x <= right and x + w >= left and y <= bottom and y + h >= top
+        ]
+
+    def of_type(self, element_type):
+        """Elementos de un tipo concreto usando la columna de tipos"""
+        code = self._type_codes.get(element_type)
+        if code is None:
+            return []
+        elements = self._elements
+        return [elements[row] for row, value in enumerate(self._type)
+                if value == code and elements[row] is not None]
+
+    def with_background(self, color):
+        """Elementos con el color de fondo indicado ('#RRGGBB' o ARGB entero)"""
+        argb = color if isinstance(color, int) else _color_to_argb(color)
+        elements = self._elements
+        return [elements[row] for row, value in enumerate(self._bg)
+                if value == argb and elements[row] is not None]
@@ -18,7 +18,7 @@ from transformers import AutoTokenizer, AutoModelForCausalLM
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
     QPushButton, QGraphicsView, QGraphicsScene, QDockWidget,
-    QListWidget, QTextEdit, QLineEdit, QComboBox, QColorDialog,
+    QListWidget, QListView, QTextEdit, QLineEdit, QComboBox, QColorDialog,
     QInputDialog, QMessageBox, QMenu, QStatusBar, QApplication,
     QFileSystemModel, QTreeView, QSplitter, QToolBar, QGraphicsRectItem,
     QGraphicsTextItem, QGraphicsEllipseItem, QGraphicsItem, QSlider,
@@ -26,7 +26,8 @@ from PySide6.QtWidgets import (
     QSizePolicy, QTabWidget, QTextEdit, QDialog,
     QPlainTextEdit, QListWidgetItem, QStyledItemDelegate, QToolBox, 
     QScrollArea, QButtonGroup, QGridLayout, QToolBar, QStatusBar,  
-    QGraphicsPathItem, QGraphicsLineItem, QGraphicsItemGroup,QFrame, QGraphicsTextItem
+    QGraphicsPathItem, QGraphicsLineItem, QGraphicsItemGroup,QFrame, QGraphicsTextItem,
+    QGraphicsPolygonItem
 )
 
 from PySide6.QtSvg import QSvgGenerator
@@ -35,7 +36,7 @@ from PySide6.QtGui import (
     QIcon, QAction, QCursor, QColor, QBrush, QTextCursor, QFont,
     QPen, QPainter, QTextFormat, QSyntaxHighlighter, QTextCharFormat, 
     QPalette, QShortcut, QKeySequence, QPixmap, QPainter, 
-    QLinearGradient, QRadialGradient, QMouseEvent, QPainterPath, QPolygonF
+    QLinearGradient, QRadialGradient, QMouseEvent, QPainterPath, QPolygonF, QTransform
 )
 from PySide6.QtCore import (
     Qt, QSize, QPoint, Signal, QDir, QRectF, QSettings, QThread, 
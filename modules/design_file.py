@@ -0,0 +1,577 @@
+import json
+import math
+import os
+import struct
+import zlib
+
+from PySide6.QtCore import QByteArray, QDataStream, QIODevice, QObject, QPointF, QRectF, QTimer, Qt
+from PySide6.QtGui import QBrush, QColor, QFont, QPainterPath, QPen, QTransform
+from PySide6.QtWidgets import (QGraphicsEllipseItem, QGraphicsItem, QGraphicsLineItem,
+                               QGraphicsPathItem, QGraphicsRectItem, QGraphicsTextItem)
+
+from .canvas_rendering import LodPathItem
+from .code_generator import UIElement
+
+# Formato de diseño: cabecera + chunks con prefijo de longitud
+#
+#   cabecera: magic "CSDF", versión u16, reservado u16
+#   chunk:    tipo (4 bytes), flags u8, longitud u32, longitud sin comprimir u32,
+#             bounds (left, top, right, bottom) f32, número de registros u32, datos
+#
+# Los tipos desconocidos se saltan, así que versiones futuras pueden añadir chunks.
+# Versión 2: registros de texto (KIND_TEXT) dentro de los chunks ITEM.
+MAGIC = b"CSDF"
+FORMAT_VERSION = 2
+FILE_HEADER = struct.Struct("<4sHH")
+CHUNK_HEADER = struct.Struct("<4sBIIffffI")
+
+CHUNK_META = b"META"
+CHUNK_STYLES = b"STYL"
+CHUNK_ITEMS = b"ITEM"
+CHUNK_ELEMENTS = b"ELEM"
+
+FLAG_ZLIB = 0x01
+
+# Agrupación espacial de items en chunks para poder cargar solo lo visible
+CHUNK_CELL_SIZE = 512
+ITEMS_PER_CHUNK = 512
+COMPRESS_MIN_SIZE = 256
+
+KIND_PATH, KIND_RECT, KIND_ELLIPSE, KIND_LINE, KIND_TEXT = range(5)
+
+# Los paths se guardan con QDataStream; la versión se fija para que el formato no cambie con Qt
+PATH_STREAM_VERSION = QDataStream.Qt_5_15
+
+ITEM_RECORD = struct.Struct("<BIIIffffff")  # tipo, pen, brush, flags, z, opacidad, x, y, rotación, escala
+TRANSFORM_RECORD = struct.Struct("<9f")
+RECT_RECORD = struct.Struct("<4f")
+PEN_RECORD = struct.Struct("<IfBBBB")       # argb, ancho, estilo, cap, join, cosmético
+BRUSH_RECORD = struct.Struct("<IB")         # argb, estilo
+TEXT_RECORD = struct.Struct("<IHIf")        # bytes del texto, bytes de la fuente, argb, ancho de texto
+
+
+class DesignFormatError(Exception):
+    """El fichero no es un diseño válido o es de una versión más nueva"""
+
+
+class UnsupportedItemsError(Exception):
+    """El lienzo tiene items que el formato no sabe guardar; no se escribe nada"""
+
+
+class StyleTable:
+    """Pens y brushes deduplicados; los items guardan solo su índice"""
+
+    def __init__(self):
+        self.pens = []
+        self.brushes = []
+        self._pen_keys = {}
+        self._brush_keys = {}
+        # Items consecutivos suelen compartir estilo: comparar con el último evita construir la clave
+        self._last_pen = (None, 0)
+        self._last_brush = (None, 0)
+
+    def pen_index(self, pen):
+        last, index = self._last_pen
+        if last is not None and pen == last:
+            return index
+        key = (pen.color().rgba(), pen.widthF(), pen.style().value,
+               pen.capStyle().value, pen.joinStyle().value, pen.isCosmetic())
+        index = self._pen_keys.get(key)
+        if index is None:
+            index = self._pen_keys[key] = len(self.pens)
+            self.pens.append(key)
+        self._last_pen = (pen, index)
+        return index
+
+    def brush_index(self, brush):
+        last, index = self._last_brush
+        if last is not None and brush == last:
+            return index
+        key = (brush.color().rgba(), brush.style().value)
+        index = self._brush_keys.get(key)
+        if index is None:
+            index = self._brush_keys[key] = len(self.brushes)
+            self.brushes.append(key)
+        self._last_brush = (brush, index)
+        return index
+
+    def pen(self, index):
+        rgba, width, style, cap, join, cosmetic = self.pens[index]
+        pen = QPen(QColor.fromRgba(rgba), width, Qt.PenStyle(style),
+                   Qt.PenCapStyle(cap), Qt.PenJoinStyle(join))
+        pen.setCosmetic(cosmetic)
+        return pen
+
+    def brush(self, index):
+        rgba, style = self.brushes[index]
+        return QBrush(QColor.fromRgba(rgba), Qt.BrushStyle(style))
+
+    def encode(self):
+        parts = [struct.pack("<II", len(self.pens), len(self.brushes))]
+        parts.extend(PEN_RECORD.pack(*key) for key in self.pens)
+        parts.extend(BRUSH_RECORD.pack(*key) for key in self.brushes)
+        return b"".join(parts)
+
+    @classmethod
+    def decode(cls, data):
+        table = cls()
+        pen_count, brush_count = struct.unpack_from("<II", data, 0)
+        offset = 8
+        for _ in range(pen_count):
+            rgba, width, style, cap, join, cosmetic = PEN_RECORD.unpack_from(data, offset)
+            key = (rgba, width, style, cap, join, bool(cosmetic))
+            table._pen_keys[key] = len(table.pens)
+            table.pens.append(key)
+            offset += PEN_RECORD.size
+        for _ in range(brush_count):
+            key = BRUSH_RECORD.unpack_from(data, offset)
+            table._brush_keys[key] = len(table.brushes)
+            table.brushes.append(key)
+            offset += BRUSH_RECORD.size
+        return table
+
+
+def encode_item(item, styles, parts, original=None):
+    """Añade a parts el registro binario de un item; devuelve False si el tipo no se soporta
+
+    original es la entrada (pen, era movible) de canvas.selection_originals si
+    el item está seleccionado: se guarda su aspecto real, no el resaltado.
+    """
+    if isinstance(item, QGraphicsPathItem):
+        kind = KIND_PATH
+    elif isinstance(item, QGraphicsRectItem):
+        kind = KIND_RECT
+    elif isinstance(item, QGraphicsEllipseItem):
+        kind = KIND_ELLIPSE
+    elif isinstance(item, QGraphicsLineItem):
+        kind = KIND_LINE
+    elif isinstance(item, QGraphicsTextItem):
+        kind = KIND_TEXT
+    else:
+        return False
+
+    pen = item.pen() if kind != KIND_TEXT else None
+    flags = item.flags().value
+    if original is not None:
+        original_pen, was_movable = original
+        if original_pen is not None:
+            pen = original_pen
+        movable = QGraphicsItem.ItemIsMovable.value
+        flags = (flags | movable) if was_movable else (flags & ~movable)
+
+    brush = styles.brush_index(item.brush()) if hasattr(item, 'brush') else 0
+    transform = item.transform()
+    flags |= 0x80000000 if not transform.isIdentity() else 0
+    pos = item.pos()
+    pen_index = styles.pen_index(pen) if pen is not None else 0
+    parts.append(ITEM_RECORD.pack(kind, pen_index, brush, flags,
+                                  item.zValue(), item.opacity(), pos.x(), pos.y(),
+                                  item.rotation(), item.scale()))
+    if not transform.isIdentity():
+        parts.append(TRANSFORM_RECORD.pack(
+            transform.m11(), transform.m12(), transform.m13(),
+            transform.m21(), transform.m22(), transform.m23(),
+            transform.m31(), transform.m32(), transform.m33()))
+
+    if kind == KIND_PATH:
+        # Serialización nativa de Qt: mucho más rápida que recorrer los elementos en Python
+        raw = QByteArray()
+        stream = QDataStream(raw, QIODevice.WriteOnly)
+        stream.setVersion(PATH_STREAM_VERSION)
+        stream << item.path()
+        parts.append(struct.pack("<I", raw.size()))
+        parts.append(raw.data())
+    elif kind == KIND_LINE:
+        line = item.line()
+        parts.append(RECT_RECORD.pack(line.x1(), line.y1(), line.x2(), line.y2()))
+    elif kind == KIND_TEXT:
+        # Texto plano con la fuente y el color por defecto del item
+        text = item.toPlainText().encode("utf-8")
+        font = item.font().toString().encode("utf-8")
+        parts.append(TEXT_RECORD.pack(len(text), len(font), item.defaultTextColor().rgba(), item.textWidth()))
+        parts.append(text)
+        parts.append(font)
+    else:
+        rect = item.rect()
+        parts.append(RECT_RECORD.pack(rect.x(), rect.y(), rect.width(), rect.height()))
+    return True
+
+
+def decode_items(data, count, styles):
+    """Reconstruye los items de un chunk ITEM ya descomprimido"""
+    items = []
+    offset = 0
+    for _ in range(count):
+        kind, pen, brush, flags, z, opacity, x, y, rotation, scale = ITEM_RECORD.unpack_from(data, offset)
+        offset += ITEM_RECORD.size
+        transform = None
+        if flags & 0x80000000:
+            transform = QTransform(*TRANSFORM_RECORD.unpack_from(data, offset))
+            offset += TRANSFORM_RECORD.size
+            flags &= 0x7FFFFFFF
+
+        if kind == KIND_PATH:
+            (length,) = struct.unpack_from("<I", data, offset)
+            offset += 4
+            stream = QDataStream(QByteArray(bytes(data[offset:offset + length])))
+            stream.setVersion(PATH_STREAM_VERSION)
+            path = QPainterPath()
+            stream >> path
+            offset += length
+            item = LodPathItem(path)
+        elif kind == KIND_TEXT:
+            text_length, font_length, rgba, text_width = TEXT_RECORD.unpack_from(data, offset)
+            offset += TEXT_RECORD.size
+            item = QGraphicsTextItem(bytes(data[offset:offset + text_length]).decode("utf-8"))
+            offset += text_length
+            font = QFont()
+            font.fromString(bytes(data[offset:offset + font_length]).decode("utf-8"))
+            offset += font_length
+            item.setFont(font)
+            item.setDefaultTextColor(QColor.fromRgba(rgba))
+            item.setTextWidth(text_width)
+        else:
+            a, b, c, d = RECT_RECORD.unpack_from(data, offset)
+            offset += RECT_RECORD.size
+            if kind == KIND_LINE:
+                item = QGraphicsLineItem(a, b, c, d)
+            elif kind == KIND_ELLIPSE:
+                item = QGraphicsEllipseItem(a, b, c, d)
+            else:
+                item = QGraphicsRectItem(a, b, c, d)
+
+        if kind != KIND_TEXT:
+            item.setPen(styles.pen(pen))
+        if kind not in (KIND_LINE, KIND_TEXT):
+            item.setBrush(styles.brush(brush))
+        item.setFlags(QGraphicsItem.GraphicsItemFlag(flags))
+        if transform is not None:
+            item.setTransform(transform)
+        item.setPos(x, y)
+        item.setRotation(rotation)
+        item.setScale(scale)
+        item.setZValue(z)
+        item.setOpacity(opacity)
+        items.append(item)
+    return items
+
+
+def encode_elements(elements):
+    """Chunk ELEM: tabla de cadenas + geometría y propiedades modificadas de cada UIElement"""
+    strings = {}
+
+    def string_index(value):
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    body = []
+    for element in elements:
+        props = element._props or {}
+        body.append(struct.pack("<I4dH", string_index(element.type), element.x, element.y,
+                                element.width, element.height, len(props)))
+        for key, value in props.items():
+            body.append(struct.pack("<I", string_index(key)))
+            if isinstance(value, bool):
+                body.append(struct.pack("<cB", b"b", value))
+            elif isinstance(value, int):
+                body.append(struct.pack("<cq", b"i", value))
+            elif isinstance(value, float):
+                body.append(struct.pack("<cd", b"f", value))
+            else:
+                body.append(struct.pack("<cI", b"s", string_index(str(value))))
+
+    parts = [struct.pack("<I", len(strings))]
+    for value in strings:
+        raw = value.encode("utf-8")
+        parts.append(struct.pack("<H", len(raw)))
+        parts.append(raw)
+    return b"".join(parts + body)
+
+
+def decode_elements(data, count):
+    (string_count,) = struct.unpack_from("<I", data, 0)
+    offset = 4
+    strings = []
+    for _ in range(string_count):
+        (length,) = struct.unpack_from("<H", data, offset)
+        offset += 2
+        strings.append(bytes(data[offset:offset + length]).decode("utf-8"))
+        offset += length
+
+    elements = []
+    for _ in range(count):
+        type_index, x, y, width, height, prop_count = struct.unpack_from("<I4dH", data, offset)
+        offset += struct.calcsize("<I4dH")
+        element = UIElement(strings[type_index], x, y, width, height)
+        for _ in range(prop_count):
+            (key_index,) = struct.unpack_from("<I", data, offset)
+            tag = bytes(data[offset + 4:offset + 5])
+            offset += 5
+            if tag == b"b":
+                value = bool(data[offset])
+                offset += 1
+            elif tag == b"i":
+                (value,) = struct.unpack_from("<q", data, offset)
+                offset += 8
+            elif tag == b"f":
+                (value,) = struct.unpack_from("<d", data, offset)
+                offset += 8
+            else:
+                value = strings[struct.unpack_from("<I", data, offset)[0]]
+                offset += 4
+            element.setProperty(strings[key_index], value)
+        elements.append(element)
+    return elements
+
+
+class DesignChunk:
+    """Chunk leído del fichero: cabecera + datos sin decodificar"""
+
+    __slots__ = ("kind", "flags", "raw_length", "bounds", "count", "payload")
+
+    def __init__(self, kind, flags, raw_length, bounds, count, payload):
+        self.kind = kind
+        self.flags = flags
+        self.raw_length = raw_length
+        self.bounds = bounds
+        self.count = count
+        self.payload = payload
+
+    def data(self):
+        if self.flags & FLAG_ZLIB:
+            return memoryview(zlib.decompress(self.payload))
+        return memoryview(self.payload)
+
+    def encode(self):
+        """Cabecera + datos tal cual se leyeron (para reescribir chunks no cargados)"""
+        b = self.bounds
+        return CHUNK_HEADER.pack(self.kind, self.flags, len(self.payload), self.raw_length,
+                                 b.left(), b.top(), b.right(), b.bottom(), self.count) + bytes(self.payload)
+
+
+def encode_chunk(kind, data, count=0, bounds=None, compress_level=6):
+    flags = 0
+    payload = data
+    if compress_level and len(data) >= COMPRESS_MIN_SIZE:
+        compressed = zlib.compress(data, compress_level)
+        if len(compressed) < len(data):
+            payload = compressed
+            flags |= FLAG_ZLIB
+    b = bounds if bounds is not None else QRectF()
+    return CHUNK_HEADER.pack(kind, flags, len(payload), len(data),
+                             b.left(), b.top(), b.right(), b.bottom(), count) + payload
+
+
+class DesignDocument:
+    """Diseño abierto: metadatos, estilos y elementos cargados; chunks de items bajo demanda"""
+
+    def __init__(self, meta=None, styles=None, elements=None, item_chunks=None):
+        self.meta = meta or {}
+        self.styles = styles or StyleTable()
+        self.elements = elements or []
+        self.item_chunks = item_chunks or []
+
+    @classmethod
+    def open(cls, path):
+        with open(path, "rb") as f:
+            data = memoryview(f.read())
+        if len(data) < FILE_HEADER.size:
+            raise DesignFormatError(f"Fichero demasiado corto: {path}")
+        magic, version, _ = FILE_HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise DesignFormatError(f"No es un fichero de diseño: {path}")
+        if version > FORMAT_VERSION:
+            raise DesignFormatError(f"Versión de formato {version} no soportada (máximo {FORMAT_VERSION})")
+
+        document = cls()
+        element_chunks = []
+        offset = FILE_HEADER.size
+        while offset < len(data):
+            kind, flags, length, raw_length, left, top, right, bottom, count = \
+                CHUNK_HEADER.unpack_from(data, offset)
+            offset += CHUNK_HEADER.size
+            if offset + length > len(data):
+                raise DesignFormatError(f"Chunk {kind!r} truncado en {path}")
+            chunk = DesignChunk(kind, flags, raw_length,
+                                QRectF(QPointF(left, top), QPointF(right, bottom)),
+                                count, data[offset:offset + length])
+            offset += length
+
+            if kind == CHUNK_META:
+                document.meta = json.loads(bytes(chunk.data()).decode("utf-8"))
+            elif kind == CHUNK_STYLES:
+                document.styles = StyleTable.decode(chunk.data())
+            elif kind == CHUNK_ITEMS:
+                document.item_chunks.append(chunk)
+            elif kind == CHUNK_ELEMENTS:
+                element_chunks.append(chunk)
+
+        for chunk in element_chunks:
+            document.elements.extend(decode_elements(chunk.data(), chunk.count))
+        return document
+
+    def load_chunk(self, chunk):
+        return decode_items(chunk.data(), chunk.count, self.styles)
+
+
+def _spatial_groups(items):
+    """Agrupa items por celda de CHUNK_CELL_SIZE según su centro, respetando el orden de inserción"""
+    cells = {}
+    for item in items:
+        center = item.sceneBoundingRect().center()
+        key = (math.floor(center.x() / CHUNK_CELL_SIZE), math.floor(center.y() / CHUNK_CELL_SIZE))
+        cells.setdefault(key, []).append(item)
+    for group in cells.values():
+        for start in range(0, len(group), ITEMS_PER_CHUNK):
+            yield group[start:start + ITEMS_PER_CHUNK]
+
+
+def save_design(path, canvas, elements=(), meta=None, compress_level=6):
+    """Guarda el contenido del lienzo y los UIElement en un fichero de diseño
+
+    Los chunks que aún no se han cargado (apertura diferida) se copian tal cual,
+    por lo que guardar un diseño recién abierto no exige decodificarlo entero.
+    Si algún item no se puede guardar lanza UnsupportedItemsError sin tocar path.
+    """
+    loader = getattr(canvas, 'design_loader', None)
+    styles = loader.document.styles if loader is not None else StyleTable()
+    pending = loader.pending_chunks() if loader is not None else []
+
+    item_chunks = []
+    skipped = []
+    originals = getattr(canvas, 'selection_originals', {})
+    for group in _spatial_groups(list(canvas.index)):
+        parts = []
+        bounds = QRectF()
+        count = 0
+        for item in group:
+            if encode_item(item, styles, parts, originals.get(item)):
+                bounds = bounds.united(item.sceneBoundingRect())
+                count += 1
+            else:
+                skipped.append(type(item).__name__)
+        if count:
+            item_chunks.append(encode_chunk(CHUNK_ITEMS, b"".join(parts), count, bounds, compress_level))
+
+    if skipped:
+        raise UnsupportedItemsError(
+            f"{len(skipped)} elementos del lienzo no se pueden guardar "
+            f"({', '.join(sorted(set(skipped)))}); el diseño no se ha guardado")
+
+    elements = list(elements)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(FILE_HEADER.pack(MAGIC, FORMAT_VERSION, 0))
+        f.write(encode_chunk(CHUNK_META, json.dumps(meta or {}).encode("utf-8"), compress_level=0))
+        # Los estilos van antes que los items: los chunks diferidos usan sus índices
+        f.write(encode_chunk(CHUNK_STYLES, styles.encode(), compress_level=compress_level))
+        if elements:
+            f.write(encode_chunk(CHUNK_ELEMENTS, encode_elements(elements), len(elements),
+                                 compress_level=compress_level))
+        for chunk in pending:
+            f.write(chunk.encode())
+        for chunk in item_chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+    return path
+
+
+class DesignLoader(QObject):
+    """Materializa los chunks de un diseño en el lienzo: primero lo visible, el resto en segundo plano"""
+
+    def __init__(self, canvas, document, parent=None):
+        super().__init__(parent or canvas)
+        self.canvas = canvas
+        self.document = document
+        self._pending = list(document.item_chunks)
+
+        self.background_timer = QTimer(self)
+        self.background_timer.setInterval(0)
+        self.background_timer.timeout.connect(self._load_next)
+
+    def pending_chunks(self):
+        return list(self._pending)
+
+    def is_complete(self):
+        return not self._pending
+
+    def _materialize(self, chunk):
+        for item in self.document.load_chunk(chunk):
+            self.canvas.add_content_item(item)
+
+    def load_visible(self, rect):
+        """Carga los chunks cuyo bounding box intersecta rect (coordenadas de escena)"""
+        visible = [chunk for chunk in self._pending if chunk.bounds.intersects(rect)]
+        for chunk in visible:
+            self._pending.remove(chunk)
+            self._materialize(chunk)
+        return len(visible)
+
+    def load_all(self):
+        self.background_timer.stop()
+        while self._pending:
+            self._materialize(self._pending.pop(0))
+
+    def start_background_loading(self):
+        """Carga un chunk por vuelta del bucle de eventos hasta completar el diseño"""
+        if self._pending:
+            self.background_timer.start()
+
+    def stop(self):
+        self.background_timer.stop()
+
+    def _load_next(self):
+        if not self._pending:
+            self.background_timer.stop()
+            return
+        self._materialize(self._pending.pop(0))
+        if not self._pending:
+            self.background_timer.stop()
+
+
+def load_document(canvas, document, visible_rect=None, background=True):
+    """Carga un diseño ya abierto en el lienzo (que debe estar vacío), primero la zona visible"""
+    loader = DesignLoader(canvas, document)
+    canvas.design_loader = loader
+    if visible_rect is None:
+        visible_rect = canvas.mapToScene(canvas.viewport().rect()).boundingRect()
+    loader.load_visible(visible_rect)
+    if background:
+        loader.start_background_loading()
+    return document
+
+
+def open_design(path, canvas, visible_rect=None, background=True):
+    return load_document(canvas, DesignDocument.open(path), visible_rect, background)
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+    import time
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PySide6.QtWidgets import QApplication
+    from modules.illustrator_tools import AdvancedIllustratorCanvas
+    from modules.canvas_index import generate_benchmark_scene
+
+    app = QApplication(sys.argv)
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    canvas = AdvancedIllustratorCanvas()
+    generate_benchmark_scene(canvas, count)
+    path = os.path.join(tempfile.mkdtemp(), "benchmark.csdf")
+
+    start = time.perf_counter()
+    save_design(path, canvas)
+    print(f"💾 Guardado: {time.perf_counter() - start:.2f}s, {os.path.getsize(path) / 1024:.0f} KB")
+
+    target = AdvancedIllustratorCanvas()
+    target.resize(800, 600)
+    start = time.perf_counter()
+    open_design(path, target, background=False)
+    print(f"📂 Apertura (zona visible): {time.perf_counter() - start:.2f}s, {len(target.index)} items")
+
+    start = time.perf_counter()
+    target.design_loader.load_all()
+    print(f"📂 Carga completa: {time.perf_counter() - start:.2f}s, {len(target.index)} items")
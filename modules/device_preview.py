@@ -0,0 +1,137 @@
+from PySide6.QtCore import QRectF, QSize, QTimer, Qt
+from PySide6.QtGui import QColor, QPainter, QPen, QPixmap
+from PySide6.QtWidgets import QStyleOptionGraphicsItem, QWidget
+
+# Perfiles de dispositivo: el diseño está en dp y cada perfil solo cambia la vista
+DEVICE_PROFILES = {
+    "phone": {"name": "Teléfono", "width_dp": 411, "height_dp": 731, "density": 3.0},
+    "tablet": {"name": "Tablet", "width_dp": 800, "height_dp": 1280, "density": 2.0},
+    "foldable": {"name": "Plegable", "width_dp": 673, "height_dp": 841, "density": 2.625},
+}
+
+
+def paint_content(canvas, painter, source):
+    """Dibuja los items de diseño del lienzo que caen en source, sin guías ni handles
+
+    Pinta los items directamente en vez de usar scene.render para no tener que
+    ocultar nada en la escena (eso dispararía scene.changed de nuevo).
+    """
+    option = QStyleOptionGraphicsItem()
+    for item in canvas.index.paint_order():
+        if not item.isVisible() or not item.sceneBoundingRect().intersects(source):
+            continue
+        painter.save()
+        painter.setTransform(item.sceneTransform(), True)
+        painter.setOpacity(item.effectiveOpacity())
+        item.paint(painter, option, None)
+        painter.restore()
+
+
+class DevicePreviewWidget(QWidget):
+    """Vista previa del mismo diseño en varios perfiles de dispositivo, lado a lado
+
+    Cada perfil se rasteriza a un QPixmap cacheado; los cambios de la escena
+    solo marcan la caché como obsoleta y se re-renderiza una vez agrupados.
+    """
+
+    SPACING = 24
+    LABEL_HEIGHT = 20
+    REFRESH_DELAY = 200
+
+    def __init__(self, canvas, profiles=None, scale=0.4, parent=None):
+        super().__init__(parent)
+        self.canvas = canvas
+        self.profiles = list(profiles or DEVICE_PROFILES)
+        self.scale = scale
+        self._cache = {}   # perfil -> QPixmap
+        self._stale = True
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(self.REFRESH_DELAY)
+        self.refresh_timer.timeout.connect(self.refresh)
+        canvas.scene.changed.connect(self.invalidate)
+
+    def set_profiles(self, profiles):
+        self.profiles = list(profiles)
+        self.updateGeometry()
+        self.invalidate()
+
+    def set_scale(self, scale):
+        """Escala dp -> píxeles de la vista previa"""
+        self.scale = scale
+        self._cache.clear()
+        self.updateGeometry()
+        self.invalidate()
+
+    def invalidate(self, *args):
+        self._stale = True
+        if self.isVisible():
+            self.refresh_timer.start()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self._stale:
+            self.refresh_timer.start()
+
+    def refresh(self):
+        """Re-renderiza todos los perfiles y repinta"""
+        self._stale = False
+        for key in self.profiles:
+            self._cache[key] = self.render_profile(key)
+        self.update()
+
+    def render_profile(self, key):
+        profile = DEVICE_PROFILES[key]
+        source = QRectF(0, 0, profile["width_dp"], profile["height_dp"])
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(round(source.width() * self.scale * ratio),
+                         round(source.height() * self.scale * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.white)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setClipRect(QRectF(0, 0, source.width() * self.scale, source.height() * self.scale))
+        painter.scale(self.scale, self.scale)
+        paint_content(self.canvas, painter, source)
+        painter.end()
+        return pixmap
+
+    def profile_rects(self):
+        """Rectángulo de cada perfil en coordenadas del widget"""
+        rects = {}
+        x = self.SPACING
+        for key in self.profiles:
+            profile = DEVICE_PROFILES[key]
+            width = profile["width_dp"] * self.scale
+            height = profile["height_dp"] * self.scale
+            rects[key] = QRectF(x, self.SPACING + self.LABEL_HEIGHT, width, height)
+            x += width + self.SPACING
+        return rects
+
+    def sizeHint(self):
+        rects = self.profile_rects()
+        if not rects:
+            return QSize(200, 200)
+        right = max(rect.right() for rect in rects.values())
+        bottom = max(rect.bottom() for rect in rects.values())
+        return QSize(int(right + self.SPACING), int(bottom + self.SPACING))
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("#2b2b2b"))
+        for key, rect in self.profile_rects().items():
+            profile = DEVICE_PROFILES[key]
+            painter.setPen(QColor("#dddddd"))
+            painter.drawText(QRectF(rect.left(), rect.top() - self.LABEL_HEIGHT, rect.width(), self.LABEL_HEIGHT),
+                             Qt.AlignLeft | Qt.AlignVCenter,
+                             f"{profile['name']} · {profile['width_dp']}×{profile['height_dp']}dp")
+            pixmap = self._cache.get(key)
+            if pixmap is not None:
+                painter.drawPixmap(rect.topLeft(), pixmap)
+            else:
+                painter.fillRect(rect, Qt.white)
+            painter.setPen(QPen(QColor("#888888"), 1))
+            painter.drawRect(rect)
+        painter.end()
@@ -1,8 +1,14 @@
 from .common_imports import *
+import time
+from .canvas_history import AddItemsCommand
+from .search_model import SearchListModel, SearchFilterProxyModel, connect_search
 
 class ElementsWindow(QMainWindow):
     """Ventana de elementos predefinidos con buscador"""
     
+    # Último uso de cada elemento en esta sesión: los más usados suben en la lista
+    recent_elements = {}
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parent = parent
@@ -21,7 +27,11 @@ class ElementsWindow(QMainWindow):
         search_layout = QHBoxLayout()
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Buscar elementos...")
-        self.search_input.textChanged.connect(self.filter_elements)
+        
+        self.elements_model = SearchListModel(self)
+        self.elements_proxy = SearchFilterProxyModel(self)
+        self.elements_proxy.setSourceModel(self.elements_model)
+        self.search_timer = connect_search(self.search_input, self.elements_proxy)
         search_layout.addWidget(self.search_input)
         
         clear_btn = QPushButton("X")
@@ -31,8 +41,10 @@ class ElementsWindow(QMainWindow):
         
         layout.addLayout(search_layout)
  
-        self.elements_list = QListWidget()
-        self.elements_list.itemDoubleClicked.connect(self.element_double_clicked)
+        self.elements_list = QListView()
+        self.elements_list.setModel(self.elements_proxy)
+        self.elements_list.setEditTriggers(QListView.NoEditTriggers)
+        self.elements_list.doubleClicked.connect(self.element_double_clicked)
         layout.addWidget(self.elements_list)
 
         button_layout = QHBoxLayout()
@@ -47,8 +59,6 @@ class ElementsWindow(QMainWindow):
     
     def load_elements(self):
         """Carga elementos según el lenguaje del proyecto"""
-        self.elements_list.clear()
-        
         if self.project_language.lower() == "java":
             elements = [
                 ("Button", "🔘", "Botón estándar de Android"),
@@ -81,38 +91,38 @@ class ElementsWindow(QMainWindow):
                 ("Container", "📦", "Contenedor")
             ]
         
-        for name, icon, description in elements:
-            item = QListWidgetItem(f"{icon} {name}\n{description}")
-            item.setData(Qt.UserRole, name)
-            self.elements_list.addItem(item)
+        self.elements_model.set_entries([
+            SearchListModel.make_entry(f"{icon} {name}\n{description}", name,
+                                       search_text=f"{name} {description}",
+                                       recent=self.recent_elements.get(name))
+            for name, icon, description in elements
+        ])
     
     def filter_elements(self, text):
         """Filtra elementos basado en la búsqueda"""
-        for i in range(self.elements_list.count()):
-            item = self.elements_list.item(i)
-            item_text = item.text().lower()
-            item.setHidden(text.lower() not in item_text)
+        self.elements_proxy.set_query(text)
     
     def clear_search(self):
         """Limpia la búsqueda"""
         self.search_input.clear()
     
-    def element_double_clicked(self, item):
+    def element_double_clicked(self, index):
         """Maneja doble click en elemento"""
-        element_name = item.data(Qt.UserRole)
+        element_name = index.data(Qt.UserRole)
         self.add_element_to_canvas(element_name)
     
     def add_to_design(self):
         """Añade el elemento seleccionado al diseño"""
-        current_item = self.elements_list.currentItem()
-        if current_item:
-            element_name = current_item.data(Qt.UserRole)
+        current_index = self.elements_list.currentIndex()
+        if current_index.isValid():
+            element_name = current_index.data(Qt.UserRole)
             self.add_element_to_canvas(element_name)
         else:
             QMessageBox.warning(self, "Selección", "Selecciona un elemento primero")
     
     def add_element_to_canvas(self, element_name):
         """Añade el elemento al canvas"""
+        ElementsWindow.recent_elements[element_name] = time.monotonic()
         if self.parent and hasattr(self.parent, 'hoja_ai_panel'):
             canvas = self.parent.hoja_ai_panel.canvas
 
@@ -120,22 +130,27 @@ class ElementsWindow(QMainWindow):
             center_x = rect.center().x()
             center_y = rect.center().y()
             
+            item = None
             if "Button" in element_name:
-                button = QGraphicsRectItem(center_x - 50, center_y - 25, 100, 50)
-                button.setBrush(QBrush(QColor(100, 150, 255)))
-                button.setPen(QPen(Qt.blue, 2))
-                canvas.scene.addItem(button)
+                item = QGraphicsRectItem(center_x - 50, center_y - 25, 100, 50)
+                item.setBrush(QBrush(QColor(100, 150, 255)))
+                item.setPen(QPen(Qt.blue, 2))
             
             elif "Text" in element_name or "TextView" in element_name:
-                text = QGraphicsTextItem(element_name)
-                text.setPos(center_x - 30, center_y - 10)
-                canvas.scene.addItem(text)
+                item = QGraphicsTextItem(element_name)
+                item.setPos(center_x - 30, center_y - 10)
             
             elif "Image" in element_name:
-                image_rect = QGraphicsRectItem(center_x - 40, center_y - 40, 80, 80)
-                image_rect.setBrush(QBrush(QColor(200, 200, 200)))
-                image_rect.setPen(QPen(Qt.gray, 1))
-                canvas.scene.addItem(image_rect)
+                item = QGraphicsRectItem(center_x - 40, center_y - 40, 80, 80)
+                item.setBrush(QBrush(QColor(200, 200, 200)))
+                item.setPen(QPen(Qt.gray, 1))
+
+            if item is not None:
+                item.setFlag(QGraphicsItem.ItemIsSelectable, True)
+                item.setFlag(QGraphicsItem.ItemIsMovable, True)
+                # Por el índice del lienzo: selección, borrador, exportación y guardado lo ven
+                canvas.add_content_item(item)
+                canvas.history.push(AddItemsCommand(canvas, [item], element_name))
             
             QMessageBox.information(self, "Éxito", f"Elemento '{element_name}' añadido al diseño")
             self.close()
\ No newline at end of file
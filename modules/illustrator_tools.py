@@ -1,4 +1,22 @@
 from .common_imports import *
+from contextlib import contextmanager
+from .canvas_index import CanvasIndex
+from .canvas_rendering import LodPathItem, InteractiveRenderController, GuideLayer
+from .canvas_export import export_canvas
+from .design_file import DesignDocument, UnsupportedItemsError, save_design, load_document
+from .device_preview import DEVICE_PROFILES, DevicePreviewWidget
+from .snapping import SnapEngine
+from .node_editing import NodeEditor
+from .strokes import StrokeBuilder
+from .path_ops import (
+    swept_footprint, erase_from_item, clone_path_item, item_local_path, item_scene_path, boolean_paths,
+    simplify_paths, outline_paths, styled_path_item, outline_item, path_elements,
+    PathOperationWorker, WORKER_ELEMENT_THRESHOLD
+)
+from .canvas_history import (
+    CanvasHistory, AddItemsCommand, RemoveItemsCommand, TransformCommand,
+    PenCommand, PathEditCommand, capture_geometry
+)
 
 class IllustratorToolsPanel(QDockWidget):
     """Panel de herramientas de Illustrator profesional"""
@@ -59,6 +77,26 @@ class IllustratorToolsPanel(QDockWidget):
             btn = self.create_tool_button(icon, name, tool_id, tooltip)
             layout.addWidget(btn)
         
+        # 🧩 OPERACIONES DE TRAZADO (actúan sobre la selección)
+        operations_label = QLabel("🧩 Operaciones de Trazado")
+        operations_label.setStyleSheet("font-weight: bold; margin-top: 15px; color: #333;")
+        layout.addWidget(operations_label)
+        
+        path_operations = [
+            ("⊕", "Unir", "union", "Combina las formas seleccionadas en una sola"),
+            ("⊖", "Restar", "subtract", "Resta a la forma de abajo las que tiene encima"),
+            ("⊗", "Intersecar", "intersect", "Conserva solo el área común de las formas seleccionadas"),
+            ("〰️", "Simplificar", "simplify", "Reduce los puntos de los trazados seleccionados"),
+            ("▭", "Contornear trazo", "outline", "Convierte el trazo en una forma rellena"),
+        ]
+        
+        for icon, name, operation, tooltip in path_operations:
+            btn = QPushButton(f"{icon} {name}")
+            btn.setToolTip(tooltip)
+            btn.setFixedHeight(30)
+            btn.clicked.connect(lambda checked=False, op=operation: self.path_operation_selected(op))
+            layout.addWidget(btn)
+        
         layout.addStretch()
 
         # Botón de configuración avanzada
@@ -163,6 +201,18 @@ class IllustratorToolsPanel(QDockWidget):
             if hasattr(self.parent, 'statusBar'):
                 self.parent.statusBar().showMessage(f"🎯 {info}", 3000)
 
+    def path_operation_selected(self, operation):
+        """Aplica una operación de trazado a la selección del lienzo"""
+        if not (self.parent and hasattr(self.parent, 'hoja_ai_panel')):
+            return
+        canvas = self.parent.hoja_ai_panel.canvas
+        if operation == "simplify":
+            canvas.simplify_selected()
+        elif operation == "outline":
+            canvas.outline_stroke_selected()
+        else:
+            canvas.boolean_selected(operation)
+
     def show_advanced_settings(self):
         """Muestra configuración avanzada de herramientas"""
         settings_dialog = QDialog(self)
@@ -362,6 +412,7 @@ class AdvancedIllustratorCanvas(QGraphicsView):
     """Lienzo avanzado con herramientas profesionales de Illustrator"""
     
     elementSelected = Signal(object)
+    cleared = Signal()
     
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -369,6 +420,9 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         self.setScene(self.scene)
         self.setRenderHint(QPainter.Antialiasing)
         self.setRenderHint(QPainter.SmoothPixmapTransform)
+        # Calidad reducida durante pan/zoom/arrastre y caché por item en modo rendimiento
+        # (se crea antes que nada que pueda hacer scroll: scrollContentsBy lo usa)
+        self.render_controller = InteractiveRenderController(self)
 
         self.setStyleSheet("""
             QGraphicsView {
@@ -383,6 +437,9 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         # Propiedades para SELECCIÓN Y TRANSFORMACIÓN
         self.selected_items = []
         self.selection_rect = None
+        self.selection_originals = {}  # item -> (pen original, era movible)
+        self._selection_batch_depth = 0
+        self._selection_changed = False
         self.dragging = False
         self.drag_start = None
         self.multi_select = False
@@ -397,9 +454,6 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         
         # Propiedades para SELECCIÓN DIRECTA
         self.direct_selection_mode = False
-        self.selected_nodes = []
-        self.node_handles = []
-        self.active_path_item = None
         
         # Propiedades para PLUMA
         self.pen_path = None
@@ -409,13 +463,12 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         self.pen_temp_points = []
         
         # Propiedades para LÁPIZ
-        self.pencil_path = None
-        self.pencil_points = []
+        self.pencil_stroke = None
         self.current_pencil_item = None
         self.pencil_drawing = False
         
         # Propiedades para PINCEL
-        self.brush_path = None
+        self.brush_stroke = None
         self.current_brush_item = None
         self.brush_drawing = False
         self.brush_size = 5
@@ -425,13 +478,47 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         self.erasing = False
         self.eraser_size = 20
         self.eraser_cursor = None
+        self.eraser_points = []  # recorrido pendiente de aplicar
+        self.eraser_timer = QTimer(self)
+        self.eraser_timer.setSingleShot(True)
+        self.eraser_timer.setInterval(30)
+        self.eraser_timer.timeout.connect(self.apply_pending_erase)
         
         # Propiedades para VARITA MÁGICA
         self.magic_wand_tolerance = 10
         
+        # Decimación y suavizado de trazos a mano alzada (lápiz y pincel)
+        self.stroke_min_distance = 2.0
+        self.stroke_tolerance = 1.0
+        self.stroke_smoothing = True
+        
         # Propiedades generales
         self.snap_to_grid = True
         self.grid_size = 10
+        
+        # Índice espacial y de color del contenido (sin handles ni temporales)
+        self.index = CanvasIndex()
+        
+        # Historial de deshacer/rehacer (deltas, no copias de la escena)
+        self.history = CanvasHistory(parent=self)
+        self._geometry_before = None
+        self._erase_command = None
+        
+        # Rejilla, keylines y reglas dibujadas por la vista (no son items de la escena)
+        self.guide_layer = GuideLayer(self)
+        
+        # Alineación inteligente con otros items y la página al arrastrar
+        self.snap_engine = SnapEngine(self)
+        
+        # Edición de nodos de paths y polígonos (selección directa)
+        self.node_editor = NodeEditor(self)
+        
+        # Operación de trazado pesada en curso (booleanas, simplificar, contornear)
+        self._path_worker = None
+        
+        # Carga diferida de un diseño abierto desde fichero (chunks fuera de pantalla)
+        self.design_loader = None
+        self.setViewportUpdateMode(QGraphicsView.SmartViewportUpdate)
 
         self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
         self.setResizeAnchor(QGraphicsView.AnchorUnderMouse)
@@ -477,13 +564,8 @@ class AdvancedIllustratorCanvas(QGraphicsView):
 
     def clear_selection_state(self):
         """Limpia el estado de selección"""
-        # Limpiar manijas de nodos
-        for handle in self.node_handles:
-            if handle in self.scene.items():
-                self.scene.removeItem(handle)
-        self.node_handles = []
-        self.selected_nodes = []
-        self.active_path_item = None
+        # Limpiar edición de nodos
+        self.node_editor.clear()
         
         # Limpiar rectángulo de selección
         if self.selection_rect:
@@ -496,20 +578,20 @@ class AdvancedIllustratorCanvas(QGraphicsView):
     def clear_transform_handles(self):
         """Limpia los handles de transformación"""
         for handle in self.transform_handles:
-            if handle in self.scene.items():
+            if handle.scene() is self.scene:
                 self.scene.removeItem(handle)
         self.transform_handles = []
         
         for handle in self.scale_handles:
-            if handle in self.scene.items():
+            if handle.scene() is self.scene:
                 self.scene.removeItem(handle)
         self.scale_handles = []
         
-        if self.rotate_handle and self.rotate_handle in self.scene.items():
+        if self.rotate_handle and self.rotate_handle.scene() is self.scene:
             self.scene.removeItem(self.rotate_handle)
         self.rotate_handle = None
         
-        if self.selection_border and self.selection_border in self.scene.items():
+        if self.selection_border and self.selection_border.scene() is self.scene:
             self.scene.removeItem(self.selection_border)
         self.selection_border = None
         
@@ -519,10 +601,10 @@ class AdvancedIllustratorCanvas(QGraphicsView):
             """Limpia el estado de dibujo"""
             # Limpiar elementos temporales de pluma
             for line in self.pen_temp_lines:
-                if line in self.scene.items():
+                if line.scene() is self.scene:
                     self.scene.removeItem(line)
             for point in self.pen_temp_points:
-                if point in self.scene.items():
+                if point.scene() is self.scene:
                     self.scene.removeItem(point)
             
             self.pen_temp_lines = []
@@ -531,7 +613,6 @@ class AdvancedIllustratorCanvas(QGraphicsView):
             self.pen_path = None
             
             # Limpiar estado de lápiz
-            self.pencil_points = []
             self.pencil_drawing = False
             
             # Limpiar estado de pincel
@@ -540,6 +621,8 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         """Maneja la liberación de un handle de transformación"""
         self.transform_mode = None
         self.transform_origin = None
+        self.index.update_many(self.selected_items)
+        self.end_geometry_capture("Transformar")
         event.accept()
 
     def handle_scale_transform(self, handle, new_pos):
@@ -606,6 +689,7 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         """Maneja el press en un handle de transformación"""
         self.transform_mode = handle.data(0)
         self.transform_origin = handle.scenePos()
+        self.begin_geometry_capture()
         event.accept()
     def show_transform_handles(self):
             """Muestra los handles de transformación para los items seleccionados"""
@@ -722,8 +806,16 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         if event.button() == Qt.LeftButton:
             if self.current_tool == "selection":
                 self.start_selection(scene_pos, event)
+                if not self.dragging:
+                    # Dejar que Qt entregue el press a los items/handles para arrastrarlos
+                    self.begin_geometry_capture()
+                    super().mousePressEvent(event)
+                    # Solo se ajusta al arrastrar contenido seleccionado, no los handles
+                    if self.scene.mouseGrabberItem() in self.selected_items:
+                        self.snap_engine.begin(self.selected_items, self.guide_layer.page)
             elif self.current_tool == "direct_selection":
-                self.start_direct_selection(scene_pos)
+                # Sin ajustar a cuadrícula: se ajusta la posición del nodo, no la del click
+                self.start_direct_selection(self.mapToScene(event.pos()))
             elif self.current_tool == "magic_wand":
                 self.magic_wand_selection(scene_pos)
             elif self.current_tool == "group_selection":
@@ -745,6 +837,9 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         if self.snap_to_grid:
             scene_pos = self.snap_to_grid_point(scene_pos)
         
+        if event.buttons():
+            self.render_controller.interaction()
+        
         if self.current_tool == "selection" and self.dragging:
             self.update_selection_rect(scene_pos)
         elif self.current_tool == "pencil" and self.pencil_drawing:
@@ -753,8 +848,15 @@ class AdvancedIllustratorCanvas(QGraphicsView):
             self.update_brush_drawing(scene_pos)
         elif self.current_tool == "eraser" and self.erasing:
             self.update_erasing(scene_pos)
+        elif self.current_tool == "direct_selection" and self.node_editor.dragging:
+            self.node_editor.drag_to(self.mapToScene(event.pos()),
+                                     self.snap_to_grid_point if self.snap_to_grid else None)
         
         super().mouseMoveEvent(event)
+        
+        # Qt recoloca los items desde su posición inicial en cada paso: el ajuste no se acumula
+        if self.snap_engine.active and event.buttons() & Qt.LeftButton:
+            self.snap_engine.snap_moving(self.grid_size if self.snap_to_grid else None)
 
     def mouseReleaseEvent(self, event):
         """Maneja la liberación del mouse"""
@@ -766,8 +868,16 @@ class AdvancedIllustratorCanvas(QGraphicsView):
             self.finish_brush_drawing()
         elif self.current_tool == "eraser" and self.erasing:
             self.finish_erasing()
+        elif self.current_tool == "direct_selection" and self.node_editor.dragging:
+            self.finish_node_drag()
         
         super().mouseReleaseEvent(event)
+        self.snap_engine.end()
+        
+        # Los items arrastrados por Qt cambian de posición: reindexarlos
+        if self.current_tool == "selection" and self.selected_items:
+            self.index.update_many(self.selected_items)
+        self.end_geometry_capture("Mover")
 
     def keyPressEvent(self, event):
         """Maneja eventos de teclado para atajos"""
@@ -776,7 +886,13 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         elif event.key() == Qt.Key_Escape:
             self.clear_selection()
         elif event.modifiers() & Qt.ControlModifier:
-            if event.key() == Qt.Key_A:
+            if event.key() == Qt.Key_Z and event.modifiers() & Qt.ShiftModifier:
+                self.redo()
+            elif event.key() == Qt.Key_Z:
+                self.undo()
+            elif event.key() == Qt.Key_Y:
+                self.redo()
+            elif event.key() == Qt.Key_A:
                 self.select_all_items()
             elif event.key() == Qt.Key_G:
                 self.group_selected_items()
@@ -814,18 +930,11 @@ class AdvancedIllustratorCanvas(QGraphicsView):
             return  # Dejar que el handle maneje el evento
         
         # Selección normal de objetos
-        items = self.scene.items(pos)
+        items = self.index.items_at(pos)
         
         if items and not self.multi_select:
-            # Buscar el primer item que no sea un handle de transformación
-            for item in items:
-              if (item not in self.scale_handles and 
-                  item != self.rotate_handle and 
-                  item != self.selection_border and
-                  isinstance(item, (QGraphicsPathItem, QGraphicsRectItem, 
-                                QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsTextItem))):
-                    self.select_item(item, clear_previous=not self.multi_select)
-                    break
+            # El índice solo contiene contenido real: el primero es el de más arriba
+            self.select_item(items[0], clear_previous=not self.multi_select)
         else:
             # Iniciar selección por rectángulo
             self.dragging = True
@@ -846,148 +955,154 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         if self.selection_rect:
             # Seleccionar items dentro del rectángulo
             rect = self.selection_rect.rect()
-            items_in_rect = self.scene.items(rect, Qt.IntersectsItemShape)
             
-            for item in items_in_rect:
-                if isinstance(item, (QGraphicsPathItem, QGraphicsRectItem, 
-                                QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsTextItem)):
-                    # Ignorar elementos temporales y handles
-                    if (item not in self.pen_temp_points and 
-                        item not in self.pen_temp_lines and
-                        item not in self.scale_handles and
-                        item != self.rotate_handle and
-                        item != self.selection_rect):
-                        self.select_item(item, clear_previous=False)
+            # El índice excluye temporales y handles, no hace falta filtrarlos
+            with self.selection_update():
+                for item in self.index.items_in_rect(rect):
+                    self.select_item(item, clear_previous=False)
             
             self.scene.removeItem(self.selection_rect)
             self.selection_rect = None
         
         self.dragging = False
         self.drag_start = None
+    def begin_selection_update(self):
+        """Inicia un lote de cambios de selección (handles y señal se difieren)"""
+        self._selection_batch_depth += 1
+
+    def commit_selection_update(self):
+        """Cierra un lote: un solo recálculo de handles y una sola señal"""
+        self._selection_batch_depth -= 1
+        if self._selection_batch_depth > 0 or not self._selection_changed:
+            return
+        self._selection_changed = False
+        
+        # Un único bounding box combinado y una reconstrucción de handles
+        self.show_transform_handles()
+        self.elementSelected.emit(self.selected_items[-1] if self.selected_items else None)
+
+    @contextmanager
+    def selection_update(self):
+        """Agrupa varias operaciones de selección en una sola actualización"""
+        self.begin_selection_update()
+        try:
+            yield
+        finally:
+            self.commit_selection_update()
+
     def select_item(self, item, clear_previous=True):
         """Selecciona un item y muestra sus propiedades"""
-        if clear_previous and not self.multi_select:
-            # Limpiar selección anterior
-            self.clear_selection()
-        
-        # Resaltar item seleccionado
-        if hasattr(item, 'setPen'):
-            original_pen = item.pen()
-            highlight_pen = QPen(QColor(255, 0, 0), 2)
-            item.setPen(highlight_pen)
-        
-        # Habilitar movimiento y selección
-        item.setFlag(QGraphicsItem.ItemIsMovable, True)
-        item.setFlag(QGraphicsItem.ItemIsSelectable, True)
-        
-        if item not in self.selected_items:
+        with self.selection_update():
+            if clear_previous and not self.multi_select:
+                # Limpiar selección anterior
+                self.clear_selection()
+            
+            if item in self.selection_originals:
+                return
+            
+            # Guardar el pen real y el estado de movimiento para restaurarlos después
+            original_pen = item.pen() if hasattr(item, 'pen') else None
+            was_movable = bool(item.flags() & QGraphicsItem.ItemIsMovable)
+            self.selection_originals[item] = (original_pen, was_movable)
+            
+            # Resaltar item seleccionado
+            if original_pen is not None:
+                item.setPen(QPen(QColor(255, 0, 0), 2))
+            
+            # Habilitar movimiento y selección
+            item.setFlag(QGraphicsItem.ItemIsMovable, True)
+            item.setFlag(QGraphicsItem.ItemIsSelectable, True)
+            
             self.selected_items.append(item)
-        
-        # Mostrar handles de transformación
-        self.show_transform_handles()
-        
-        # Emitir señal de elemento seleccionado
-        self.elementSelected.emit(item)
+            self._selection_changed = True
+
+    def restore_item_appearance(self, item):
+        """Devuelve a un item seleccionado su pen y flags originales"""
+        original_pen, was_movable = self.selection_originals.pop(item, (None, False))
+        if original_pen is not None:
+            item.setPen(original_pen)
+        item.setFlag(QGraphicsItem.ItemIsMovable, was_movable)
+
+    def deselect_item(self, item):
+        """Quita un item de la selección"""
+        if item not in self.selection_originals:
+            return
+        with self.selection_update():
+            self.restore_item_appearance(item)
+            self.selected_items.remove(item)
+            self._selection_changed = True
 
     def clear_selection(self):
         """Limpia toda la selección"""
-        for item in self.selected_items:
-            if hasattr(item, 'setPen'):
-                # Restaurar pen original (simulado)
-                item.setPen(QPen(Qt.black, 1))
-            item.setFlag(QGraphicsItem.ItemIsMovable, False)
-        
-        self.selected_items = []
-        self.clear_transform_handles()
-        self.elementSelected.emit(None)
+        with self.selection_update():
+            for item in self.selected_items:
+                self.restore_item_appearance(item)
+            
+            self.selected_items = []
+            self._selection_changed = True
 
     def delete_selected_items(self):
         """Elimina los items seleccionados"""
-        for item in self.selected_items:
-            self.scene.removeItem(item)
-        self.selected_items = []
+        if not self.selected_items:
+            return
+        removed = list(self.selected_items)
+        with self.selection_update():
+            for item in removed:
+                self.restore_item_appearance(item)
+                self.remove_content_item(item)
+            self.selected_items = []
+            self._selection_changed = True
+        self.history.push(RemoveItemsCommand(self, removed))
 
     def select_all_items(self):
         """Selecciona todos los items en la escena"""
-        self.clear_selection()
-        for item in self.scene.items():
-            if isinstance(item, (QGraphicsPathItem, QGraphicsRectItem, 
-                               QGraphicsEllipseItem, QGraphicsPolygonItem,
-                               QGraphicsLineItem, QGraphicsTextItem)):
+        with self.selection_update():
+            self.clear_selection()
+            for item in list(self.index):
                 self.select_item(item, clear_previous=False)
 
     # SELECCIÓN DIRECTA
     def start_direct_selection(self, pos):
         """Inicia selección directa de nodos"""
-        items = self.scene.items(pos)
-        if items:
-            item = items[0]
-            if isinstance(item, (QGraphicsPathItem, QGraphicsPolygonItem)):
-                self.show_node_handles(item)
+        hit = self.node_editor.hit_test(pos)
+        if hit is not None:
+            self.node_editor.begin_drag(hit, pos)
+            return
+        
+        items = self.index.items_at(pos)
+        if items and isinstance(items[0], (QGraphicsPathItem, QGraphicsPolygonItem)):
+            self.show_node_handles(items[0])
+        else:
+            self.node_editor.clear()
 
     def show_node_handles(self, item):
         """Muestra manijas para los nodos del item"""
         self.clear_selection_state()
-        self.active_path_item = item
-        
-        if isinstance(item, QGraphicsPathItem):
-            path = item.path()
-            for i in range(path.elementCount()):
-                element = path.elementAt(i)
-                handle = self.create_node_handle(QPointF(element.x, element.y), i, item)
-                self.node_handles.append(handle)
-        
-        elif isinstance(item, QGraphicsPolygonItem):
-            polygon = item.polygon()
-            for i, point in enumerate(polygon):
-                handle = self.create_node_handle(point, i, item)
-                self.node_handles.append(handle)
-
-    def create_node_handle(self, position, index, parent_item):
-        """Crea una manija de nodo"""
-        handle = QGraphicsEllipseItem(position.x()-4, position.y()-4, 8, 8)
-        handle.setBrush(QBrush(Qt.yellow))
-        handle.setPen(QPen(Qt.black, 1))
-        handle.setFlag(QGraphicsItem.ItemIsMovable, True)
-        handle.setFlag(QGraphicsItem.ItemIsSelectable, True)
-        handle.setData(0, index)  # Índice del nodo
-        handle.setData(1, parent_item)  # Item padre
-        
-        self.scene.addItem(handle)
-        return handle
-
-    def node_moved(self, handle, event):
-        """Maneja el movimiento de un nodo (se conecta en mouseMove)"""
-        parent_item = handle.data(1)
-        node_index = handle.data(0)
-        new_pos = handle.scenePos() + QPointF(4, 4)  # Ajustar al centro
-        
-        if self.snap_to_grid:
-            new_pos = self.snap_to_grid_point(new_pos)
-        
-        if isinstance(parent_item, QGraphicsPolygonItem):
-            polygon = parent_item.polygon()
-            polygon[node_index] = new_pos
-            parent_item.setPolygon(polygon)
-        
-        QGraphicsEllipseItem.mouseMoveEvent(handle, event)
+        self.node_editor.edit(item)
+
+    def finish_node_drag(self):
+        """Registra en el historial la edición de nodos terminada"""
+        result = self.node_editor.end_drag()
+        if result is None:
+            return
+        item, old_path, new_path = result
+        self.index.update(item)
+        command = PathEditCommand(self, "Editar nodos")
+        command.record_path(item, old_path, new_path)
+        self.history.push(command)
 
     # VARITA MÁGICA
     def magic_wand_selection(self, pos):
         """Selección por atributos con varita mágica"""
-        items = self.scene.items(pos)
+        items = self.index.items_at(pos)
         if items:
             target_item = items[0]
             target_color = target_item.brush().color() if hasattr(target_item, 'brush') else QColor()
             
-            # Seleccionar items con color similar
-            for item in self.scene.items():
-                if (hasattr(item, 'brush') and 
-                    isinstance(item, (QGraphicsPathItem, QGraphicsRectItem, 
-                                    QGraphicsEllipseItem, QGraphicsPolygonItem))):
-                    item_color = item.brush().color()
-                    if self.colors_similar(target_color, item_color, self.magic_wand_tolerance):
-                        self.select_item(item, clear_previous=False)
+            # Seleccionar items con color similar (solo las cubetas de color cercanas)
+            with self.selection_update():
+                for item in self.index.items_with_color(target_color, self.magic_wand_tolerance):
+                    self.select_item(item, clear_previous=False)
 
     def colors_similar(self, color1, color2, tolerance):
         """Compara si dos colores son similares"""
@@ -1002,7 +1117,7 @@ class AdvancedIllustratorCanvas(QGraphicsView):
     # SELECCIÓN DE GRUPO
     def group_selection(self, pos):
         """Selección de elementos en grupos"""
-        items = self.scene.items(pos)
+        items = self.index.items_at(pos)
         if items:
             # Por ahora, selecciona el primer item (simulación de grupo)
             self.select_item(items[0])
@@ -1055,13 +1170,14 @@ class AdvancedIllustratorCanvas(QGraphicsView):
             if len(self.pen_points) >= 3:
                 path.closeSubpath()
             
-            path_item = QGraphicsPathItem(path)
+            path_item = LodPathItem(path)
             path_item.setPen(QPen(QColor(0, 100, 200), 2))
             path_item.setBrush(QBrush(QColor(0, 100, 200, 50)))
             path_item.setFlag(QGraphicsItem.ItemIsSelectable, True)
             path_item.setFlag(QGraphicsItem.ItemIsMovable, True)
             
-            self.scene.addItem(path_item)
+            self.add_content_item(path_item)
+            self.history.push(AddItemsCommand(self, [path_item], "Pluma"))
             
             # Limpiar elementos temporales
             self.clear_pen_temp_items()
@@ -1069,135 +1185,382 @@ class AdvancedIllustratorCanvas(QGraphicsView):
     def clear_pen_temp_items(self):
         """Limpia elementos temporales de la pluma"""
         for line in self.pen_temp_lines:
-            if line in self.scene.items():
+            if line.scene() is self.scene:
                 self.scene.removeItem(line)
         for point in self.pen_temp_points:
-            if point in self.scene.items():
+            if point.scene() is self.scene:
                 self.scene.removeItem(point)
         
         self.pen_temp_lines = []
         self.pen_temp_points = []
         self.pen_points = []
 
+    def create_stroke(self, item, pos):
+        """Crea el constructor incremental de trazo con la configuración del lienzo"""
+        return StrokeBuilder(
+            item, pos,
+            min_distance=self.stroke_min_distance,
+            tolerance=self.stroke_tolerance,
+            smooth=self.stroke_smoothing
+        )
+
     def start_pencil_drawing(self, pos):
         """Inicia dibujo con lápiz"""
         self.pencil_drawing = True
-        self.pencil_path = QPainterPath()
-        self.pencil_path.moveTo(pos)
         
-        self.current_pencil_item = QGraphicsPathItem()
+        self.current_pencil_item = LodPathItem()
         pen = QPen(QColor(255, 100, 0), 3)
         pen.setCapStyle(Qt.RoundCap)
         pen.setJoinStyle(Qt.RoundJoin)
         self.current_pencil_item.setPen(pen)
-        self.current_pencil_item.setPath(self.pencil_path)
         
         self.scene.addItem(self.current_pencil_item)
+        self.pencil_stroke = self.create_stroke(self.current_pencil_item, pos)
 
     def update_pencil_drawing(self, pos):
         """Actualiza dibujo con lápiz"""
-        if self.pencil_path and self.current_pencil_item:
-            self.pencil_path.lineTo(pos)
-            self.current_pencil_item.setPath(self.pencil_path)
+        if self.pencil_stroke:
+            self.pencil_stroke.add_point(pos)
 
     def finish_pencil_drawing(self):
         """Finaliza dibujo con lápiz"""
         self.pencil_drawing = False
+        if self.pencil_stroke:
+            self.pencil_stroke.finish()
         if self.current_pencil_item:
             self.current_pencil_item.setFlag(QGraphicsItem.ItemIsSelectable, True)
             self.current_pencil_item.setFlag(QGraphicsItem.ItemIsMovable, True)
+            self.index.add(self.current_pencil_item)
+            self.history.push(AddItemsCommand(self, [self.current_pencil_item], "Lápiz"))
         
         self.current_pencil_item = None
-        self.pencil_path = None
+        self.pencil_stroke = None
 
     def start_brush_drawing(self, pos):
         """Inicia dibujo con pincel"""
         self.brush_drawing = True
-        self.brush_path = QPainterPath()
-        self.brush_path.moveTo(pos)
         
-        self.current_brush_item = QGraphicsPathItem()
+        self.current_brush_item = LodPathItem()
         pen = QPen(self.brush_color, self.brush_size)
         pen.setCapStyle(Qt.RoundCap)
         pen.setJoinStyle(Qt.RoundJoin)
         self.current_brush_item.setPen(pen)
-        self.current_brush_item.setPath(self.brush_path)
         
         self.scene.addItem(self.current_brush_item)
+        self.brush_stroke = self.create_stroke(self.current_brush_item, pos)
 
     def update_brush_drawing(self, pos):
         """Actualiza dibujo con pincel"""
-        if self.brush_path and self.current_brush_item:
-            self.brush_path.lineTo(pos)
-            self.current_brush_item.setPath(self.brush_path)
+        if self.brush_stroke:
+            self.brush_stroke.add_point(pos)
 
     def finish_brush_drawing(self):
         """Finaliza dibujo con pincel"""
         self.brush_drawing = False
+        if self.brush_stroke:
+            self.brush_stroke.finish()
         if self.current_brush_item:
             self.current_brush_item.setFlag(QGraphicsItem.ItemIsSelectable, True)
             self.current_brush_item.setFlag(QGraphicsItem.ItemIsMovable, True)
+            self.index.add(self.current_brush_item)
+            self.history.push(AddItemsCommand(self, [self.current_brush_item], "Pincel"))
         
         self.current_brush_item = None
-        self.brush_path = None
+        self.brush_stroke = None
 
     def start_erasing(self, pos):
         """Inicia borrado"""
         self.erasing = True
-        self.erase_at_position(pos)
+        self.eraser_points = [pos]
+        self._erase_command = PathEditCommand(self, "Borrar")
+        self.apply_pending_erase()
 
     def update_erasing(self, pos):
-        """Actualiza borrado durante movimiento"""
+        """Acumula el recorrido del borrador; se aplica por lotes con un temporizador"""
         if self.erasing:
-            self.erase_at_position(pos)
+            self.eraser_points.append(pos)
+            if not self.eraser_timer.isActive():
+                self.eraser_timer.start()
+
+    def apply_pending_erase(self):
+        """Aplica de una vez la huella barrida desde el último lote"""
+        if not self.eraser_points:
+            return
+        footprint = swept_footprint(self.eraser_points, self.eraser_size)
+        # El siguiente lote continúa desde el último punto para no dejar huecos
+        self.eraser_points = self.eraser_points[-1:]
+        self.erase_footprint(footprint, self._erase_command)
 
     def erase_at_position(self, pos):
-        """Borra elementos en la posición dada"""
-        # Crear área de borrado
-        eraser_rect = QRectF(pos.x() - self.eraser_size/2, pos.y() - self.eraser_size/2,
-                           self.eraser_size, self.eraser_size)
+        """Borra la parte de los trazos que cae bajo el borrador en la posición dada"""
+        command = PathEditCommand(self, "Borrar")
+        self.erase_footprint(swept_footprint([pos], self.eraser_size), command)
+        if not command.is_empty():
+            self.history.push(command)
+
+    def erase_footprint(self, footprint, command=None):
+        """Resta una huella (en coordenadas de escena) a los paths y líneas que toca"""
+        # Prefiltro por bounding box con el índice y luego colisión exacta
+        candidates = [
+            item for item in self.index.spatial.query_rect(footprint.boundingRect())
+            if isinstance(item, (QGraphicsPathItem, QGraphicsLineItem))
+            and item.collidesWithPath(item.mapFromScene(footprint))
+        ]
         
-        items = self.scene.items(eraser_rect, Qt.IntersectsItemShape)
-        for item in items:
-            if isinstance(item, (QGraphicsPathItem, QGraphicsLineItem)):
-                self.scene.removeItem(item)
-                if item in self.selected_items:
-                    self.selected_items.remove(item)
+        for item in candidates:
+            # Restaurar el pen real antes de copiar su estilo a los fragmentos
+            self.deselect_item(item)
+            pieces = erase_from_item(item, footprint)
+            if pieces is None:
+                continue
+            
+            if isinstance(item, QGraphicsPathItem) and pieces:
+                if command is not None:
+                    command.record_path(item, item.path(), pieces[0])
+                item.setPath(pieces[0])
+                self.index.update(item)
+                pieces = pieces[1:]
+            else:
+                self.remove_content_item(item)
+                if command is not None:
+                    command.record_removed(item)
+            
+            for path in pieces:
+                clone = clone_path_item(item, path)
+                self.add_content_item(clone)
+                if command is not None:
+                    command.record_added(clone)
 
     def finish_erasing(self):
         """Finaliza borrado"""
+        self.eraser_timer.stop()
+        self.apply_pending_erase()
+        self.eraser_points = []
         self.erasing = False
+        if self._erase_command is not None and not self._erase_command.is_empty():
+            self.history.push(self._erase_command)
+        self._erase_command = None
+
+    # 🧩 OPERACIONES DE TRAZADO
+    def original_pen(self, item):
+        """Pen real del item (si está seleccionado, el visible es el de resaltado)"""
+        original = self.selection_originals.get(item)
+        return original[0] if original and original[0] is not None else item.pen()
+
+    def boolean_selected(self, operation):
+        """Une, resta o interseca las formas seleccionadas en un único path"""
+        items = [item for item in self.index.stacked(self.selected_items)
+                 if item_scene_path(item) is not None]
+        if len(items) < 2:
+            print("⚠️ Selecciona al menos dos formas")
+            return False
+        style_item = items[0] if operation == "subtract" else items[-1]
+        texts = {"union": "Unir", "subtract": "Restar", "intersect": "Intersecar"}
+
+        def apply(result, command):
+            for item in items:
+                self.remove_content_item(item)
+                command.record_removed(item)
+            if result.isEmpty():
+                return []
+            combined = styled_path_item(style_item, result)
+            self.add_content_item(combined)
+            command.record_added(combined)
+            return [combined]
+
+        paths = [item_scene_path(item) for item in items]
+        return self.run_path_operation(texts.get(operation, operation), items, paths,
+                                       boolean_paths, (paths, operation), apply)
+
+    def simplify_selected(self, tolerance=1.0, smooth=False):
+        """Aplana y reduce los puntos de los paths seleccionados (RDP con tolerancia)"""
+        items = [item for item in self.selected_items if isinstance(item, QGraphicsPathItem)]
+        if not items:
+            return False
+
+        def apply(results, command):
+            for item, path in zip(items, results):
+                command.record_path(item, item.path(), path)
+                item.setPath(path)
+                self.index.update(item)
+            return items
+
+        paths = [item.path() for item in items]
+        return self.run_path_operation("Simplificar", items, paths,
+                                       simplify_paths, (paths, tolerance, smooth), apply)
+
+    def outline_stroke_selected(self):
+        """Sustituye el trazo de los items seleccionados por una forma rellena equivalente"""
+        items = [item for item in self.selected_items
+                 if item_scene_path(item) is not None and self.original_pen(item).style() != Qt.NoPen]
+        if not items:
+            return False
+        pens = [QPen(self.original_pen(item)) for item in items]
+
+        def apply(results, command):
+            outlines = []
+            for item, path, pen in zip(items, results, pens):
+                outline = outline_item(item, path, pen)
+                self.remove_content_item(item)
+                command.record_removed(item)
+                self.add_content_item(outline)
+                command.record_added(outline)
+                outlines.append(outline)
+            return outlines
+
+        paths = [item_local_path(item) for item in items]
+        return self.run_path_operation("Contornear trazo", items, paths,
+                                       outline_paths, (paths, pens), apply)
+
+    def run_path_operation(self, text, items, paths, function, args, apply):
+        """Calcula function(*args) y aplica el resultado con apply(resultado, comando)
+
+        Con muchos elementos el cálculo va a un worker y el lienzo sigue
+        respondiendo; el resultado se aplica de una vez (un solo comando de
+        historial) y se descarta si los items cambiaron mientras tanto.
+        """
+        if self._path_worker is not None:
+            print("⚠️ Ya hay una operación de trazado en curso")
+            return False
+        snapshot = {item: item_scene_path(item) for item in items}
+
+        def finish(result):
+            if any(item not in self.index or item_scene_path(item) != path
+                   for item, path in snapshot.items()):
+                print(f"⚠️ {text}: los objetos cambiaron durante la operación, se descarta el resultado")
+                return
+            self.clear_selection()
+            command = PathEditCommand(self, text)
+            with self.selection_update():
+                for item in apply(result, command):
+                    self.select_item(item, clear_previous=False)
+            if not command.is_empty():
+                self.history.push(command)
+
+        if path_elements(paths) < WORKER_ELEMENT_THRESHOLD:
+            finish(function(*args))
+            return True
+
+        def failed(message):
+            print(f"❌ Error en {text}: {message}")
+
+        def released():
+            # Solo cuando el hilo ha terminado de verdad: soltarlo antes lo destruiría en marcha
+            self._path_worker = None
+            worker.deleteLater()
+
+        worker = PathOperationWorker(function, *args, parent=self)
+        worker.result_ready.connect(finish)
+        worker.error_occurred.connect(failed)
+        worker.finished.connect(released)
+        self._path_worker = worker
+        worker.start()
+        return True
 
     def start_width_adjustment(self, pos):
         """Inicia ajuste de grosor de trazo"""
-        items = self.scene.items(pos)
+        items = self.index.items_at(pos)
         if items:
             item = items[0]
             if hasattr(item, 'pen'):
-                current_pen = item.pen()
+                # Si está seleccionado, el pen visible es el de resaltado: usar el original
+                original = self.selection_originals.get(item)
+                current_pen = original[0] if original and original[0] is not None else item.pen()
                 new_width = current_pen.width() + 1
                 if new_width > 10:  # Límite máximo
                     new_width = 1
                 
                 new_pen = QPen(current_pen.color(), new_width)
-                item.setPen(new_pen)
+                if original:
+                    self.selection_originals[item] = (new_pen, original[1])
+                else:
+                    item.setPen(new_pen)
+                self.index.update(item)
+                self.history.push(PenCommand(self, item, QPen(current_pen), new_pen))
 
     def wheelEvent(self, event):
         """Maneja el zoom con la rueda del mouse"""
         factor = 1.2 if event.angleDelta().y() > 0 else 0.8
+        self.render_controller.interaction()
         self.scale(factor, factor)
 
+    def scrollContentsBy(self, dx, dy):
+        """Pan: render rápido hasta que el usuario se detenga"""
+        self.render_controller.interaction()
+        super().scrollContentsBy(dx, dy)
+        if self.design_loader is not None and not self.design_loader.is_complete():
+            self.design_loader.load_visible(self.mapToScene(self.viewport().rect()).boundingRect())
+
+    def set_rendering_mode(self, mode):
+        """'quality' o 'performance' (caché por item y LOD agresivo)"""
+        self.render_controller.set_mode(mode)
+
     # MÉTODOS UTILITARIOS
     def get_selected_items(self):
         """Retorna la lista de items seleccionados"""
         return self.selected_items
 
+    def add_content_item(self, item):
+        """Añade un item de diseño a la escena y al índice"""
+        self.scene.addItem(item)
+        self.index.add(item)
+        self.render_controller.apply_cache_policy(item)
+
+    def remove_content_item(self, item):
+        """Quita un item de diseño de la escena y del índice"""
+        self.index.remove(item)
+        if item.scene() is self.scene:
+            self.scene.removeItem(item)
+
+    def begin_geometry_capture(self):
+        """Guarda la transformación de la selección antes de un arrastre"""
+        self._geometry_before = {item: capture_geometry(item) for item in self.selected_items}
+        for item in self.selected_items:
+            self.render_controller.apply_cache_policy(item, transforming=True)
+
+    def end_geometry_capture(self, text):
+        """Registra en el historial los items cuya transformación cambió"""
+        before = self._geometry_before
+        self._geometry_before = None
+        if not before:
+            return
+        for item in before:
+            self.render_controller.apply_cache_policy(item)
+        after = {item: capture_geometry(item) for item in before}
+        changed = [item for item in before if before[item] != after[item]]
+        if changed:
+            self.history.push(TransformCommand(
+                self,
+                {item: before[item] for item in changed},
+                {item: after[item] for item in changed},
+                text
+            ))
+
+    def undo(self):
+        """Deshace el último cambio del lienzo"""
+        self.clear_selection()
+        self.history.undo()
+
+    def redo(self):
+        """Rehace el último cambio deshecho del lienzo"""
+        self.clear_selection()
+        self.history.redo()
+
     def clear_canvas(self):
         """Limpia todo el canvas"""
+        if self.design_loader is not None:
+            self.design_loader.stop()
+            self.design_loader = None
+        self.snap_engine.end()
+        self.node_editor.clear()
         self.scene.clear()
+        self.index.clear()
+        self.history.clear()
         self.selected_items = []
+        self.selection_originals = {}
         self.clear_selection_state()
         self.clear_drawing_state()
+        self.cleared.emit()
 
     def set_brush_properties(self, size=None, color=None):
         """Configura propiedades del pincel"""
@@ -1206,6 +1569,15 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         if color is not None:
             self.brush_color = color
 
+    def set_stroke_properties(self, min_distance=None, tolerance=None, smoothing=None):
+        """Configura la decimación y el suavizado de lápiz y pincel"""
+        if min_distance is not None:
+            self.stroke_min_distance = min_distance
+        if tolerance is not None:
+            self.stroke_tolerance = tolerance
+        if smoothing is not None:
+            self.stroke_smoothing = smoothing
+
     def set_eraser_size(self, size):
         """Configura el tamaño del borrador"""
         self.eraser_size = size
@@ -1221,23 +1593,37 @@ class AdvancedIllustratorCanvas(QGraphicsView):
         """Activa/desactiva el ajuste a cuadrícula"""
         self.snap_to_grid = enabled
 
+    def set_smart_guides(self, enabled):
+        """Activa/desactiva la alineación inteligente al arrastrar"""
+        self.snap_engine.enabled = enabled
+
     def set_grid_size(self, size):
         """Configura el tamaño de la cuadrícula"""
         self.grid_size = size
+        self.guide_layer.set_grid_size(size)
+
+    def drawBackground(self, painter, rect):
+        super().drawBackground(painter, rect)
+        self.guide_layer.draw_background(painter, rect)
+
+    def drawForeground(self, painter, rect):
+        super().drawForeground(painter, rect)
+        self.guide_layer.draw_foreground(painter, rect)
+        self.snap_engine.draw_guides(painter)
         # EN AdvancedIllustratorCanvas, agregar:
-    def setup_android_coordinates(self):
-        """Configura el sistema de coordenadas Android"""
-        self.android_density = 3.0
-        self.android_width_dp = 411
-        self.android_height_dp = 731
+    def setup_android_coordinates(self, width_dp=411, height_dp=731, density=3.0):
+        """Configura el sistema de coordenadas Android: la escena en dp, la densidad en la vista"""
+        self.android_density = density
+        self.android_width_dp = width_dp
+        self.android_height_dp = height_dp
+        self.scene.setSceneRect(0, 0, width_dp, height_dp)
         
     def snap_to_android_grid(self, point):
         """Ajusta a grid de 8dp como Android Studio"""
         grid_size_dp = 8
-        grid_size_px = grid_size_dp * self.android_density
         
-        x = round(point.x() / grid_size_px) * grid_size_px
-        y = round(point.y() / grid_size_px) * grid_size_px
+        x = round(point.x() / grid_size_dp) * grid_size_dp
+        y = round(point.y() / grid_size_dp) * grid_size_dp
         return QPointF(x, y)
 class HojaAIPanel(QDockWidget):
     """Panel Hoja_AI - Canvas blanco con dimensiones de celular y controles de zoom"""
@@ -1262,6 +1648,14 @@ class HojaAIPanel(QDockWidget):
         self.min_zoom = 0.3
         self.max_zoom = 3.0
         
+        # El relayout por cambio de tamaño se agrupa en vez de hacerse en cada paso de zoom
+        self.zoom_resize_timer = QTimer(self)
+        self.zoom_resize_timer.setSingleShot(True)
+        self.zoom_resize_timer.setInterval(120)
+        self.zoom_resize_timer.timeout.connect(self.apply_zoom_size)
+        
+        self.device_preview = None
+        
         self.setup_ui()
     
     def setup_ui(self):
@@ -1438,49 +1832,22 @@ class HojaAIPanel(QDockWidget):
         
         # Configurar grid para diseño mobile
         self.canvas.snap_to_grid = True
-        self.canvas.grid_size = 8 * self.device_config['density']  # 8dp grid
         
         # Configurar coordenadas Android si existe el método
         if hasattr(self.canvas, 'setup_android_coordinates'):
-            self.canvas.setup_android_coordinates()
+            self.canvas.setup_android_coordinates(
+                self.device_config['width_dp'], self.device_config['height_dp'], self.device_config['density'])
         
-        # Agregar guidelines de Material Design
-        self.add_mobile_guidelines()
+        # Guidelines de Material Design: las dibuja la vista, no son items de la escena
+        self.canvas.set_grid_size(8)
+        self.update_mobile_guidelines()
         
-        # Actualizar estado de botones de zoom
-        self.update_zoom_buttons()
+        # Transformación inicial (densidad x zoom) y estado de los botones de zoom
+        self.apply_zoom()
 
-    def add_mobile_guidelines(self):
-        """Agrega guidelines para diseño mobile"""
-        guideline_style = QPen(QColor(200, 200, 200, 100), 1, Qt.DashLine)
-        
-        # Guidelines de 16dp (márgenes estándar)
-        margin_16dp = 16 * self.device_config['density']
-        
-        # Vertical izquierda
-        line_left = QGraphicsLineItem(margin_16dp, 0, margin_16dp, self.android_height_px)
-        line_left.setPen(guideline_style)
-        self.canvas.scene.addItem(line_left)
-        
-        # Vertical derecha  
-        line_right = QGraphicsLineItem(
-            self.android_width_px - margin_16dp, 0, 
-            self.android_width_px - margin_16dp, self.android_height_px
-        )
-        line_right.setPen(guideline_style)
-        self.canvas.scene.addItem(line_right)
-        
-        # Guidelines horizontales
-        line_top = QGraphicsLineItem(0, margin_16dp, self.android_width_px, margin_16dp)
-        line_top.setPen(guideline_style)
-        self.canvas.scene.addItem(line_top)
-        
-        line_bottom = QGraphicsLineItem(
-            0, self.android_height_px - margin_16dp, 
-            self.android_width_px, self.android_height_px - margin_16dp
-        )
-        line_bottom.setPen(guideline_style)
-        self.canvas.scene.addItem(line_bottom)
+    def update_mobile_guidelines(self):
+        """Ajusta la capa de guías (rejilla de 8dp y keylines de 16dp) al dispositivo actual"""
+        self.canvas.guide_layer.set_page(self.device_config['width_dp'], self.device_config['height_dp'])
 
     def zoom_in(self):
         """Aumenta el zoom"""
@@ -1497,8 +1864,11 @@ class HojaAIPanel(QDockWidget):
     def apply_zoom(self):
         """Aplica el nivel de zoom actual"""
         # Aplicar transformación de escala al canvas
+        self.canvas.render_controller.interaction()
+        # La escena está en dp: la densidad del dispositivo es parte de la transformación de la vista
+        scale = self.zoom_level * self.device_config['density']
         transform = QTransform()
-        transform.scale(self.zoom_level, self.zoom_level)
+        transform.scale(scale, scale)
         self.canvas.setTransform(transform)
         
         # Actualizar label
@@ -1508,7 +1878,11 @@ class HojaAIPanel(QDockWidget):
         # Actualizar estado de botones
         self.update_zoom_buttons()
         
-        # Ajustar el tamaño del widget del canvas para el scroll
+        # Redimensionar el widget del canvas una sola vez cuando el zoom se estabilice
+        self.zoom_resize_timer.start()
+
+    def apply_zoom_size(self):
+        """Ajusta el tamaño del widget del canvas para el scroll"""
         scaled_width = int(self.android_width_px * self.zoom_level)
         scaled_height = int(self.android_height_px * self.zoom_level)
         self.canvas_widget.setFixedSize(scaled_width, scaled_height)
@@ -1558,13 +1932,58 @@ class HojaAIPanel(QDockWidget):
         # Actualizar tamaño del canvas
         self.canvas_widget.setFixedSize(self.android_width_px, self.android_height_px)
         
-        # Limpiar y recrear guidelines
-        self.canvas.scene.clear()
-        self.add_mobile_guidelines()
+        # El diseño se conserva: solo cambian el área visible en dp, las guidelines y la vista
+        self.canvas.setup_android_coordinates(width_dp, height_dp, density)
+        self.update_mobile_guidelines()
         
         # Resetear zoom
         self.reset_zoom()
 
+    def set_device_profile(self, key):
+        """Cambia a uno de los perfiles de DEVICE_PROFILES (phone, tablet, foldable)"""
+        profile = DEVICE_PROFILES[key]
+        self.set_device_dimensions(profile['width_dp'], profile['height_dp'], profile['density'])
+
+    def show_device_previews(self, profiles=None, scale=0.4):
+        """Muestra el diseño en varios perfiles de dispositivo lado a lado"""
+        if self.device_preview is None:
+            self.device_preview = DevicePreviewWidget(self.canvas, profiles, scale)
+            self.device_preview.setWindowFlag(Qt.Tool)
+            self.device_preview.setWindowTitle("Vista previa por dispositivo")
+        elif profiles is not None:
+            self.device_preview.set_profiles(profiles)
+        self.device_preview.resize(self.device_preview.sizeHint())
+        self.device_preview.show()
+        return self.device_preview
+
+    def export_design(self, out_dir, name="design", **options):
+        """Exporta el diseño del dispositivo a PNG en todas las densidades Android y a SVG"""
+        source = QRectF(0, 0, self.device_config['width_dp'], self.device_config['height_dp'])
+        results = export_canvas(self.canvas, out_dir, name, source, base_density=1.0, **options)
+        print(f"🖼️ Diseño exportado en {out_dir}: {', '.join(results)}")
+        return results
+
+    def save_design(self, path, elements=()):
+        """Guarda el diseño del lienzo (y los UIElement dados) en un fichero de diseño; devuelve si se guardó"""
+        try:
+            save_design(path, self.canvas, elements, {'device': dict(self.device_config)})
+        except UnsupportedItemsError as e:
+            QMessageBox.warning(self, "Guardar diseño", str(e))
+            return False
+        print(f"💾 Diseño guardado: {path}")
+        return True
+
+    def open_design(self, path):
+        """Abre un fichero de diseño aplicando sus dimensiones de dispositivo; devuelve el documento"""
+        document = DesignDocument.open(path)
+        device = document.meta.get('device')
+        if device:
+            self.set_device_dimensions(device['width_dp'], device['height_dp'], device['density'])
+        self.canvas.clear_canvas()
+        load_document(self.canvas, document)
+        print(f"📂 Diseño abierto: {path} ({len(document.item_chunks)} bloques)")
+        return document
+
     def get_current_zoom(self):
         """Retorna el nivel de zoom actual"""
         return self.zoom_level
@@ -1572,8 +1991,8 @@ class HojaAIPanel(QDockWidget):
     def on_element_selected(self, element):
         """Maneja la selección de elementos"""
         if element:
-            x_dp = element.x() / self.device_config['density']
-            y_dp = element.y() / self.device_config['density']
+            x_dp = element.x()
+            y_dp = element.y()
             print(f"📍 Elemento en: {x_dp:.1f}dp x {y_dp:.1f}dp")
 
     def sizeHint(self):
@@ -0,0 +1,284 @@
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QColor, QPainterPath, QPen, QPolygonF
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsPathItem, QGraphicsPolygonItem
+
+HANDLE_PIXELS = 7
+HIT_PIXELS = 6
+NODE_COLOR = QColor(0, 120, 215)
+
+
+def _cosmetic_pen(color, width, cap=Qt.SquareCap):
+    pen = QPen(color, width, Qt.SolidLine, cap)
+    pen.setCosmetic(True)
+    return pen
+
+
+class NodeOverlayItem(QGraphicsItem):
+    """Un único item que dibuja todos los nodos del trazado en edición
+
+    Comparte la transformación del item editado, así que dibuja directamente en
+    sus coordenadas; los nodos se pintan con drawPoints y pens cosméticos (una
+    llamada por capa, sin un QGraphicsItem por vértice).
+    """
+
+    def __init__(self, editor):
+        super().__init__()
+        self.editor = editor
+        self._rect = QRectF()
+        self.setZValue(1_000_000)
+        self.setAcceptedMouseButtons(Qt.NoButton)
+
+    def refresh_geometry(self):
+        self.prepareGeometryChange()
+        self._rect = self.editor.handle_rect()
+
+    def boundingRect(self):
+        return self._rect
+
+    def paint(self, painter, option, widget=None):
+        editor = self.editor
+        selected = editor.selected_anchor
+
+        if selected is not None:
+            anchor = editor.anchors[selected]
+            controls = QPolygonF([editor.element_position(element) for element in editor.controls_of(selected)])
+            painter.setPen(_cosmetic_pen(NODE_COLOR, 1))
+            for control in controls:
+                painter.drawLine(anchor, control)
+            painter.setPen(_cosmetic_pen(NODE_COLOR, HANDLE_PIXELS - 1, Qt.RoundCap))
+            painter.drawPoints(controls)
+
+        painter.setPen(_cosmetic_pen(NODE_COLOR, HANDLE_PIXELS))
+        painter.drawPoints(editor.anchors)
+        painter.setPen(_cosmetic_pen(Qt.white, HANDLE_PIXELS - 2))
+        painter.drawPoints(editor.anchors)
+
+        if selected is not None:
+            painter.setPen(_cosmetic_pen(NODE_COLOR, HANDLE_PIXELS))
+            painter.drawPoint(editor.anchors[selected])
+
+
+class NodeEditor:
+    """Edición de nodos de paths (incluidos puntos de control Bézier) y polígonos
+
+    Al empezar a editar se analiza una vez la estructura del trazado: nodos
+    (MoveTo, LineTo y el final de cada curva), sus puntos de control y los
+    nodos que cierran un subtrazado sobre su inicio. Mover un nodo solo toca
+    sus elementos con setElementPositionAt.
+    """
+
+    def __init__(self, canvas):
+        self.canvas = canvas
+        self.item = None
+        self.overlay = None
+        self.shape = None             # QPainterPath o QPolygonF en edición
+        self.anchors = QPolygonF()    # posición de cada nodo (coordenadas del item)
+        self.anchor_elements = []     # nodo -> índice de elemento
+        self.incoming = {}            # nodo -> elemento de control de la curva que llega
+        self.outgoing = {}            # nodo -> elemento de control de la curva que sale
+        self.twins = {}               # nodo final de un subtrazado cerrado <-> nodo inicial
+        self.selected_anchor = None
+        self._drag = None
+        canvas.history.command_applied.connect(self._on_command_applied)
+
+    @property
+    def active(self):
+        return self.item is not None
+
+    @property
+    def dragging(self):
+        return self._drag is not None
+
+    def edit(self, item):
+        """Empieza a editar los nodos de un QGraphicsPathItem o QGraphicsPolygonItem"""
+        self.clear()
+        if not isinstance(item, (QGraphicsPathItem, QGraphicsPolygonItem)):
+            return
+        self.item = item
+        self._analyze()
+        self.overlay = NodeOverlayItem(self)
+        self.overlay.setTransform(item.sceneTransform())
+        self.overlay.refresh_geometry()
+        self.canvas.scene.addItem(self.overlay)
+
+    def clear(self):
+        self._drag = None
+        self.item = None
+        self.shape = None
+        self.anchors = QPolygonF()
+        self.anchor_elements = []
+        self.incoming = {}
+        self.outgoing = {}
+        self.twins = {}
+        self.selected_anchor = None
+        if self.overlay is not None:
+            if self.overlay.scene() is not None:
+                self.overlay.scene().removeItem(self.overlay)
+            self.overlay = None
+
+    def _analyze(self):
+        item = self.item
+        if isinstance(item, QGraphicsPolygonItem):
+            self.shape = item.polygon()
+            self.anchors = QPolygonF(self.shape)
+            self.anchor_elements = list(range(len(self.shape)))
+            return
+
+        path = self.shape = item.path()
+        anchors = []
+        subpath_start = None
+        count = path.elementCount()
+        i = 0
+        while i < count:
+            element = path.elementAt(i)
+            if element.type == QPainterPath.CurveToElement and i + 2 < count:
+                # Cúbica: control 1 (i), control 2 (i+1), nodo final (i+2)
+                self.outgoing[len(anchors) - 1] = i
+                self.incoming[len(anchors)] = i + 1
+                end = path.elementAt(i + 2)
+                anchors.append(QPointF(end.x, end.y))
+                self.anchor_elements.append(i + 2)
+                i += 3
+                continue
+            if element.type == QPainterPath.MoveToElement:
+                self._link_closed_subpath(anchors, subpath_start)
+                subpath_start = len(anchors)
+            anchors.append(QPointF(element.x, element.y))
+            self.anchor_elements.append(i)
+            i += 1
+        self._link_closed_subpath(anchors, subpath_start)
+        self.anchors = QPolygonF(anchors)
+
+    def _link_closed_subpath(self, anchors, start):
+        last = len(anchors) - 1
+        if start is not None and last > start and anchors[last] == anchors[start]:
+            self.twins[start] = last
+            self.twins[last] = start
+
+    def _on_command_applied(self, command):
+        # Deshacer/rehacer o cambios externos del item editado: volver a analizarlo
+        if self.item is None or self._drag is not None or self.item not in command.affected_items():
+            return
+        item = self.item
+        if item in self.canvas.index:
+            selected = self.selected_anchor
+            self.edit(item)
+            if selected is not None and selected < len(self.anchors):
+                self.selected_anchor = selected
+        else:
+            self.clear()
+
+    # GEOMETRÍA
+    def element_position(self, element):
+        if isinstance(self.shape, QPolygonF):
+            return self.shape[element]
+        point = self.shape.elementAt(element)
+        return QPointF(point.x, point.y)
+
+    def _set_element_position(self, element, position):
+        if isinstance(self.shape, QPolygonF):
+            self.shape[element] = position
+        else:
+            self.shape.setElementPositionAt(element, position.x(), position.y())
+
+    def controls_of(self, anchor):
+        return [element for element in (self.incoming.get(anchor), self.outgoing.get(anchor))
+                if element is not None]
+
+    def _pixel_size(self):
+        """Tamaño de un píxel de pantalla en coordenadas del item"""
+        scale = abs(self.canvas.transform().m11() * self.item.sceneTransform().m11())
+        return 1.0 / scale if scale > 1e-9 else 1.0
+
+    def handle_rect(self):
+        if isinstance(self.shape, QPolygonF):
+            rect = self.shape.boundingRect()
+        else:
+            rect = self.shape.controlPointRect()
+        margin = HANDLE_PIXELS * self._pixel_size()
+        return rect.adjusted(-margin, -margin, margin, margin)
+
+    # INTERACCIÓN
+    def hit_test(self, scene_pos):
+        """('control', elemento) o ('anchor', nodo) bajo el punto de escena, o None"""
+        if self.item is None:
+            return None
+        pos = self.item.mapFromScene(scene_pos)
+        tolerance = HIT_PIXELS * self._pixel_size()
+        limit = tolerance * tolerance
+
+        def distance(point):
+            dx = point.x() - pos.x()
+            dy = point.y() - pos.y()
+            return dx * dx + dy * dy
+
+        if self.selected_anchor is not None:
+            for element in self.controls_of(self.selected_anchor):
+                if distance(self.element_position(element)) <= limit:
+                    return ("control", element)
+
+        best = None
+        best_distance = limit
+        for index, anchor in enumerate(self.anchors):
+            d = distance(anchor)
+            if d <= best_distance:
+                best, best_distance = index, d
+        return ("anchor", best) if best is not None else None
+
+    def begin_drag(self, hit, scene_pos):
+        kind, index = hit
+        if kind == "anchor":
+            self.selected_anchor = index
+            anchors = [index] + ([self.twins[index]] if index in self.twins else [])
+            elements = []
+            for anchor in anchors:
+                elements.append(self.anchor_elements[anchor])
+                elements.extend(self.controls_of(anchor))
+            origin = self.anchors[index]
+        else:
+            anchors = []
+            elements = [index]
+            origin = self.element_position(index)
+        self._drag = {
+            "press": QPointF(scene_pos),
+            "origin": self.item.mapToScene(origin),
+            "item_origin": QPointF(origin),
+            "anchors": {anchor: QPointF(self.anchors[anchor]) for anchor in anchors},
+            "elements": {element: self.element_position(element) for element in elements},
+            "before": type(self.shape)(self.shape),
+        }
+        self.overlay.update()
+
+    def drag_to(self, scene_pos, snap=None):
+        """Mueve el nodo o control arrastrado; snap ajusta la posición de escena resultante"""
+        drag = self._drag
+        if drag is None:
+            return
+        target = drag["origin"] + (scene_pos - drag["press"])
+        if snap is not None:
+            target = snap(target)
+        delta = self.item.mapFromScene(target) - drag["item_origin"]
+
+        for element, start in drag["elements"].items():
+            self._set_element_position(element, start + delta)
+        for anchor, start in drag["anchors"].items():
+            self.anchors[anchor] = start + delta
+
+        if isinstance(self.shape, QPolygonF):
+            self.item.setPolygon(self.shape)
+        else:
+            self.item.setPath(self.shape)
+        self.overlay.refresh_geometry()
+        self.overlay.update()
+
+    def end_drag(self):
+        """Termina el arrastre; devuelve (item, forma anterior, forma nueva) si hubo cambios"""
+        drag = self._drag
+        self._drag = None
+        if drag is None:
+            return None
+        before = drag["before"]
+        after = type(self.shape)(self.shape)
+        if before == after:
+            return None
+        return self.item, before, after
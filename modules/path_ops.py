@@ -0,0 +1,305 @@
+import math
+
+from PySide6.QtCore import QPointF, QThread, Qt, Signal
+from PySide6.QtGui import QBrush, QPainterPath, QPainterPathStroker, QPen, QTransform
+from PySide6.QtWidgets import (
+    QGraphicsEllipseItem, QGraphicsLineItem, QGraphicsPathItem, QGraphicsPolygonItem, QGraphicsRectItem
+)
+
+from .strokes import simplify_points, points_to_path
+from .canvas_rendering import LodPathItem
+
+
+def swept_footprint(points, diameter):
+    """Área barrida por un borrador circular que recorre los puntos dados"""
+    path = QPainterPath()
+    if not points:
+        return path
+    if len(points) == 1:
+        radius = diameter / 2
+        path.addEllipse(points[0], radius, radius)
+        return path
+
+    line = QPainterPath(points[0])
+    for point in points[1:]:
+        line.lineTo(point)
+    stroker = QPainterPathStroker()
+    stroker.setWidth(diameter)
+    stroker.setCapStyle(Qt.RoundCap)
+    stroker.setJoinStyle(Qt.RoundJoin)
+    return stroker.createStroke(line).simplified()
+
+
+def path_subpaths(path):
+    """Separa un QPainterPath en un QPainterPath por subpath, conservando sus curvas"""
+    subpaths = []
+    current = None
+    i = 0
+    count = path.elementCount()
+    while i < count:
+        element = path.elementAt(i)
+        if element.type == QPainterPath.MoveToElement or current is None:
+            current = QPainterPath(QPointF(element.x, element.y))
+            current.setFillRule(path.fillRule())
+            subpaths.append(current)
+            i += 1
+        elif element.type == QPainterPath.CurveToElement:
+            c2 = path.elementAt(i + 1)
+            end = path.elementAt(i + 2)
+            current.cubicTo(element.x, element.y, c2.x, c2.y, end.x, end.y)
+            i += 3
+        else:
+            current.lineTo(element.x, element.y)
+            i += 1
+    return subpaths
+
+
+def _split_polygon(points, footprint, step, closed):
+    """Tramos de una polilínea fuera de footprint, muestreada cada step; None si no la toca"""
+    runs = []
+    head = None
+    current = []
+    for i, point in enumerate(points):
+        samples = [point]
+        if i + 1 < len(points):
+            nxt = points[i + 1]
+            length = math.hypot(nxt.x() - point.x(), nxt.y() - point.y())
+            count = int(length // step)
+            samples.extend(
+                point + (nxt - point) * (k / (count + 1)) for k in range(1, count + 1)
+            )
+        for sample in samples:
+            if footprint.contains(sample):
+                if head is None:
+                    head = current
+                elif len(current) > 1:
+                    runs.append(current)
+                current = []
+            else:
+                current.append(sample)
+
+    if head is None:
+        return None
+    tail = current
+    if closed and head and tail:
+        # El cierre une el último tramo con el primero: no se corta por la costura
+        tail = tail + head[1:]
+        head = []
+    if len(head) > 1:
+        runs.insert(0, head)
+    if len(tail) > 1:
+        runs.append(tail)
+    return runs
+
+
+def split_outside(path, footprint, step):
+    """Divide un trazo abierto en los tramos que quedan fuera de footprint
+
+    Solo se aplanan (a polilíneas muestreadas cada step unidades) los subpaths
+    que la huella toca; el resto conserva sus elementos originales. Devuelve
+    la lista de paths resultantes, o None si ningún punto cae dentro.
+    """
+    bounds = footprint.boundingRect()
+    pieces = []
+    touched = False
+
+    for subpath in path_subpaths(path):
+        rect = subpath.controlPointRect()
+        # Comparación inclusiva: los trazos rectos tienen bounding box de alto o ancho 0
+        if (rect.left() > bounds.right() or rect.right() < bounds.left() or
+                rect.top() > bounds.bottom() or rect.bottom() < bounds.top()):
+            pieces.append(subpath)
+            continue
+
+        polygons = subpath.toSubpathPolygons()
+        points = list(polygons[0]) if polygons else []
+        runs = _split_polygon(points, footprint, step, _subpath_is_closed(points)) if points else None
+        if runs is None:
+            pieces.append(subpath)
+            continue
+        touched = True
+        # Las muestras intermedias son colineales: reducirlas a los vértices y los cortes
+        pieces.extend(polyline_path(simplify_points(run, 0.25)) for run in runs)
+
+    return pieces if touched else None
+
+
+def polyline_path(points):
+    path = QPainterPath(points[0])
+    for point in points[1:]:
+        path.lineTo(point)
+    return path
+
+
+def clone_path_item(item, path):
+    """Crea un QGraphicsPathItem con el mismo estilo y transformación que item"""
+    clone = LodPathItem(path)
+    clone.setPen(item.pen())
+    if hasattr(item, 'brush'):
+        clone.setBrush(item.brush())
+    clone.setFlags(item.flags())
+    clone.setTransform(item.transform())
+    clone.setPos(item.pos())
+    clone.setRotation(item.rotation())
+    clone.setScale(item.scale())
+    clone.setZValue(item.zValue())
+    clone.setOpacity(item.opacity())
+    return clone
+
+
+def erase_from_item(item, footprint):
+    """Resta la huella del borrador (en escena) a un item de path o línea
+
+    Los items con relleno se recortan con una resta booleana; los trazos
+    abiertos se parten en los tramos que quedan fuera. Devuelve la lista de
+    paths resultantes en coordenadas del item, o None si no hay cambios.
+    """
+    local = item.mapFromScene(footprint)
+
+    if isinstance(item, QGraphicsPathItem):
+        path = item.path()
+    else:
+        line = item.line()
+        path = QPainterPath(line.p1())
+        path.lineTo(line.p2())
+
+    filled = isinstance(item, QGraphicsPathItem) and item.brush().style() != Qt.NoBrush
+    if filled:
+        if not path.intersects(local):
+            return None
+        result = path.subtracted(local)
+        return [result] if not result.isEmpty() else []
+
+    pen_width = max(1.0, item.pen().widthF())
+    return split_outside(path, local, step=max(0.5, min(pen_width, 4.0)))
+
+
+# OPERACIONES DE TRAZADO (booleanas, simplificar, contornear trazo)
+#
+# Las funciones de cálculo trabajan solo con QPainterPath (tipo valor,
+# reentrante), así que pueden ejecutarse en un hilo aparte sobre copias.
+
+# A partir de este número de elementos la operación se ejecuta en un worker
+WORKER_ELEMENT_THRESHOLD = 2000
+
+BOOLEAN_OPERATIONS = ("union", "subtract", "intersect")
+
+
+def item_local_path(item):
+    """Geometría de un item de diseño como QPainterPath en sus coordenadas, o None"""
+    if isinstance(item, QGraphicsPathItem):
+        return item.path()
+    path = QPainterPath()
+    if isinstance(item, QGraphicsRectItem):
+        path.addRect(item.rect())
+    elif isinstance(item, QGraphicsEllipseItem):
+        path.addEllipse(item.rect())
+    elif isinstance(item, QGraphicsPolygonItem):
+        path.addPolygon(item.polygon())
+        path.closeSubpath()
+    elif isinstance(item, QGraphicsLineItem):
+        path.moveTo(item.line().p1())
+        path.lineTo(item.line().p2())
+    else:
+        return None
+    return path
+
+
+def item_scene_path(item):
+    path = item_local_path(item)
+    return None if path is None else item.sceneTransform().map(path)
+
+
+def boolean_paths(paths, operation):
+    """Combina paths (de abajo hacia arriba) con union, subtract o intersect
+
+    subtract resta al de más abajo todos los que tiene encima, como "Menos
+    frente" de Illustrator.
+    """
+    if operation not in BOOLEAN_OPERATIONS:
+        raise ValueError(f"Operación booleana desconocida: {operation}")
+    result = QPainterPath(paths[0])
+    result.setFillRule(Qt.WindingFill)
+    for path in paths[1:]:
+        if operation == "union":
+            result = result.united(path)
+        elif operation == "subtract":
+            result = result.subtracted(path)
+        else:
+            result = result.intersected(path)
+    return result.simplified()
+
+
+def _subpath_is_closed(polygon):
+    return len(polygon) > 2 and polygon[0] == polygon[-1]
+
+
+def simplify_path(path, tolerance, smooth=False):
+    """Aplana el path y reduce sus vértices con RDP; smooth reconstruye con curvas Bézier"""
+    result = QPainterPath()
+    result.setFillRule(path.fillRule())
+    for polygon in path.toSubpathPolygons():
+        points = simplify_points(list(polygon), tolerance)
+        if not points:
+            continue
+        closed = _subpath_is_closed(polygon)
+        result.addPath(points_to_path(points, smooth))
+        if closed:
+            result.closeSubpath()
+    return result
+
+
+def outline_stroke(path, pen):
+    """Contorno relleno equivalente al trazo de path con pen (grosor, extremos, uniones y guiones)"""
+    stroker = QPainterPathStroker(pen)
+    stroker.setWidth(max(pen.widthF(), 1.0))
+    return stroker.createStroke(path).simplified()
+
+
+def simplify_paths(paths, tolerance, smooth=False):
+    return [simplify_path(path, tolerance, smooth) for path in paths]
+
+
+def outline_paths(paths, pens):
+    return [outline_stroke(path, pen) for path, pen in zip(paths, pens)]
+
+
+def path_elements(paths):
+    return sum(path.elementCount() for path in paths)
+
+
+def styled_path_item(style_item, path, pen=None):
+    """Item de path en coordenadas de escena con el estilo (pen, relleno, z) de style_item"""
+    item = clone_path_item(style_item, path)
+    if pen is not None:
+        item.setPen(pen)
+    item.setTransform(QTransform())
+    item.setPos(0, 0)
+    item.setRotation(0)
+    item.setScale(1)
+    return item
+
+
+def outline_item(item, path, pen):
+    """Item relleno con el color del trazo que sustituye a item tras contornear su trazo"""
+    outline = clone_path_item(item, path)
+    outline.setBrush(QBrush(pen.color()))
+    outline.setPen(QPen(Qt.NoPen))
+    return outline
+
+
+class PathOperationWorker(QThread):
+    """Worker que calcula una operación de trazado fuera del hilo de la GUI"""
+    result_ready = Signal(object)
+    error_occurred = Signal(str)
+
+    def __init__(self, function, *args, parent=None):
+        super().__init__(parent)
+        self.function = function
+        self.args = args
+
+    def run(self):
+        try:
+            self.result_ready.emit(self.function(*self.args))
+        except Exception as e:
+            self.error_occurred.emit(str(e))
@@ -0,0 +1,330 @@
+import base64
+import hashlib
+import json
+import os
+import queue
+import threading
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtGui import QTextCursor
+
+from .design_file import StyleTable, decode_items, encode_item
+
+# Diario de recuperación: un registro JSON por línea, solo se añaden líneas
+#
+#   {"t": "open", "file": ruta, "base": sha1}          inicio de cambios sobre el contenido base
+#   {"t": "edit", "file": ruta, "pos": p, "del": n, "ins": texto}
+#   {"t": "text", "file": ruta, "base": sha1, "text": texto}   resultado de compactar
+#   {"t": "saved", "file": ruta}                        el fichero ya no tiene cambios pendientes
+#   {"t": "item", "id": n, "styles": b64, "data": b64}  estado de un item del lienzo
+#   {"t": "item_unsupported", "id": n, "type": clase}   item que el formato no sabe guardar
+#   {"t": "item_del", "id": n}
+#   {"t": "canvas_clear"}
+#
+# Las posiciones son de QTextDocument (unidades UTF-16), igual que en el editor.
+
+
+def text_hash(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def read_base_text(file_path):
+    """Lee el fichero igual que lo abre el workspace"""
+    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+        return f.read()
+
+
+def apply_edits(text, edits):
+    """Aplica deltas con posiciones UTF-16 sobre un texto"""
+    buffer = bytearray(text.encode("utf-16-le"))
+    for edit in edits:
+        start = 2 * edit["pos"]
+        buffer[start:start + 2 * edit["del"]] = edit["ins"].encode("utf-16-le")
+    return buffer.decode("utf-16-le")
+
+
+def read_records(path):
+    """Lee los registros válidos; una última línea a medio escribir se ignora"""
+    records = []
+    if not os.path.exists(path):
+        return records
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+    return records
+
+
+def reduce_records(records, read_base=read_base_text):
+    """Estado final del diario: {ruta: texto recuperado}, {id: registro de item}
+
+    Los ficheros cuyo contenido en disco ya no coincide con la base del diario
+    se descartan en vez de aplicar deltas sobre un texto distinto.
+    """
+    files = {}
+    items = {}
+    for record in records:
+        kind = record.get("t")
+        if kind == "open":
+            files[record["file"]] = {"base": record["base"], "text": None, "edits": []}
+        elif kind == "text":
+            files[record["file"]] = {"base": record["base"], "text": record["text"], "edits": []}
+        elif kind == "edit":
+            state = files.get(record["file"])
+            if state is not None:
+                state["edits"].append(record)
+        elif kind == "saved":
+            files.pop(record["file"], None)
+        elif kind in ("item", "item_unsupported"):
+            items[record["id"]] = record
+        elif kind == "item_del":
+            items.pop(record["id"], None)
+        elif kind == "canvas_clear":
+            items.clear()
+
+    texts = {}
+    for file_path, state in files.items():
+        text = state["text"]
+        if text is None:
+            try:
+                text = read_base(file_path)
+            except OSError:
+                continue
+            if text_hash(text) != state["base"]:
+                print(f"⚠️ {file_path} cambió en disco; no se recuperan sus cambios")
+                continue
+        texts[file_path] = (state["base"], apply_edits(text, state["edits"]))
+    return texts, items
+
+
+def compact_records(records, read_base=read_base_text):
+    """Reescribe el diario como una instantánea por fichero y un registro por item vivo"""
+    texts, items = reduce_records(records, read_base)
+    compacted = [{"t": "text", "file": file_path, "base": base, "text": text}
+                 for file_path, (base, text) in texts.items()]
+    compacted.extend(items.values())
+    return compacted
+
+
+def recover(path):
+    """Textos, items del lienzo y tipos de los items que no se pueden restaurar de un diario interrumpido"""
+    texts, items = reduce_records(read_records(path))
+    canvas_items = []
+    unsupported = []
+    for record in items.values():
+        if record["t"] == "item_unsupported":
+            unsupported.append(record["type"])
+            continue
+        styles = StyleTable.decode(memoryview(base64.b64decode(record["styles"])))
+        canvas_items.extend(decode_items(memoryview(base64.b64decode(record["data"])), 1, styles))
+    return {file_path: text for file_path, (_, text) in texts.items()}, canvas_items, unsupported
+
+
+class JournalWriter(threading.Thread):
+    """Hilo que escribe, sincroniza (fsync) y compacta el diario fuera del hilo de la GUI"""
+
+    def __init__(self, path):
+        super().__init__(daemon=True)
+        self.path = path
+        self.queue = queue.Queue()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def run(self):
+        while True:
+            command, payload = self.queue.get()
+            try:
+                if command == "append":
+                    self._file.write(payload)
+                    self._file.flush()
+                    os.fsync(self._file.fileno())
+                elif command == "compact":
+                    self._compact()
+                elif command == "close":
+                    self._file.close()
+                    if payload and os.path.exists(self.path):
+                        os.remove(self.path)
+                    return
+            except Exception as e:
+                print(f"❌ Error en el diario de recuperación: {e}")
+
+    def _compact(self):
+        self._file.close()
+        records = compact_records(read_records(self.path))
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+
+class RecoveryJournal(QObject):
+    """Registra en segundo plano los cambios sin guardar de editores y lienzo
+
+    Los registros se acumulan en memoria y se envían en lotes al hilo escritor;
+    cada pulsación solo cuesta construir un diccionario pequeño.
+    """
+
+    FLUSH_INTERVAL = 1000
+    COMPACT_EVERY = 2000
+
+    flushed = Signal()
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self._pending = []
+        self._since_compaction = 0
+        self._editors = {}   # ruta -> estado del editor
+        self._canvas = None
+        self._item_ids = {}
+        self._next_item_id = 1
+
+        self.writer = JournalWriter(path)
+        self.writer.start()
+
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.setInterval(self.FLUSH_INTERVAL)
+        self.flush_timer.timeout.connect(self.flush)
+
+    @staticmethod
+    def take_crashed(path):
+        """Si quedó un diario de una sesión interrumpida lo aparta y devuelve su ruta"""
+        if not os.path.exists(path) or not read_records(path):
+            return None
+        crashed = path + ".crashed"
+        os.replace(path, crashed)
+        return crashed
+
+    def append(self, record):
+        pending = self._pending
+        last = pending[-1] if pending else None
+        # Escritura continua: fusionar inserciones consecutivas en un solo delta
+        if (last is not None and record["t"] == "edit" and last["t"] == "edit" and
+                last["file"] == record["file"] and record["del"] == 0 and
+                record["pos"] == last["pos"] + len(last["ins"].encode("utf-16-le")) // 2):
+            last["ins"] += record["ins"]
+            return
+        pending.append(record)
+        if not self.flush_timer.isActive():
+            self.flush_timer.start()
+
+    def flush(self):
+        """Envía los registros pendientes al hilo escritor"""
+        self.flush_timer.stop()
+        if not self._pending:
+            return
+        lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in self._pending)
+        self._since_compaction += len(self._pending)
+        self._pending = []
+        self.writer.queue.put(("append", lines))
+        if self._since_compaction >= self.COMPACT_EVERY:
+            self._since_compaction = 0
+            self.writer.queue.put(("compact", None))
+        self.flushed.emit()
+
+    def close(self, clean=True):
+        """Termina el diario; en un cierre limpio se borra porque no hay nada que recuperar"""
+        self.flush()
+        self.writer.queue.put(("close", clean))
+        self.writer.join(5)
+
+    # EDITORES
+    def track_editor(self, file_path, editor):
+        """Empieza a registrar los cambios de un editor cuyo contenido coincide con el disco"""
+        document = editor.document()
+        state = {
+            "document": document,
+            "base": text_hash(document.toPlainText()),
+            "length": document.characterCount() - 1,
+            "revision": document.revision(),
+            "opened": False,
+        }
+        self._editors[file_path] = state
+        document.contentsChange.connect(
+            lambda position, removed, added: self._on_contents_change(file_path, position, removed, added))
+
+    def _on_contents_change(self, file_path, position, removed, added):
+        state = self._editors.get(file_path)
+        if state is None:
+            return
+        document = state["document"]
+        # El resaltado de sintaxis emite contentsChange sin cambiar el texto ni la revisión
+        revision = document.revision()
+        if revision == state["revision"]:
+            return
+        state["revision"] = revision
+
+        length = document.characterCount() - 1
+        # Qt incluye el separador final implícito en algunos cambios; se recorta a la longitud real
+        removed = max(0, min(removed, state["length"] - position))
+        added = max(0, min(added, length - position))
+        state["length"] = length
+
+        if not state["opened"]:
+            state["opened"] = True
+            self.append({"t": "open", "file": file_path, "base": state["base"]})
+        inserted = ""
+        if added:
+            cursor = QTextCursor(document)
+            cursor.setPosition(position)
+            cursor.setPosition(position + added, QTextCursor.KeepAnchor)
+            inserted = cursor.selectedText().replace("\u2029", "\n")
+        self.append({"t": "edit", "file": file_path, "pos": position, "del": removed, "ins": inserted})
+
+    def file_saved(self, file_path, content):
+        """El contenido guardado pasa a ser la nueva base del fichero"""
+        state = self._editors.get(file_path)
+        if state is not None:
+            state["base"] = text_hash(content)
+            state["opened"] = False
+        self.append({"t": "saved", "file": file_path})
+
+    def untrack_editor(self, file_path):
+        if self._editors.pop(file_path, None) is not None:
+            self.append({"t": "saved", "file": file_path})
+
+    # LIENZO
+    def track_canvas(self, canvas):
+        self._canvas = canvas
+        canvas.history.command_applied.connect(self._on_canvas_command)
+        canvas.cleared.connect(self._on_canvas_cleared)
+
+    def _item_id(self, item):
+        item_id = self._item_ids.get(item)
+        if item_id is None:
+            item_id = self._item_ids[item] = self._next_item_id
+            self._next_item_id += 1
+        return item_id
+
+    def _on_canvas_command(self, command):
+        canvas = self._canvas
+        for item in command.affected_items():
+            if item in canvas.index:
+                styles = StyleTable()
+                parts = []
+                # Los items seleccionados llevan el pen de resaltado: se guarda el original
+                original = getattr(canvas, 'selection_originals', {}).get(item)
+                if not encode_item(item, styles, parts, original):
+                    # Se anota igualmente para avisar al recuperar en vez de perderlo sin más
+                    self.append({"t": "item_unsupported", "id": self._item_id(item),
+                                 "type": type(item).__name__})
+                    continue
+                self.append({
+                    "t": "item",
+                    "id": self._item_id(item),
+                    "styles": base64.b64encode(styles.encode()).decode("ascii"),
+                    "data": base64.b64encode(b"".join(parts)).decode("ascii"),
+                })
+            elif item in self._item_ids:
+                self.append({"t": "item_del", "id": self._item_ids[item]})
+
+    def _on_canvas_cleared(self):
+        self._item_ids = {}
+        self.append({"t": "canvas_clear"})
@@ -0,0 +1,178 @@
+from PySide6.QtCore import QAbstractListModel, QAbstractProxyModel, QModelIndex, QTimer, Qt
+
+# Rol con la clave de ranking de "más reciente" (timestamp, mayor = más reciente)
+RecentRole = Qt.UserRole + 1
+
+SEARCH_DEBOUNCE = 120
+
+# Rol -> campo de la entrada (diccionario para no comparar enums en cada data())
+ROLE_FIELDS = {
+    Qt.DisplayRole: "text",
+    Qt.UserRole: "data",
+    RecentRole: "recent",
+    Qt.ForegroundRole: "foreground",
+    Qt.ToolTipRole: "tooltip",
+}
+
+
+def fuzzy_score(query, key):
+    """Puntuación de query dentro de key (ambos en minúsculas) o None si no coincide
+
+    Subcadena: mejor cuanto antes empieza y si empieza palabra. Si no, una
+    subsecuencia (las letras en orden) puntúa menos y penaliza los huecos.
+    """
+    if not query:
+        return 0.0
+    position = key.find(query)
+    if position >= 0:
+        word_start = position == 0 or not key[position - 1].isalnum()
+        return 1000.0 - position + (500.0 if word_start else 0.0)
+
+    score = 100.0
+    last = -1
+    for char in query:
+        found = key.find(char, last + 1)
+        if found < 0:
+            return None
+        score -= found - last - 1
+        last = found
+    return max(score, 1.0)
+
+
+class SearchListModel(QAbstractListModel):
+    """Lista plana para buscar: cada entrada guarda su clave de búsqueda ya en minúsculas
+
+    Entrada: {"text", "key", "data", "recent", "foreground", "tooltip"}; solo
+    "text" es obligatorio.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries = []
+
+    @staticmethod
+    def make_entry(text, data=None, search_text=None, recent=0.0, foreground=None, tooltip=None):
+        return {
+            "text": text,
+            "key": (search_text if search_text is not None else text).lower(),
+            "data": data,
+            "recent": recent or 0.0,
+            "foreground": foreground,
+            "tooltip": tooltip,
+        }
+
+    def set_entries(self, entries):
+        self.beginResetModel()
+        self._entries = list(entries)
+        self.endResetModel()
+
+    def entry(self, row):
+        return self._entries[row]
+
+    def update_entry(self, row, **changes):
+        """Cambia campos de una entrada; "search_text" recalcula su clave"""
+        entry = self._entries[row]
+        search_text = changes.pop("search_text", None)
+        entry.update(changes)
+        if search_text is not None:
+            entry["key"] = search_text.lower()
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def search_key(self, row):
+        return self._entries[row]["key"]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._entries)
+
+    def data(self, index, role=Qt.DisplayRole):
+        field = ROLE_FIELDS.get(role)
+        if field is None or not index.isValid():
+            return None
+        return self._entries[index.row()][field]
+
+
+class SearchFilterProxyModel(QAbstractProxyModel):
+    """Filtro difuso + orden por relevancia, luego por uso reciente, luego por orden original
+
+    Proxy de lista con el mapeo explícito: en cada búsqueda se puntúan las
+    claves ya en minúsculas del modelo y se ordena una lista de tuplas (en C);
+    mapear entre filas es una consulta en una lista o un diccionario. Así no
+    hay llamadas a lessThan/data desde Qt por cada comparación.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._query = ""
+        self._rows = []        # fila del proxy -> fila del modelo
+        self._positions = {}   # fila del modelo -> fila del proxy
+
+    def set_query(self, text):
+        query = text.strip().lower()
+        if query == self._query:
+            return
+        self._query = query
+        self.refresh()
+
+    def refresh(self):
+        """Recalcula puntuaciones y orden (tras cambiar la búsqueda o los datos)"""
+        model = self.sourceModel()
+        ranked = []
+        if model is not None:
+            query = self._query
+            for row in range(model.rowCount()):
+                score = fuzzy_score(query, model.search_key(row))
+                if score is not None:
+                    ranked.append((-score, -model.entry(row)["recent"], row))
+        ranked.sort()
+
+        self.beginResetModel()
+        self._rows = [row for _, _, row in ranked]
+        self._positions = {row: position for position, row in enumerate(self._rows)}
+        self.endResetModel()
+
+    def setSourceModel(self, model):
+        super().setSourceModel(model)
+        model.modelReset.connect(self.refresh)
+        model.dataChanged.connect(self._source_data_changed)
+        self.refresh()
+
+    def _source_data_changed(self, top_left, bottom_right, roles=()):
+        for row in range(top_left.row(), bottom_right.row() + 1):
+            position = self._positions.get(row)
+            if position is not None:
+                index = self.index(position, 0)
+                self.dataChanged.emit(index, index)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 1
+
+    def index(self, row, column=0, parent=QModelIndex()):
+        if parent.isValid() or column != 0 or not 0 <= row < len(self._rows):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or proxy_index.row() >= len(self._rows):
+            return QModelIndex()
+        return self.sourceModel().index(self._rows[proxy_index.row()], 0)
+
+    def mapFromSource(self, source_index):
+        position = self._positions.get(source_index.row()) if source_index.isValid() else None
+        return QModelIndex() if position is None else self.index(position, 0)
+
+
+def connect_search(line_edit, proxy, delay=SEARCH_DEBOUNCE):
+    """Aplica el texto de line_edit al proxy con un pequeño retardo tras la última tecla"""
+    timer = QTimer(line_edit)
+    timer.setSingleShot(True)
+    timer.setInterval(delay)
+    timer.timeout.connect(lambda: proxy.set_query(line_edit.text()))
+    line_edit.textChanged.connect(lambda _text: timer.start())
+    return timer
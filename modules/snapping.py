@@ -0,0 +1,257 @@
+from bisect import bisect_left, bisect_right
+
+from PySide6.QtCore import QLineF, QPointF, QRectF
+from PySide6.QtGui import QColor, QPen
+from PySide6.QtWidgets import QGraphicsLineItem, QGraphicsPathItem
+
+
+def geometry_rect(item):
+    """Rectángulo de escena de la geometría del item, sin el grosor del trazo
+
+    Así la alineación no cambia cuando la selección sustituye el pen del item.
+    """
+    if isinstance(item, QGraphicsPathItem):
+        rect = item.path().boundingRect()
+    elif isinstance(item, QGraphicsLineItem):
+        line = item.line()
+        rect = QRectF(line.p1(), line.p2()).normalized()
+    elif hasattr(item, "rect"):
+        rect = item.rect()
+    else:
+        rect = item.boundingRect()
+    return item.mapRectToScene(rect)
+
+
+class EdgeIndex:
+    """Bordes de un eje ordenados por valor: búsqueda por intervalo con bisect en O(log n + k)"""
+
+    def __init__(self, entries=()):
+        entries = sorted(entries, key=lambda entry: entry[0])
+        self.values = [entry[0] for entry in entries]
+        self.owners = [entry[1] for entry in entries]
+
+    def __len__(self):
+        return len(self.values)
+
+    def query(self, low, high):
+        """(valor, dueño) con low <= valor <= high"""
+        start = bisect_left(self.values, low)
+        end = bisect_right(self.values, high)
+        return [(self.values[i], self.owners[i]) for i in range(start, end)]
+
+    def before(self, value):
+        """Índices de las entradas <= value, de la más cercana a la más lejana"""
+        return range(bisect_right(self.values, value) - 1, -1, -1)
+
+    def after(self, value):
+        return range(bisect_left(self.values, value), len(self.values))
+
+
+def _features(rect, horizontal):
+    """Bordes y centro de un rectángulo en un eje: (inicio, centro, fin)"""
+    if horizontal:
+        return rect.left(), rect.center().x(), rect.right()
+    return rect.top(), rect.center().y(), rect.bottom()
+
+
+def _overlaps(a, b, horizontal):
+    """¿Se solapan a y b en el eje perpendicular? (misma fila o columna)"""
+    if horizontal:
+        return a.top() <= b.bottom() and b.top() <= a.bottom()
+    return a.left() <= b.right() and b.left() <= a.right()
+
+
+class SnapEngine:
+    """Alineación inteligente al arrastrar: bordes y centros de otros items, página y espaciado igual
+
+    Al empezar el arrastre se construyen índices ordenados de los bordes de los
+    items visibles (sin los que se mueven); cada movimiento solo hace búsquedas
+    binarias sobre ellos.
+    """
+
+    SNAP_PIXELS = 6
+    NEIGHBOR_SCAN = 32
+    GUIDE_COLOR = QColor(255, 0, 140)
+
+    def __init__(self, view):
+        self.view = view
+        self.enabled = True
+        self.moving = []
+        self.guides = []
+        self._bounds = {}
+        self._edges = {}   # (eje, característica) -> EdgeIndex
+        self._page = QRectF()
+
+    @property
+    def active(self):
+        return bool(self.moving)
+
+    def begin(self, items, page=None):
+        """Prepara los índices para arrastrar items"""
+        self.end()
+        if not self.enabled or not items:
+            return
+        self.moving = list(items)
+        moving = set(self.moving)
+        self._page = QRectF(page) if page is not None else QRectF()
+
+        visible = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        self._bounds = {
+            item: geometry_rect(item)
+            for item in self.view.index.spatial.query_rect(visible)
+            if item not in moving
+        }
+        if not self._page.isEmpty():
+            self._bounds[None] = self._page
+
+        for horizontal in (True, False):
+            starts, centers, ends = [], [], []
+            for owner, rect in self._bounds.items():
+                start, center, end = _features(rect, horizontal)
+                starts.append((start, owner))
+                centers.append((center, owner))
+                ends.append((end, owner))
+            self._edges[horizontal, 0] = EdgeIndex(starts)
+            self._edges[horizontal, 1] = EdgeIndex(centers)
+            self._edges[horizontal, 2] = EdgeIndex(ends)
+
+    def end(self):
+        self.moving = []
+        self._bounds = {}
+        self._edges = {}
+        if self.guides:
+            self.guides = []
+            self.view.viewport().update()
+
+    def moving_rect(self):
+        rect = QRectF()
+        for item in self.moving:
+            rect = rect.united(geometry_rect(item))
+        return rect
+
+    def snap_moving(self, grid_size=None):
+        """Ajusta los items en movimiento tras cada paso de arrastre; devuelve el desplazamiento aplicado"""
+        if not self.moving:
+            return QPointF()
+        rect = self.moving_rect()
+        tolerance = self.SNAP_PIXELS / max(self.view.transform().m11(), 1e-6)
+
+        dx, guides_x = self._snap_axis(rect, True, tolerance)
+        dy, guides_y = self._snap_axis(rect, False, tolerance)
+
+        # Sin alineación en un eje: cuadrícula como respaldo
+        if dx is None:
+            dx = round(rect.left() / grid_size) * grid_size - rect.left() if grid_size else 0.0
+        if dy is None:
+            dy = round(rect.top() / grid_size) * grid_size - rect.top() if grid_size else 0.0
+
+        if dx or dy:
+            for item in self.moving:
+                item.moveBy(dx, dy)
+        snapped = rect.translated(dx, dy)
+        self.guides = [guide(snapped) for guide in guides_x + guides_y]
+        self.view.viewport().update()
+        return QPointF(dx, dy)
+
+    def _snap_axis(self, rect, horizontal, tolerance):
+        """Mejor desplazamiento en un eje (o None) y las guías que lo justifican"""
+        best = None
+        guides = []
+        features = _features(rect, horizontal)
+
+        # Alineación de bordes y centros: cualquier característica con cualquier otra
+        for value in features:
+            for kind in range(3):
+                for target, owner in self._edges[horizontal, kind].query(value - tolerance, value + tolerance):
+                    delta = target - value
+                    if best is None or abs(delta) < abs(best) - 1e-9:
+                        best = delta
+                        guides = []
+                    if abs(delta - best) <= 1e-9:
+                        guides.append(self._alignment_guide(target, owner, horizontal))
+
+        spacing = self._equal_spacing(rect, horizontal, tolerance)
+        if spacing is not None and (best is None or abs(spacing[0]) < abs(best) - 1e-9):
+            best, guides = spacing[0], spacing[1]
+        return best, guides
+
+    def _alignment_guide(self, value, owner, horizontal):
+        target = self._bounds[owner]
+
+        def guide(snapped):
+            if horizontal:
+                top = min(snapped.top(), target.top())
+                bottom = max(snapped.bottom(), target.bottom())
+                return QLineF(value, top, value, bottom)
+            left = min(snapped.left(), target.left())
+            right = max(snapped.right(), target.right())
+            return QLineF(left, value, right, value)
+        return guide
+
+    def _neighbor(self, rect, horizontal, side):
+        """Item más cercano en la misma fila/columna a un lado del rectángulo"""
+        start, _, end = _features(rect, horizontal)
+        if side < 0:
+            index = self._edges[horizontal, 2]
+            candidates = index.before(start + 1e-6)
+        else:
+            index = self._edges[horizontal, 0]
+            candidates = index.after(end - 1e-6)
+        for scanned, i in enumerate(candidates):
+            if scanned >= self.NEIGHBOR_SCAN:
+                break
+            owner = index.owners[i]
+            if owner is not None and _overlaps(self._bounds[owner], rect, horizontal):
+                return self._bounds[owner]
+        return None
+
+    def _equal_spacing(self, rect, horizontal, tolerance):
+        """Espaciado igual: centrado entre dos vecinos o repitiendo el hueco del vecino anterior"""
+        start, _, end = _features(rect, horizontal)
+        size = end - start
+        before = self._neighbor(rect, horizontal, -1)
+        after = self._neighbor(rect, horizontal, 1)
+        options = []
+
+        if before is not None and after is not None:
+            _, _, before_end = _features(before, horizontal)
+            after_start, _, _ = _features(after, horizontal)
+            target = (before_end + after_start - size) / 2
+            options.append((target - start, [(before_end, target), (target + size, after_start)]))
+
+        if before is not None:
+            _, _, before_end = _features(before, horizontal)
+            previous = self._neighbor(before, horizontal, -1)
+            if previous is not None:
+                _, _, previous_end = _features(previous, horizontal)
+                before_start, _, _ = _features(before, horizontal)
+                gap = before_start - previous_end
+                target = before_end + gap
+                options.append((target - start, [(previous_end, before_start), (before_end, target)]))
+
+        options = [option for option in options if abs(option[0]) <= tolerance]
+        if not options:
+            return None
+        delta, gaps = min(options, key=lambda option: abs(option[0]))
+
+        def gap_guide(gap):
+            low, high = gap
+
+            def guide(snapped):
+                middle = snapped.center().y() if horizontal else snapped.center().x()
+                if horizontal:
+                    return QLineF(low, middle, high, middle)
+                return QLineF(middle, low, middle, high)
+            return guide
+        return delta, [gap_guide(gap) for gap in gaps]
+
+    def draw_guides(self, painter):
+        if not self.guides:
+            return
+        pen = QPen(self.GUIDE_COLOR, 1)
+        pen.setCosmetic(True)
+        painter.save()
+        painter.setPen(pen)
+        for line in self.guides:
+            painter.drawLine(line)
+        painter.restore()
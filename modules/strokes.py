@@ -0,0 +1,129 @@
+import math
+
+from PySide6.QtCore import QPointF
+from PySide6.QtGui import QPainterPath
+from PySide6.QtWidgets import QGraphicsPathItem
+
+
+def simplify_points(points, tolerance):
+    """Ramer–Douglas–Peucker iterativo: conserva los puntos que se desvían más de tolerance"""
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+
+    while stack:
+        start, end = stack.pop()
+        ax, ay = points[start].x(), points[start].y()
+        bx, by = points[end].x(), points[end].y()
+        dx, dy = bx - ax, by - ay
+        length = math.hypot(dx, dy)
+
+        max_dist = -1.0
+        index = start
+        for i in range(start + 1, end):
+            px, py = points[i].x(), points[i].y()
+            if length == 0:
+                dist = math.hypot(px - ax, py - ay)
+            else:
+                dist = abs(dy * px - dx * py + bx * ay - by * ax) / length
+            if dist > max_dist:
+                max_dist = dist
+                index = i
+
+        if max_dist > tolerance:
+            keep[index] = True
+            stack.append((start, index))
+            stack.append((index, end))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def points_to_path(points, smooth=False):
+    """Construye un QPainterPath con líneas o con curvas Bézier cúbicas (Catmull-Rom)"""
+    path = QPainterPath()
+    if not points:
+        return path
+    path.moveTo(points[0])
+    if len(points) == 1:
+        path.lineTo(points[0])
+        return path
+    if not smooth or len(points) < 3:
+        for point in points[1:]:
+            path.lineTo(point)
+        return path
+
+    # Cada tramo p1->p2 se convierte en una cúbica con controles derivados de p0 y p3
+    last = len(points) - 1
+    for i in range(last):
+        p0 = points[i - 1] if i > 0 else points[i]
+        p1 = points[i]
+        p2 = points[i + 1]
+        p3 = points[i + 2] if i + 2 <= last else p2
+        c1 = p1 + (p2 - p0) / 6.0
+        c2 = p2 - (p3 - p1) / 6.0
+        path.cubicTo(c1, c2, p2)
+    return path
+
+
+class StrokeBuilder:
+    """Construye un trazo a mano alzada de forma incremental
+
+    Descarta en caliente los puntos más cercanos que min_distance al último
+    aceptado y dibuja la vista previa en tramos hijos de tamaño acotado, de modo
+    que cada movimiento del ratón solo actualiza el último tramo. Al terminar se
+    simplifica con RDP y opcionalmente se ajusta a curvas Bézier en un solo setPath.
+    """
+
+    CHUNK_SIZE = 64
+
+    def __init__(self, item, start, min_distance=2.0, tolerance=1.0, smooth=True):
+        self.item = item
+        self.min_distance = min_distance
+        self.tolerance = tolerance
+        self.smooth = smooth
+        self.points = [QPointF(start)]
+        self._chunks = []
+        self._chunk_path = None
+        self._chunk_count = 0
+        self._new_chunk(start)
+
+    def _new_chunk(self, start):
+        chunk = QGraphicsPathItem(self.item)
+        chunk.setPen(self.item.pen())
+        self._chunks.append(chunk)
+        self._chunk_path = QPainterPath(start)
+        self._chunk_count = 1
+
+    def add_point(self, pos):
+        """Añade un punto si se aleja lo suficiente del último; devuelve True si se aceptó"""
+        last = self.points[-1]
+        if math.hypot(pos.x() - last.x(), pos.y() - last.y()) < self.min_distance:
+            return False
+
+        point = QPointF(pos)
+        self.points.append(point)
+
+        if self._chunk_count >= self.CHUNK_SIZE:
+            # El nuevo tramo arranca en el último punto para que no queden huecos
+            self._new_chunk(last)
+        self._chunk_path.lineTo(point)
+        self._chunk_count += 1
+        self._chunks[-1].setPath(self._chunk_path)
+        return True
+
+    def finish(self):
+        """Sustituye la vista previa por el path final simplificado y devuelve el item"""
+        scene = self.item.scene()
+        for chunk in self._chunks:
+            chunk.setParentItem(None)
+            if scene is not None:
+                scene.removeItem(chunk)
+        self._chunks = []
+        self._chunk_path = None
+
+        points = simplify_points(self.points, self.tolerance)
+        self.item.setPath(points_to_path(points, self.smooth))
+        return self.item
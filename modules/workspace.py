@@ -17,6 +17,8 @@ from .illustrator_tools import IllustratorToolsPanel, AdvancedIllustratorCanvas,
 from .effects_panel import EffectsPanel
 from .elements_window import ElementsWindow
 from .utils import FileType, WorkspacePreset, AIProvider
+from .recovery_journal import RecoveryJournal, recover
+from .canvas_history import AddItemsCommand
 class IllustratorWindow(QMainWindow):
     closed = Signal()
     
@@ -91,6 +93,9 @@ class IllustratorWindow(QMainWindow):
         self.setup_language_specific_features()
         self.setup_context_menu()
         
+        # Diario de recuperación de cambios sin guardar
+        self.setup_recovery_journal()
+        
         # Restaurar estado de la ventana al final de la inicialización
         QTimer.singleShot(100, self.restore_window_state)
     def setup_initial_layout(self):
@@ -1461,14 +1466,25 @@ class IllustratorWindow(QMainWindow):
         """Abre un proyecto existente"""
         QMessageBox.information(self, "Abrir Proyecto", "Funcionalidad de abrir proyecto en desarrollo")
 
+    def canvas_has_focus(self):
+        """True si las acciones de edición deben ir al lienzo Hoja_AI y no al editor"""
+        canvas = getattr(getattr(self, 'hoja_ai_panel', None), 'canvas', None)
+        if canvas is None:
+            return False
+        return canvas.hasFocus() or self.current_editor is None
+
     def undo(self):
         """Deshacer acción"""
-        if self.current_editor:
+        if self.canvas_has_focus():
+            self.hoja_ai_panel.canvas.undo()
+        elif self.current_editor:
             self.current_editor.undo()
 
     def redo(self):
         """Rehacer acción"""
-        if self.current_editor:
+        if self.canvas_has_focus():
+            self.hoja_ai_panel.canvas.redo()
+        elif self.current_editor:
             self.current_editor.redo()
 
     def cut(self):
@@ -1811,6 +1827,8 @@ class IllustratorWindow(QMainWindow):
                     f.write(content)
                 if self.current_editor:
                     self.current_editor.document().setModified(False)
+                if hasattr(self, 'recovery_journal'):
+                    self.recovery_journal.file_saved(file_path, content)
                 self.update_tab_title(file_path)
                 return True
             except Exception as e:
@@ -1888,6 +1906,10 @@ class IllustratorWindow(QMainWindow):
                 lambda modified: self.on_file_modified(file_path, modified)
             )
             
+            # Registrar los cambios en el diario de recuperación
+            if hasattr(self, 'recovery_journal'):
+                self.recovery_journal.track_editor(file_path, editor)
+            
             # Conectar cambios en tiempo real para XML
             if file_path.lower().endswith('.xml'):
                 editor.textChanged.connect(
@@ -2054,6 +2076,8 @@ class IllustratorWindow(QMainWindow):
         for path, data in list(self.open_files.items()):
             if data.get('widget') == tab_widget:
                 del self.open_files[path]
+                if hasattr(self, 'recovery_journal'):
+                    self.recovery_journal.untrack_editor(path)
                 break
         
         # Cerrar la pestaña
@@ -2317,6 +2341,10 @@ class IllustratorWindow(QMainWindow):
             # Guardar configuración antes de cerrar (CORREGIDO)
             self.save_window_state()
             
+            # Cierre limpio: el diario de recuperación ya no hace falta
+            if hasattr(self, 'recovery_journal'):
+                self.recovery_journal.close(clean=True)
+            
             # Cerrar todos los procesos hijos si existen
             if hasattr(self, 'current_process') and self.current_process:
                 try:
@@ -2333,6 +2361,61 @@ class IllustratorWindow(QMainWindow):
             print(f"Error en closeEvent: {e}")
             # En caso de error, aceptar el evento para permitir el cierre
             event.accept()
+    def setup_recovery_journal(self):
+        """Inicia el diario de cambios y ofrece recuperar una sesión interrumpida"""
+        journal_path = os.path.join(self.project_path, ".recovery", "journal.log")
+        crashed_path = RecoveryJournal.take_crashed(journal_path)
+        
+        self.recovery_journal = RecoveryJournal(journal_path, self)
+        if hasattr(self, 'hoja_ai_panel') and hasattr(self.hoja_ai_panel, 'canvas'):
+            self.recovery_journal.track_canvas(self.hoja_ai_panel.canvas)
+        
+        if crashed_path:
+            QTimer.singleShot(300, lambda: self.offer_crash_recovery(crashed_path))
+
+    def offer_crash_recovery(self, crashed_path):
+        """Restaura los cambios registrados antes de un cierre inesperado"""
+        try:
+            texts, canvas_items, unsupported = recover(crashed_path)
+            if texts or canvas_items or unsupported:
+                names = "\n".join(f"• {os.path.basename(path)}" for path in texts)
+                reply = QMessageBox.question(
+                    self,
+                    "Recuperar sesión",
+                    "La sesión anterior no se cerró correctamente.\n\n" +
+                    (f"Archivos con cambios sin guardar:\n{names}\n\n" if texts else "") +
+                    (f"Elementos del lienzo: {len(canvas_items)}\n\n" if canvas_items else "") +
+                    (f"⚠️ {len(unsupported)} elementos del lienzo no se pueden recuperar "
+                     f"({', '.join(sorted(set(unsupported)))})\n\n" if unsupported else "") +
+                    "¿Quieres recuperarlos?",
+                    QMessageBox.Yes | QMessageBox.No,
+                    QMessageBox.Yes
+                )
+                if reply == QMessageBox.Yes:
+                    self.restore_recovered_session(texts, canvas_items)
+            os.remove(crashed_path)
+        except Exception as e:
+            print(f"❌ Error recuperando la sesión: {e}")
+
+    def restore_recovered_session(self, texts, canvas_items):
+        """Abre los archivos con su texto recuperado y devuelve los items al lienzo"""
+        for file_path, text in texts.items():
+            self.open_file_in_tab(file_path)
+            tab_data = self.open_files.get(file_path)
+            if tab_data:
+                # Como edición normal: queda marcado como modificado y se vuelve a registrar
+                cursor = QTextCursor(tab_data['editor'].document())
+                cursor.select(QTextCursor.Document)
+                cursor.insertText(text)
+        
+        if canvas_items and hasattr(self, 'hoja_ai_panel') and hasattr(self.hoja_ai_panel, 'canvas'):
+            canvas = self.hoja_ai_panel.canvas
+            for item in canvas_items:
+                canvas.add_content_item(item)
+            canvas.history.push(AddItemsCommand(canvas, canvas_items, "Recuperar"))
+        
+        print(f"♻️ Sesión recuperada: {len(texts)} archivos, {len(canvas_items)} elementos del lienzo")
+
     def save_window_state(self):
         """Guarda el estado de la ventana CORREGIDO"""
         try:
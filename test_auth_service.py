@@ -0,0 +1,282 @@
+# test_auth_service.py
+# Pruebas de ui/auth_service.py contra un servidor local que imita Supabase (auth y REST)
+import base64
+import http.server
+import importlib.util
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from pathlib import Path
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+sys.path.append(str(Path(__file__).parent))
+
+# La sesión guardada va a ~/.myapp_projects: se aísla antes de importar config
+HOME = tempfile.mkdtemp(prefix="auth-test-home-")
+os.environ["HOME"] = HOME
+os.environ["NO_PROXY"] = "127.0.0.1,localhost"
+
+HAS_SUPABASE = importlib.util.find_spec("supabase") is not None
+if HAS_SUPABASE:
+    import config.database as database
+    from config.session_cache import load_session
+    from ui import auth_service as auth
+
+
+def make_token(user_id):
+    """JWT con la forma que espera el cliente (la firma no se comprueba)"""
+    def part(data):
+        return base64.urlsafe_b64encode(json.dumps(data).encode()).rstrip(b"=").decode()
+    claims = {"sub": user_id, "exp": int(time.time()) + 3600, "role": "authenticated", "aud": "authenticated"}
+    return f"{part({'alg': 'HS256', 'typ': 'JWT'})}.{part(claims)}.firma"
+
+
+class SupabaseHandler(http.server.BaseHTTPRequestHandler):
+    """Endpoints mínimos de /auth/v1 y /rest/v1/users; delay retrasa todas las respuestas"""
+    accounts = {}
+    rows = []
+    refresh_tokens = {}
+    delay = 0.0
+    token_delay = 0.0
+    logout_delay = 0.0
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def send_json(self, status, body=None):
+        data = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def user(self, account):
+        return {
+            "id": account["id"], "email": account["email"], "aud": "authenticated",
+            "role": "authenticated", "app_metadata": {}, "user_metadata": {},
+            "created_at": "2024-01-01T00:00:00Z",
+        }
+
+    def session(self, account):
+        cls = type(self)
+        refresh_token = uuid.uuid4().hex
+        cls.refresh_tokens[refresh_token] = account["email"]
+        return {
+            "access_token": make_token(account["id"]), "token_type": "bearer",
+            "expires_in": 3600, "expires_at": int(time.time()) + 3600,
+            "refresh_token": refresh_token, "user": self.user(account),
+        }
+
+    def matches(self, row, query):
+        for column, values in query.items():
+            if column in ("select", "limit"):
+                continue
+            operator, _, value = values[0].partition(".")
+            if operator == "eq" and str(row.get(column)) != value:
+                return False
+            if operator == "like" and not str(row.get(column, "")).startswith(value.rstrip("*%")):
+                return False
+        return True
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def route(self):
+        cls = type(self)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        cls.requests.append((self.command, url.path, time.monotonic()))
+        time.sleep(cls.delay)
+
+        if url.path == "/auth/v1/token":
+            time.sleep(cls.token_delay)
+            body = self.read_json()
+            if query["grant_type"] == ["password"]:
+                account = cls.accounts.get(body.get("email"))
+                if not account or account["password"] != body.get("password"):
+                    return self.send_json(400, {"error": "invalid_grant", "error_description": "Invalid login credentials",
+                                                "msg": "Invalid login credentials", "code": 400})
+                return self.send_json(200, self.session(account))
+            email = cls.refresh_tokens.pop(body.get("refresh_token"), None)
+            if email is None:
+                return self.send_json(400, {"error": "invalid_grant", "error_description": "Invalid Refresh Token",
+                                            "msg": "Invalid Refresh Token", "code": 400})
+            return self.send_json(200, self.session(cls.accounts[email]))
+        if url.path == "/auth/v1/signup":
+            body = self.read_json()
+            if body["email"] in cls.accounts:
+                return self.send_json(400, {"msg": "User already registered", "code": 400})
+            account = {"id": str(uuid.uuid4()), "email": body["email"], "password": body["password"]}
+            cls.accounts[body["email"]] = account
+            # Con confirmación de email Supabase devuelve el usuario sin sesión
+            return self.send_json(200, self.user(account))
+        if url.path == "/auth/v1/logout":
+            time.sleep(cls.logout_delay)
+            return self.send_json(204)
+        if url.path == "/rest/v1/users":
+            if self.command == "GET":
+                found = [row for row in cls.rows if self.matches(row, query)]
+                return self.send_json(200, found[:int(query.get("limit", ["1000"])[0])])
+            if self.command == "POST":
+                row = self.read_json()
+                cls.rows.append(dict(row, is_active=True))
+                return self.send_json(201, [row])
+            if self.command == "PATCH":
+                changes = self.read_json()
+                for row in cls.rows:
+                    if self.matches(row, query):
+                        row.update(changes)
+                return self.send_json(200, [])
+        self.send_json(404, {"msg": "not found"})
+
+    do_GET = do_POST = do_PATCH = route
+
+
+@unittest.skipUnless(HAS_SUPABASE, "supabase no está instalado")
+class AuthServiceTest(unittest.TestCase):
+    EMAIL = "ana@example.com"
+    PASSWORD = "secreta123"
+
+    def setUp(self):
+        self.handler = type("Handler", (SupabaseHandler,), {
+            "accounts": {}, "rows": [], "refresh_tokens": {}, "requests": [],
+            "delay": 0.0, "token_delay": 0.0, "logout_delay": 0.0,
+        })
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{self.server.server_address[1]}"
+        os.environ["SUPABASE_KEY"] = make_token("anon")
+        database._shared_client = None
+        database._pending_sign_out = None
+
+        account = {"id": str(uuid.uuid4()), "email": self.EMAIL, "password": self.PASSWORD}
+        self.handler.accounts[self.EMAIL] = account
+        self.handler.rows.append({"id": account["id"], "email": self.EMAIL, "username": "ana", "is_active": True})
+
+    def tearDown(self):
+        # Los cierres de sesión tardíos de la prueba terminan antes de apagar el servidor
+        database.wait_for_sign_out(10)
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(Path(HOME) / ".myapp_projects", ignore_errors=True)
+
+    def budget(self, seconds=5.0):
+        return auth.RequestBudget(seconds)
+
+    def test_login_with_email_saves_session(self):
+        touches = []
+        touch_last_login = auth.touch_last_login
+        with mock.patch.object(auth, "touch_last_login",
+                               side_effect=lambda *args: touches.append(touch_last_login(*args)) or touches[-1]):
+            response = auth.login(self.budget(), self.EMAIL, self.PASSWORD)
+        self.assertEqual(response.user.email, self.EMAIL)
+        self.assertEqual(load_session()["refresh_token"], response.session.refresh_token)
+        touches[0].result(5)
+        self.assertIn("last_login", self.handler.rows[0])
+
+    def test_login_with_username(self):
+        response = auth.login(self.budget(), "ana", self.PASSWORD)
+        self.assertEqual(response.user.email, self.EMAIL)
+
+    def test_login_errors(self):
+        with self.assertRaisesRegex(auth.AuthError, "Credenciales incorrectas"):
+            auth.login(self.budget(), self.EMAIL, "mala")
+        with self.assertRaisesRegex(auth.AuthError, "Usuario no encontrado"):
+            auth.login(self.budget(), "nadie", self.PASSWORD)
+        self.handler.rows[0]["is_active"] = False
+        with self.assertRaisesRegex(auth.AuthError, "Cuenta desactivada"):
+            auth.login(self.budget(), "ana", self.PASSWORD)
+        self.assertIsNone(load_session())
+
+    def test_cancel_stops_waiting(self):
+        self.handler.delay = 1.0
+        budget = self.budget(10)
+        threading.Timer(0.2, budget.cancel_event.set).start()
+        start = time.monotonic()
+        with self.assertRaises(auth.AuthCancelled):
+            auth.login(budget, self.EMAIL, self.PASSWORD)
+        self.assertLess(time.monotonic() - start, 0.8)
+
+    def test_cancelled_login_does_not_stay_signed_in(self):
+        self.handler.token_delay = 0.6
+        database.get_supabase_client()
+        budget = self.budget(10)
+        threading.Timer(0.2, budget.cancel_event.set).start()
+        with self.assertRaises(auth.AuthCancelled):
+            auth.login(budget, self.EMAIL, self.PASSWORD)
+        # La petición llega a abrir sesión después de cancelar: se cierra al terminar
+        database.wait_for_sign_out(5)
+        self.assertIn("/auth/v1/logout", [path for _, path, _ in self.handler.requests])
+        self.assertIsNone(database.get_supabase_client().auth.get_session())
+        self.assertIsNone(load_session())
+
+    def test_budget_expiry_reported_by_thread(self):
+        self.handler.delay = 1.0
+        results = []
+        thread = auth.AuthThread(auth.login, self.EMAIL, self.PASSWORD, budget=0.3)
+        thread.done.connect(lambda *args: results.append(args))
+        start = time.monotonic()
+        thread.run()
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertEqual(results, [(False, "El servidor no respondió a tiempo. Inténtalo de nuevo.", None)])
+        database.wait_for_sign_out(5)
+        self.assertIsNone(database.get_supabase_client().auth.get_session())
+
+    def test_restore_uses_saved_refresh_token(self):
+        first = auth.login(self.budget(), self.EMAIL, self.PASSWORD)
+        database._shared_client = None
+        response = auth.restore(self.budget())
+        self.assertEqual(response.user.email, self.EMAIL)
+        # El refresh token rota: se guarda el nuevo
+        self.assertNotEqual(load_session()["refresh_token"], first.session.refresh_token)
+
+    def test_restore_without_network_keeps_session(self):
+        auth.login(self.budget(), self.EMAIL, self.PASSWORD)
+        saved = load_session()
+        self.handler.delay = 1.0
+        self.assertIsNone(auth.restore(self.budget(0.3)))
+        self.assertEqual(load_session(), saved)
+
+    def test_restore_with_revoked_token_forgets_it(self):
+        auth.login(self.budget(), self.EMAIL, self.PASSWORD)
+        self.handler.refresh_tokens.clear()
+        self.assertIsNone(auth.restore(self.budget()))
+        self.assertIsNone(load_session())
+
+    def test_register_picks_free_username(self):
+        username = auth.register(self.budget(), "ana@otro.com", "clave123", "Ana Otra")
+        self.assertEqual(username, "ana1")
+        self.assertEqual(self.handler.rows[-1]["email"], "ana@otro.com")
+        with self.assertRaisesRegex(auth.AuthError, "ya está registrado"):
+            auth.register(self.budget(), self.EMAIL, "clave123", "Ana")
+
+    def test_login_waits_for_pending_sign_out(self):
+        auth.login(self.budget(), self.EMAIL, self.PASSWORD)
+        self.handler.logout_delay = 0.5
+        database.sign_out_in_background()
+        response = auth.login(self.budget(), self.EMAIL, self.PASSWORD)
+        logout = [t for method, path, t in self.handler.requests if path == "/auth/v1/logout"]
+        logins = [t for method, path, t in self.handler.requests if path == "/auth/v1/token"]
+        self.assertGreater(logins[-1], logout[0] + self.handler.logout_delay)
+        session = database.get_supabase_client().auth.get_session()
+        self.assertEqual(session.refresh_token, response.session.refresh_token)
+
+
+if __name__ == "__main__":
+    unittest.main()
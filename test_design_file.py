@@ -0,0 +1,94 @@
+# test_design_file.py
+# Guardado y carga de diseños (.csdf) de modules/design_file.py
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.append(str(Path(__file__).parent))
+
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QColor, QFont, QPen
+from PySide6.QtWidgets import (QApplication, QGraphicsItem, QGraphicsPixmapItem, QGraphicsRectItem,
+                               QGraphicsTextItem)
+
+app = QApplication.instance() or QApplication(sys.argv)
+
+from modules.canvas_index import generate_benchmark_scene
+from modules.design_file import UnsupportedItemsError, open_design, save_design
+from modules.illustrator_tools import AdvancedIllustratorCanvas
+
+
+class DesignFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="design-test-")
+        self.path = os.path.join(self.root, "design.csdf")
+        self.canvas = AdvancedIllustratorCanvas()
+
+    def tearDown(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def reopen(self):
+        target = AdvancedIllustratorCanvas()
+        target.resize(800, 600)
+        open_design(self.path, target, background=False)
+        target.design_loader.load_all()
+        return target
+
+    def add_text(self, text="TextView"):
+        item = QGraphicsTextItem(text)
+        item.setFont(QFont("Sans Serif", 14, QFont.Bold))
+        item.setDefaultTextColor(QColor(20, 120, 40))
+        item.setPos(120, 80)
+        item.setRotation(15)
+        item.setZValue(3)
+        item.setFlag(QGraphicsItem.ItemIsMovable, True)
+        self.canvas.add_content_item(item)
+        return item
+
+    def test_round_trip_keeps_text_items(self):
+        generate_benchmark_scene(self.canvas, 50)
+        original = self.add_text("Hola ñandú")
+        save_design(self.path, self.canvas)
+
+        target = self.reopen()
+        self.assertEqual(len(target.index), 51)
+        texts = [item for item in target.index if isinstance(item, QGraphicsTextItem)]
+        self.assertEqual(len(texts), 1)
+        text = texts[0]
+        self.assertEqual(text.toPlainText(), "Hola ñandú")
+        self.assertEqual(text.font(), original.font())
+        self.assertEqual(text.defaultTextColor(), QColor(20, 120, 40))
+        self.assertEqual(text.pos(), original.pos())
+        self.assertEqual(text.rotation(), 15)
+        self.assertEqual(text.zValue(), 3)
+        self.assertTrue(text.flags() & QGraphicsItem.ItemIsMovable)
+
+    def test_selected_items_keep_original_pen(self):
+        rect = QGraphicsRectItem(0, 0, 40, 20)
+        rect.setPen(QPen(Qt.green, 7))
+        self.canvas.add_content_item(rect)
+        text = self.add_text()
+        self.canvas.select_item(rect)
+        self.canvas.select_item(text, clear_previous=False)
+        save_design(self.path, self.canvas)
+
+        loaded = {type(item): item for item in self.reopen().index}
+        self.assertEqual(loaded[QGraphicsRectItem].pen().widthF(), 7)
+        self.assertEqual(loaded[QGraphicsRectItem].pen().color(), QColor(Qt.green))
+        self.assertEqual(len(loaded), 2)
+
+    def test_unsupported_items_fail_without_writing(self):
+        self.add_text()
+        self.canvas.add_content_item(QGraphicsPixmapItem())
+        with self.assertRaisesRegex(UnsupportedItemsError, "QGraphicsPixmapItem"):
+            save_design(self.path, self.canvas)
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
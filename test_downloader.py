@@ -0,0 +1,176 @@
+# test_downloader.py
+# Pruebas de ui/downloader.py contra un servidor HTTP local con soporte de Range
+import hashlib
+import http.server
+import os
+import re
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+
+from ui import downloader as dl
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    """Sirve `data` con respuestas 206 si ranges está activo; fail_after corta una respuesta"""
+    data = b""
+    delay = 0.0
+    ranges = True
+    fail_after = None
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        header = self.headers.get("Range")
+        cls.requests.append(header)
+        time.sleep(cls.delay)
+        if header and cls.ranges:
+            match = re.match(r"bytes=(\d+)-(\d*)", header)
+            start = int(match.group(1))
+            end = int(match.group(2)) if match.group(2) else len(cls.data) - 1
+            body = cls.data[start:end + 1]
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(cls.data)}")
+        else:
+            body = cls.data
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        if cls.fail_after is not None and len(body) > cls.fail_after:
+            # Respuesta truncada una sola vez: el trozo debe reintentarse desde donde se quedó
+            self.wfile.write(body[:cls.fail_after])
+            self.wfile.flush()
+            cls.fail_after = None
+            self.connection.close()
+            return
+        self.wfile.write(body)
+
+
+def serve(data, delay=0.0, ranges=True):
+    handler = type("Handler", (RangeHandler,), {
+        "data": data, "delay": delay, "ranges": ranges, "requests": [], "fail_after": None,
+    })
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, handler, f"http://127.0.0.1:{server.server_address[1]}/sdk.zip"
+
+
+class DownloaderTest(unittest.TestCase):
+    CHUNK = 256 * 1024
+
+    @classmethod
+    def setUpClass(cls):
+        cls.data = os.urandom(5 * cls.CHUNK + 123)
+        cls.sha256 = hashlib.sha256(cls.data).hexdigest()
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp(prefix="downloader-test-")
+        self.cache = dl.DownloadCache(self.root)
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def serve(self, **kwargs):
+        server, handler, url = serve(self.data, **kwargs)
+        self.servers.append(server)
+        return handler, url
+
+    def downloader(self, urls, **kwargs):
+        kwargs.setdefault("cache", self.cache)
+        kwargs.setdefault("chunk_size", self.CHUNK)
+        return dl.Downloader(urls, **kwargs)
+
+    def chunk_requests(self, handler):
+        return [header for header in handler.requests if header and header != "bytes=0-0"]
+
+    def test_parallel_chunks_from_fastest_mirror(self):
+        slow, slow_url = self.serve(delay=0.5)
+        fast, fast_url = self.serve()
+        progress = []
+        path = self.downloader([slow_url, fast_url], sha256=self.sha256,
+                               progress=lambda done, total: progress.append((done, total))).download()
+        self.assertEqual(path.read_bytes(), self.data)
+        self.assertEqual(path.suffix, ".zip")
+        self.assertEqual(progress[-1], (len(self.data), len(self.data)))
+        self.assertEqual(len(self.chunk_requests(fast)), 6)
+        self.assertEqual(self.chunk_requests(slow), [])
+
+    def test_cache_hit_makes_no_requests(self):
+        handler, url = self.serve()
+        first = self.downloader(url, sha256=self.sha256).download()
+        handler.requests.clear()
+        self.assertEqual(self.downloader(url, sha256=self.sha256).download(), first)
+        self.assertEqual(handler.requests, [])
+
+    def test_resume_after_cancel(self):
+        handler, url = self.serve()
+        calls = {"n": 0}
+
+        def cancelled():
+            calls["n"] += 1
+            return calls["n"] > 6
+
+        with self.assertRaises(dl.DownloadCancelled):
+            self.downloader(url, cancelled=cancelled, workers=1).download()
+        handler.requests.clear()
+        progress = []
+        path = self.downloader(url, sha256=self.sha256,
+                               progress=lambda done, total: progress.append(done)).download()
+        self.assertEqual(path.read_bytes(), self.data)
+        # Solo se piden los trozos que faltaban y el progreso arranca en lo ya descargado
+        self.assertLess(len(self.chunk_requests(handler)), 6)
+        self.assertGreater(progress[0], 0)
+
+    def test_truncated_response_is_retried(self):
+        handler, url = self.serve()
+        handler.fail_after = self.CHUNK // 3
+        path = self.downloader(url, sha256=self.sha256).download()
+        self.assertEqual(path.read_bytes(), self.data)
+
+    def test_bad_checksum_is_rejected(self):
+        _, url = self.serve()
+        with self.assertRaises(dl.DownloadError):
+            self.downloader(url, sha256="0" * 64).download()
+        self.assertIsNone(self.cache.lookup([url], "0" * 64))
+
+    def test_server_without_ranges(self):
+        handler, url = self.serve(ranges=False)
+        path = self.downloader(url, sha256=self.sha256).download()
+        self.assertEqual(path.read_bytes(), self.data)
+
+    def test_consume_reads_while_downloading(self):
+        _, url = self.serve(delay=0.05)
+        digest = hashlib.sha256()
+
+        def consume(reader):
+            while True:
+                block = reader.read(64 * 1024)
+                if not block:
+                    break
+                digest.update(block)
+
+        path = self.downloader(url, sha256=self.sha256, workers=2).download(consume)
+        self.assertEqual(digest.hexdigest(), self.sha256)
+        self.assertEqual(path.read_bytes(), self.data)
+
+    def test_all_mirrors_down(self):
+        with self.assertRaises(dl.DownloadError):
+            self.downloader(["http://127.0.0.1:1/sdk.zip"], timeout=2).download()
+
+
+if __name__ == "__main__":
+    unittest.main()
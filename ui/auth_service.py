@@ -0,0 +1,291 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from datetime import datetime
+
+import httpx
+from PySide6.QtCore import QThread, Signal
+
+from config.database import get_supabase_client, run_in_background, sign_out_in_background, wait_for_sign_out
+from config.session_cache import load_session, save_session, clear_session
+
+# Segundos para todo el flujo (todas las peticiones juntas), no por petición
+AUTH_BUDGET = 20.0
+POLL_INTERVAL = 0.1
+
+# Las peticiones se hacen aquí para poder dejar de esperarlas (cancelar o agotar
+# el presupuesto) aunque el cliente HTTP siga bloqueado hasta su propio timeout
+_requests = ThreadPoolExecutor(max_workers=4, thread_name_prefix="auth-request")
+
+
+class AuthError(Exception):
+    """Fallo con un mensaje listo para mostrar al usuario"""
+    pass
+
+
+class AuthTimeout(AuthError):
+    pass
+
+
+class AuthCancelled(Exception):
+    pass
+
+
+class RequestBudget:
+    """Ejecuta las peticiones de un flujo con un plazo común y cancelación
+
+    call() espera como mucho lo que quede del presupuesto; si se agota lanza
+    AuthTimeout y si se cancela lanza AuthCancelled, sin esperar a la petición.
+    La petición sigue en curso igualmente: su futuro queda en abandoned.
+    """
+
+    def __init__(self, budget=AUTH_BUDGET, cancel_event=None, progress=None):
+        self.deadline = time.monotonic() + budget
+        self.cancel_event = cancel_event or threading.Event()
+        self.progress = progress
+        self.abandoned = None
+
+    def remaining(self):
+        return self.deadline - time.monotonic()
+
+    def call(self, percent, message, fn, *args, **kwargs):
+        if self.cancel_event.is_set():
+            raise AuthCancelled()
+        if self.progress is not None:
+            self.progress(percent, message)
+        future = _requests.submit(fn, *args, **kwargs)
+        while True:
+            remaining = self.remaining()
+            if remaining <= 0:
+                future.cancel()
+                self.abandoned = future
+                raise AuthTimeout("El servidor no respondió a tiempo. Inténtalo de nuevo.")
+            try:
+                return future.result(timeout=min(POLL_INTERVAL, remaining))
+            except FutureTimeout:
+                if self.cancel_event.is_set():
+                    future.cancel()
+                    self.abandoned = future
+                    raise AuthCancelled()
+
+
+def open_session(budget, percent, message, fn, *args, **kwargs):
+    """Llamada que deja una sesión en el cliente compartido (login, refresh, alta)
+
+    Si el flujo deja de esperarla, al terminar se cierra la sesión que abra para
+    que el cliente no quede dentro como un usuario que la interfaz no conoce.
+    """
+    try:
+        return budget.call(percent, message, fn, *args, **kwargs)
+    except (AuthCancelled, AuthTimeout):
+        if budget.abandoned is not None:
+            sign_out_in_background(after=budget.abandoned)
+        raise
+
+
+def call_signed_in(budget, percent, message, fn, *args, **kwargs):
+    """Paso posterior a abrir sesión; si el flujo se abandona aquí, la sesión se cierra"""
+    try:
+        return budget.call(percent, message, fn, *args, **kwargs)
+    except (AuthCancelled, AuthTimeout):
+        sign_out_in_background()
+        raise
+
+
+def fetch_profile(supabase, **match):
+    """Fila de users (id, email, is_active) que cumple match, en una sola consulta"""
+    query = supabase.table("users").select("id, email, is_active")
+    for column, value in match.items():
+        query = query.eq(column, value)
+    result = query.limit(1).execute()
+    return result.data[0] if result.data else None
+
+
+def touch_last_login(supabase, user_id):
+    """Actualiza last_login sin hacer esperar al login; devuelve el futuro"""
+    return run_in_background(
+        "last_login",
+        lambda: supabase.table("users").update({
+            "last_login": datetime.now().isoformat()
+        }).eq("id", user_id).execute()
+    )
+
+
+def pick_username(supabase, base_username):
+    """Primer username libre (base, base1, base2...) con una sola consulta"""
+    escaped = base_username.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    existing = supabase.table("users").select("username").like("username", f"{escaped}%").execute()
+    taken = {row["username"] for row in existing.data or []}
+    username = base_username
+    counter = 1
+    while username in taken:
+        username = f"{base_username}{counter}"
+        counter += 1
+    return username
+
+
+def _complete_login(supabase, response):
+    """Guarda la sesión y registra last_login en segundo plano"""
+    try:
+        save_session(response.session)
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar la sesión: {e}")
+    touch_last_login(supabase, response.user.id)
+    return response
+
+
+def login(budget, username_or_email, password):
+    """Inicia sesión por email o username; devuelve la respuesta de Supabase o lanza AuthError"""
+    try:
+        supabase = get_supabase_client()
+        budget.call(10, "Cerrando la sesión anterior...", wait_for_sign_out)
+
+        if "@" in username_or_email:
+            # Por email: se entra directamente y luego se comprueba la cuenta
+            try:
+                response = open_session(budget, 30, "Iniciando sesión...", supabase.auth.sign_in_with_password, {
+                    "email": username_or_email,
+                    "password": password
+                })
+            except (AuthCancelled, AuthTimeout):
+                raise
+            except Exception as email_err:
+                print(f"Error al iniciar con email: {str(email_err)}")
+                raise AuthError("Credenciales incorrectas")
+            profile = None
+            if response.user:
+                profile = call_signed_in(budget, 70, "Comprobando la cuenta...", fetch_profile, supabase,
+                                         id=response.user.id)
+        else:
+            # Por username: la misma consulta da el email y el estado de la cuenta
+            profile = budget.call(30, "Buscando el usuario...", fetch_profile, supabase, username=username_or_email)
+            if not profile:
+                raise AuthError("Usuario no encontrado")
+            if not profile.get('is_active', True):
+                raise AuthError("Cuenta desactivada")
+            try:
+                response = open_session(budget, 70, "Iniciando sesión...", supabase.auth.sign_in_with_password, {
+                    "email": profile['email'],
+                    "password": password
+                })
+            except (AuthCancelled, AuthTimeout):
+                raise
+            except Exception as username_err:
+                print(f"Error al iniciar con username: {str(username_err)}")
+                raise AuthError("Credenciales incorrectas")
+
+        if not response.user:
+            raise AuthError("Contraseña incorrecta")
+        if not profile or not profile.get('is_active', True):
+            sign_out_in_background()
+            raise AuthError("Cuenta desactivada")
+
+        return _complete_login(supabase, response)
+
+    except (AuthCancelled, AuthError):
+        raise
+    except Exception as e:
+        print(f"Error general: {str(e)}")
+        raise AuthError(f"Error al conectar con el servidor: {str(e)}")
+
+
+def restore(budget):
+    """Reentra con el refresh token guardado en el arranque anterior; devuelve la respuesta o None"""
+    cached = load_session()
+    if not cached:
+        return None
+    try:
+        supabase = get_supabase_client()
+        budget.call(10, "Cerrando la sesión anterior...", wait_for_sign_out)
+        response = open_session(budget, 30, "Restaurando la sesión...", supabase.auth.refresh_session,
+                                cached["refresh_token"])
+        if not response.user:
+            clear_session()
+            return None
+        profile = call_signed_in(budget, 70, "Comprobando la cuenta...", fetch_profile, supabase,
+                                 id=response.user.id)
+        if not profile or not profile.get('is_active', True):
+            clear_session()
+            sign_out_in_background()
+            return None
+    except AuthCancelled:
+        raise
+    except (AuthTimeout, httpx.HTTPError) as e:
+        # Sin red o servidor lento: se conserva la sesión para el próximo intento
+        print(f"⚠️ No se pudo restaurar la sesión: {e}")
+        return None
+    except Exception as e:
+        print(f"⚠️ Sesión guardada no válida: {e}")
+        clear_session()
+        return None
+    return _complete_login(supabase, response)
+
+
+def register(budget, email, password, fullname):
+    """Crea la cuenta y su fila en users; devuelve el username asignado o lanza AuthError"""
+    try:
+        supabase = get_supabase_client()
+        budget.call(10, "Cerrando la sesión anterior...", wait_for_sign_out)
+        username = budget.call(20, "Comprobando el nombre de usuario...", pick_username, supabase, email.split('@')[0])
+
+        auth_response = open_session(budget, 50, "Creando la cuenta...", supabase.auth.sign_up, {
+            "email": email,
+            "password": password
+        })
+        if not auth_response.user:
+            raise AuthError("No se pudo crear la cuenta")
+
+        user_data = {
+            "id": auth_response.user.id,
+            "email": email,
+            "full_name": fullname,
+            "username": username,
+            "is_verified": False,
+            "role": "user"
+        }
+        call_signed_in(budget, 80, "Guardando el perfil...", lambda: supabase.table("users").insert(user_data).execute())
+        return username
+
+    except (AuthCancelled, AuthError):
+        raise
+    except Exception as e:
+        error_msg = str(e)
+        if "User already registered" in error_msg:
+            raise AuthError("Este email ya está registrado")
+        if "duplicate key value violates unique constraint" in error_msg:
+            raise AuthError("El nombre de usuario ya está en uso")
+        raise AuthError(f"Error en el registro: {error_msg}")
+
+
+class AuthThread(QThread):
+    """Hilo que ejecuta un flujo de autenticación (login, restore, register) sin bloquear la GUI
+
+    done lleva (éxito, mensaje, resultado); al cancelar el mensaje va vacío.
+    """
+    progress_updated = Signal(int, str)
+    # No se llama finished: esa señal de QThread indica que el hilo ya terminó de verdad
+    done = Signal(bool, str, object)
+
+    def __init__(self, flow, *args, budget=AUTH_BUDGET):
+        super().__init__()
+        self.flow = flow
+        self.args = args
+        self.budget = budget
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        budget = RequestBudget(self.budget, self._cancel_event, self.progress_updated.emit)
+        try:
+            result = self.flow(budget, *self.args)
+            self.done.emit(True, "", result)
+        except AuthCancelled:
+            self.done.emit(False, "", None)
+        except AuthError as e:
+            self.done.emit(False, str(e), None)
+        except Exception as e:
+            print(f"❌ Error de autenticación: {e}")
+            self.done.emit(False, str(e), None)
+
+    def cancel(self):
+        """Deja de esperar al servidor; si la petición en curso abre sesión, se cierra al terminar"""
+        self._cancel_event.set()
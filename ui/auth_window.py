@@ -1,19 +1,31 @@
 ﻿import os
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QLabel, QLineEdit, 
                               QPushButton, QMessageBox, QHBoxLayout, QStackedWidget,
-                              QSpacerItem, QSizePolicy, QStyle, QFrame)
+                              QSpacerItem, QSizePolicy, QStyle, QFrame,
+                              QProgressDialog)
 from PySide6.QtGui import (QFont, QPixmap, QIcon, QCursor, QLinearGradient, 
                           QPainter, QColor, QBrush)
 from PySide6.QtCore import Qt, QPoint
 from PySide6.QtGui import QRadialGradient 
 from PySide6.QtCore import Qt, QEvent
 from PySide6.QtGui import QKeyEvent
-from config.database import SupabaseClient
-from datetime import datetime
+from ui.auth_service import AuthThread, login, register, restore
 
 import re
 
 
+def create_auth_dialog(parent, title, label):
+    """Diálogo de progreso de una operación de autenticación (solo aparece si tarda)"""
+    dialog = QProgressDialog(label, "Cancelar", 0, 100, parent)
+    dialog.setWindowTitle(title)
+    dialog.setWindowModality(Qt.WindowModal)
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+    dialog.setMinimumDuration(300)
+    dialog.setValue(0)
+    return dialog
+
+
 
 
 class PasswordLineEdit(QLineEdit):
@@ -88,6 +100,8 @@ class AuthWindow(QWidget):
         super().__init__()
         self.setFixedSize(800, 600)
         self.on_login_success = on_login_success  
+        self.auth_dialog = None
+        self.auth_thread = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -161,9 +175,9 @@ class AuthWindow(QWidget):
         
         self.email_input.installEventFilter(self)
         self.password_input.installEventFilter(self)
-        login_btn = QPushButton("INICIO DE SESION")
-        login_btn.setCursor(QCursor(Qt.PointingHandCursor))
-        login_btn.setStyleSheet("""
+        self.login_btn = QPushButton("INICIO DE SESION")
+        self.login_btn.setCursor(QCursor(Qt.PointingHandCursor))
+        self.login_btn.setStyleSheet("""
             QPushButton {
                 background-color: white;
                 color: black;
@@ -182,8 +196,8 @@ class AuthWindow(QWidget):
                 border: 1px solid black;
             }
         """)
-        login_btn.setFixedHeight(45)
-        login_btn.clicked.connect(self.handle_login)
+        self.login_btn.setFixedHeight(45)
+        self.login_btn.clicked.connect(self.handle_login)
 
         register_link = QLabel("¿No tienes una cuenta? <a href='#' style='color:white;text-decoration:none;'>Registrate</a>")
         register_link.setAlignment(Qt.AlignCenter)
@@ -198,7 +212,7 @@ class AuthWindow(QWidget):
         center_layout.addWidget(title, 0, Qt.AlignCenter)
         center_layout.addWidget(self.email_input, 0, Qt.AlignCenter)
         center_layout.addWidget(self.password_input, 0, Qt.AlignCenter)
-        center_layout.addWidget(login_btn, 0, Qt.AlignCenter)
+        center_layout.addWidget(self.login_btn, 0, Qt.AlignCenter)
         center_layout.addWidget(register_link, 0, Qt.AlignCenter)
         center_layout.addStretch()
 
@@ -239,6 +253,9 @@ class AuthWindow(QWidget):
         return super().eventFilter(source, event)
     
     def handle_login(self):
+        if self.auth_thread is not None:
+            return
+
         username_or_email = self.email_input.text().strip()
         password = self.password_input.text()
 
@@ -246,73 +263,47 @@ class AuthWindow(QWidget):
             self.show_message("Error", "Por favor completa todos los campos")
             return
 
-        try:
-            supabase = SupabaseClient().get_client()
-            
+        self.start_auth(login, "Iniciando sesión...", username_or_email, password)
+
+    def restore_session(self):
+        """Reentra en segundo plano con la sesión guardada en el arranque anterior"""
+        if self.auth_thread is None:
+            self.start_auth(restore, "Restaurando la sesión...")
+
+    def start_auth(self, flow, label, *args):
+        """Lanza el flujo en un AuthThread con diálogo de progreso cancelable"""
+        self.login_btn.setEnabled(False)
+        self.auth_dialog = create_auth_dialog(self, "Inicio de sesión", label)
+        self.auth_thread = AuthThread(flow, *args)
+        self.auth_thread.progress_updated.connect(self.update_auth_progress)
+        self.auth_thread.finished.connect(self.release_auth_thread)
+        self.auth_thread.done.connect(self.on_auth_finished)
+        self.auth_dialog.canceled.connect(self.auth_thread.cancel)
+        self.auth_thread.start()
+
+    def update_auth_progress(self, percent, message):
+        if self.auth_dialog is not None:
+            self.auth_dialog.setValue(percent)
+            self.auth_dialog.setLabelText(message)
+
+    def release_auth_thread(self):
+        """Suelta el hilo cuando QThread.finished confirma que run() ha terminado"""
+        if self.auth_thread is not None:
+            self.auth_thread.wait()
+            self.auth_thread = None
+        self.login_btn.setEnabled(True)
+
+    def on_auth_finished(self, success, message, response):
+        self.auth_dialog.close()
+        self.auth_dialog = None
+
+        if success:
+            # restore devuelve None si no había sesión válida: se queda en el login
+            if response is not None:
+                self.on_login_success()
+        elif message:
+            self.show_message("Error", message)
 
-            try:
-                response = supabase.auth.sign_in_with_password({
-                    "email": username_or_email,
-                    "password": password
-                })
-                
-                if response.user:
-
-                    user_record = supabase.table("users").select("*").eq("id", response.user.id).execute()
-                    
-                    if not user_record.data or not user_record.data[0].get('is_active', True):
-                        self.show_message("Error", "Cuenta desactivada")
-                        supabase.auth.sign_out()
-                        return
-                    
-                
-                    supabase.table("users").update({
-                        "last_login": datetime.now().isoformat()
-                    }).eq("id", response.user.id).execute()
-                    
-                    self.on_login_success()
-                    return
-                    
-            except Exception as email_err:
-                print(f"Error al iniciar con email: {str(email_err)}")
-
-            try:
-                user_data = supabase.table("users").select("email, is_active").eq("username", username_or_email).execute()
-                
-                if not user_data.data:
-                    self.show_message("Error", "Usuario no encontrado")
-                    return
-                    
-                user_info = user_data.data[0]
-                
-                if not user_info.get('is_active', True):
-                    self.show_message("Error", "Cuenta desactivada")
-                    return
-                    
-                user_email = user_info['email']
-                response = supabase.auth.sign_in_with_password({
-                    "email": user_email,
-                    "password": password
-                })
-                
-                if response.user:
-
-                    supabase.table("users").update({
-                        "last_login": datetime.now().isoformat()
-                    }).eq("id", response.user.id).execute()
-                    
-                    self.on_login_success()
-                    return
-                else:
-                    self.show_message("Error", "Contraseña incorrecta")
-                    
-            except Exception as username_err:
-                print(f"Error al iniciar con username: {str(username_err)}")
-                self.show_message("Error", "Credenciales incorrectas")
-                
-        except Exception as e:
-            print(f"Error general: {str(e)}")
-            self.show_message("Error", f"Error al conectar con el servidor: {str(e)}")
     def show_message(self, title, message):
         msg = QMessageBox()
         msg.setWindowTitle(title)
@@ -345,6 +336,8 @@ class RegisterWindow(QWidget):
         self.stacked_widget = stacked_widget
         self.on_register_success = on_register_success
         self.setFixedSize(800, 600)
+        self.register_dialog = None
+        self.register_thread = None
         self.setup_ui()
         
     def setup_ui(self):
@@ -510,59 +503,50 @@ class RegisterWindow(QWidget):
         return errors
     
     def handle_register(self):
+        if self.register_thread is not None:
+            return
+
         errors = self.validate_inputs()
         if errors:
             self.show_message("Error de Validación", "\n".join(errors))
             return
-        
-        try:
-            supabase = SupabaseClient().get_client()
-            email = self.email_input.text().strip()
-            password = self.password_input.text()
-            fullname = self.fullname_input.text().strip()
-            
-            base_username = email.split('@')[0]
-            username = base_username
-
-            counter = 1
-            while True:
-                existing = supabase.table("users").select("username").eq("username", username).execute()
-                if not existing.data:
-                    break
-                username = f"{base_username}{counter}"
-                counter += 1
-
-            auth_response = supabase.auth.sign_up({
-                "email": email,
-                "password": password
-            })
-            
-            if auth_response.user:
-                
-                user_data = {
-                    "id": auth_response.user.id,
-                    "email": email,
-                    "full_name": fullname,
-                    "username": username,
-                    "is_verified": False,
-                    "role": "user"
-                }
-                
-                supabase.table("users").insert(user_data).execute()
-                
-                self.show_message("Éxito", "Registro completado. Por favor verifica tu email.")
-                if self.on_register_success:
-                    self.on_register_success()
-                self.stacked_widget.setCurrentIndex(0)
-        
-        except Exception as e:
-            error_msg = str(e)
-            if "User already registered" in error_msg:
-                self.show_message("Error", "Este email ya está registrado")
-            elif "duplicate key value violates unique constraint" in error_msg:
-                self.show_message("Error", "El nombre de usuario ya está en uso")
-            else:
-                self.show_message("Error", f"Error en el registro: {error_msg}")
+
+        email = self.email_input.text().strip()
+        password = self.password_input.text()
+        fullname = self.fullname_input.text().strip()
+
+        self.register_dialog = create_auth_dialog(self, "Registro", "Creando la cuenta...")
+        self.register_thread = AuthThread(register, email, password, fullname)
+        self.register_thread.progress_updated.connect(self.update_register_progress)
+        self.register_thread.finished.connect(self.release_register_thread)
+        self.register_thread.done.connect(self.on_registered)
+        self.register_dialog.canceled.connect(self.register_thread.cancel)
+        self.register_thread.start()
+
+    def update_register_progress(self, percent, message):
+        if self.register_dialog is not None:
+            self.register_dialog.setValue(percent)
+            self.register_dialog.setLabelText(message)
+
+    def release_register_thread(self):
+        """Suelta el hilo cuando QThread.finished confirma que run() ha terminado"""
+        if self.register_thread is not None:
+            self.register_thread.wait()
+            self.register_thread = None
+
+    def on_registered(self, success, message, username):
+        self.register_dialog.close()
+        self.register_dialog = None
+
+        if not success:
+            if message:
+                self.show_message("Error", message)
+            return
+
+        self.show_message("Éxito", "Registro completado. Por favor verifica tu email.")
+        if self.on_register_success:
+            self.on_register_success()
+        self.stacked_widget.setCurrentIndex(0)
     
     def show_message(self, title, message):
         msg = QMessageBox()
@@ -0,0 +1,438 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from pathlib import Path, PurePosixPath
+from urllib.parse import urlparse
+
+DOWNLOAD_CACHE_DIR = Path.home() / ".myapp_projects" / "downloads"
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+CHUNK_SIZE = 8 * 1024 * 1024
+READ_SIZE = 256 * 1024
+CHUNK_RETRIES = 3
+
+
+class DownloadError(Exception):
+    pass
+
+
+class DownloadCancelled(DownloadError):
+    pass
+
+
+def _request(url, start=None, end=None):
+    headers = {"User-Agent": USER_AGENT}
+    if start is not None:
+        headers["Range"] = f"bytes={start}-{'' if end is None else end}"
+    return urllib.request.Request(url, headers=headers)
+
+
+def url_suffix(url):
+    """Extensión del fichero de la URL (.msi, .zip, .tar.xz...): los instaladores la necesitan"""
+    suffixes = PurePosixPath(urlparse(url).path).suffixes
+    if len(suffixes) >= 2 and suffixes[-2] == ".tar":
+        return "".join(suffixes[-2:])
+    return suffixes[-1] if suffixes and len(suffixes[-1]) <= 5 else ""
+
+
+def probe_mirror(url, timeout=15):
+    """Pide el primer byte de url: latencia, URL final, tamaño y si admite rangos"""
+    started = time.perf_counter()
+    with urllib.request.urlopen(_request(url, 0, 0), timeout=timeout) as response:
+        response.read(1)
+        latency = time.perf_counter() - started
+        size = None
+        ranges = response.status == 206
+        content_range = response.headers.get("Content-Range", "")
+        if ranges and "/" in content_range and not content_range.endswith("/*"):
+            size = int(content_range.rsplit("/", 1)[1])
+        elif not ranges and response.headers.get("Content-Length"):
+            size = int(response.headers["Content-Length"])
+        return {
+            "url": response.geturl(),
+            "latency": latency,
+            "size": size,
+            "ranges": ranges,
+            "validator": response.headers.get("ETag") or response.headers.get("Last-Modified") or "",
+        }
+
+
+def race_mirrors(urls, timeout=15):
+    """Prueba todos los mirrors a la vez y devuelve el primero que responde con datos"""
+    errors = []
+    pool = ThreadPoolExecutor(max_workers=len(urls), thread_name_prefix="mirror-probe")
+    try:
+        futures = {pool.submit(probe_mirror, url, timeout): url for url in urls}
+        for future in as_completed(futures):
+            try:
+                mirror = future.result()
+            except (OSError, ValueError) as e:
+                errors.append(f"{futures[future]}: {e}")
+                continue
+            print(f"🏁 Mirror más rápido: {mirror['url']} ({mirror['latency'] * 1000:.0f} ms)")
+            return mirror
+    finally:
+        pool.shutdown(wait=False)
+    raise DownloadError("Ningún mirror respondió:\n" + "\n".join(errors))
+
+
+class DownloadCache:
+    """Caché de descargas direccionada por contenido: objects/<sha256><ext> + índice url -> fichero"""
+
+    def __init__(self, root=DOWNLOAD_CACHE_DIR):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.partial = self.root / "partial"
+        self.index_file = self.root / "index.json"
+        self._lock = threading.Lock()
+
+    def object_path(self, sha256, suffix=""):
+        return self.objects / f"{sha256}{suffix}"
+
+    def _load_index(self):
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def lookup(self, urls, sha256=None):
+        """Ruta en caché del contenido (por checksum o por una de las URLs), o None"""
+        if sha256:
+            return next(self.objects.glob(f"{sha256.lower()}*"), None) if self.objects.exists() else None
+        index = self._load_index()
+        for url in urls:
+            known = index.get(url)
+            if known and (self.objects / known).exists():
+                return self.objects / known
+        return None
+
+    def store(self, part_path, sha256, urls, suffix=""):
+        """Mueve un fichero ya verificado a la caché y anota sus URLs"""
+        self.objects.mkdir(parents=True, exist_ok=True)
+        target = self.object_path(sha256, suffix)
+        os.replace(part_path, target)
+        with self._lock:
+            index = self._load_index()
+            for url in urls:
+                index[url] = target.name
+            tmp_path = self.index_file.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2)
+            os.replace(tmp_path, self.index_file)
+        return target
+
+
+class _PrefixReader:
+    """Lectura secuencial (tipo fichero) de una descarga en curso
+
+    read() solo entrega bytes del prefijo contiguo ya escrito en el .part y
+    espera a que avance; así un extractor puede ir detrás de la descarga.
+    """
+
+    def __init__(self, downloader, path):
+        self.downloader = downloader
+        self.path = path
+        self._file = None
+        self._position = 0
+
+    def read(self, size=-1):
+        downloader = self.downloader
+        with downloader._cond:
+            while downloader._available <= self._position and not downloader._fetch_done:
+                downloader._cond.wait(0.25)
+                downloader._check_cancel()
+            available = downloader._available
+            if downloader._fetch_error is not None and self._position >= available:
+                raise DownloadError(f"Descarga interrumpida: {downloader._fetch_error}")
+        if self._position >= available:
+            return b""
+        if self._file is None:
+            self._file = open(self.path, "rb")
+        count = available - self._position if size is None or size < 0 else min(size, available - self._position)
+        self._file.seek(self._position)
+        data = self._file.read(count)
+        self._position += len(data)
+        return data
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Downloader:
+    """Descarga reanudable por trozos en paralelo con carrera de mirrors y checksum
+
+    El fichero parcial y un .json con los trozos terminados quedan en la caché:
+    si se interrumpe, la siguiente descarga de la misma URL (mismo tamaño y
+    ETag) solo pide lo que falta. El SHA-256 se calcula mientras llegan los
+    datos, avanzando por el prefijo contiguo ya escrito; el resultado se guarda
+    en la caché por su hash. progress(bytes, total) informa de bytes reales.
+    """
+
+    def __init__(self, urls, sha256=None, min_size=0, progress=None, cancelled=None,
+                 cache=None, chunk_size=CHUNK_SIZE, workers=4, timeout=30):
+        self.urls = [urls] if isinstance(urls, str) else list(urls)
+        self.sha256 = sha256.lower() if sha256 else None
+        self.min_size = min_size
+        self.progress = progress
+        self.cancelled = cancelled or (lambda: False)
+        self.cache = cache or DownloadCache()
+        self.chunk_size = chunk_size
+        self.workers = workers
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._abort = threading.Event()
+        self._done_bytes = 0
+        self._total = None
+        # Prefijo contiguo ya escrito en disco (para leer mientras se descarga)
+        self._cond = threading.Condition()
+        self._available = 0
+        self._chunks = []
+        self._chunk_offsets = []
+        self._prefix_chunk = 0
+        self._fetch_done = False
+        self._fetch_error = None
+
+    def _check_cancel(self):
+        if self.cancelled():
+            raise DownloadCancelled("Descarga cancelada")
+        if self._abort.is_set():
+            raise DownloadError("Descarga interrumpida")
+
+    def _report(self, count):
+        with self._lock:
+            self._done_bytes += count
+            done = self._done_bytes
+        if self.progress is not None:
+            self.progress(done, self._total)
+
+    def _set_available(self, available):
+        with self._cond:
+            self._available = available
+            self._cond.notify_all()
+
+    def _chunk_progress(self, index, offset):
+        """Anota hasta dónde llegó un trozo y avanza el prefijo contiguo"""
+        with self._cond:
+            self._chunk_offsets[index] = offset
+            i = self._prefix_chunk
+            while i < len(self._chunks) and self._chunk_offsets[i] > self._chunks[i][1]:
+                i += 1
+            self._prefix_chunk = i
+            self._available = self._chunk_offsets[i] if i < len(self._chunks) else self._total
+            self._cond.notify_all()
+
+    def download(self, consume=None):
+        """Ruta del fichero descargado y verificado (en la caché)
+
+        Con consume(fichero), se llama en este hilo con un lector que va
+        detrás de la descarga, de modo que se procesan los datos mientras
+        llegan; el fichero solo pasa a la caché cuando consume termina.
+        """
+        cached = self.cache.lookup(self.urls, self.sha256)
+        if cached is not None:
+            print(f"📦 Usando descarga en caché: {cached}")
+            size = cached.stat().st_size
+            if self.progress is not None:
+                self.progress(size, size)
+            if consume is not None:
+                with open(cached, "rb") as f:
+                    consume(f)
+            return cached
+
+        self._check_cancel()
+        mirror = race_mirrors(self.urls, self.timeout)
+        self._total = mirror["size"]
+        self.cache.partial.mkdir(parents=True, exist_ok=True)
+        name = hashlib.sha1(self.urls[0].encode("utf-8")).hexdigest()
+        part_path = self.cache.partial / f"{name}.part"
+        state_path = self.cache.partial / f"{name}.json"
+
+        def fetch():
+            try:
+                if mirror["ranges"] and mirror["size"]:
+                    return self._download_chunks(mirror, part_path, state_path)
+                return self._download_stream(mirror["url"], part_path)
+            except BaseException as e:
+                self._fetch_error = e
+                raise
+            finally:
+                with self._cond:
+                    self._fetch_done = True
+                    self._cond.notify_all()
+
+        if consume is None:
+            sha256 = fetch()
+        else:
+            result = {}
+
+            def run_fetch():
+                try:
+                    result["sha256"] = fetch()
+                except BaseException as e:
+                    result["error"] = e
+
+            thread = threading.Thread(target=run_fetch, daemon=True, name="download-fetch")
+            thread.start()
+            try:
+                with _PrefixReader(self, part_path) as reader:
+                    consume(reader)
+            except BaseException:
+                self._abort.set()
+                thread.join()
+                raise
+            thread.join()
+            if "error" in result:
+                raise result["error"]
+            sha256 = result["sha256"]
+
+        size = part_path.stat().st_size
+        if self.sha256 and sha256 != self.sha256:
+            part_path.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            raise DownloadError(f"Checksum incorrecto: se esperaba {self.sha256} y llegó {sha256}")
+        if size < self.min_size:
+            part_path.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            raise DownloadError(f"Archivo descargado inválido ({size} bytes)")
+
+        suffix = url_suffix(self.urls[0]) or url_suffix(mirror["url"])
+        path = self.cache.store(part_path, sha256, self.urls + [mirror["url"]], suffix)
+        state_path.unlink(missing_ok=True)
+        return path
+
+    # DESCARGA SECUENCIAL (servidor sin rangos o tamaño desconocido)
+    def _download_stream(self, url, part_path):
+        hasher = hashlib.sha256()
+        written = 0
+        with urllib.request.urlopen(_request(url), timeout=self.timeout) as response, \
+                open(part_path, "wb") as f:
+            while True:
+                self._check_cancel()
+                data = response.read(READ_SIZE)
+                if not data:
+                    break
+                f.write(data)
+                f.flush()
+                hasher.update(data)
+                written += len(data)
+                self._set_available(written)
+                self._report(len(data))
+        return hasher.hexdigest()
+
+    # DESCARGA POR TROZOS
+    def _load_state(self, mirror, part_path, state_path):
+        """Trozos ya completos de una descarga anterior compatible"""
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return set()
+        compatible = (
+            state.get("size") == mirror["size"]
+            and state.get("validator") == mirror["validator"]
+            and state.get("chunk_size") == self.chunk_size
+            and part_path.exists()
+            and part_path.stat().st_size == mirror["size"]
+        )
+        return set(state.get("done", [])) if compatible else set()
+
+    def _save_state(self, mirror, state_path, done):
+        tmp_path = state_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"size": mirror["size"], "validator": mirror["validator"],
+                       "chunk_size": self.chunk_size, "done": sorted(done)}, f)
+        os.replace(tmp_path, state_path)
+
+    def _fetch_chunk(self, url, part_path, index):
+        start, end = self._chunks[index]
+        offset = start
+        for attempt in range(CHUNK_RETRIES):
+            try:
+                with urllib.request.urlopen(_request(url, offset, end), timeout=self.timeout) as response, \
+                        open(part_path, "r+b") as f:
+                    if response.status != 206:
+                        raise DownloadError("El servidor dejó de aceptar rangos")
+                    f.seek(offset)
+                    while offset <= end:
+                        self._check_cancel()
+                        data = response.read(min(READ_SIZE, end - offset + 1))
+                        if not data:
+                            break
+                        f.write(data)
+                        f.flush()
+                        offset += len(data)
+                        self._chunk_progress(index, offset)
+                        self._report(len(data))
+                if offset > end:
+                    return
+            except DownloadCancelled:
+                raise
+            except (OSError, DownloadError) as e:
+                if attempt == CHUNK_RETRIES - 1:
+                    raise DownloadError(f"Fallo descargando bytes {offset}-{end}: {e}")
+                print(f"🔄 Reintentando trozo {start}-{end} desde {offset}: {e}")
+        raise DownloadError(f"Respuesta incompleta para bytes {start}-{end}")
+
+    def _download_chunks(self, mirror, part_path, state_path):
+        size = mirror["size"]
+        chunks = self._chunks = [(start, min(start + self.chunk_size, size) - 1)
+                                 for start in range(0, size, self.chunk_size)]
+        done = self._load_state(mirror, part_path, state_path)
+        if not done:
+            with open(part_path, "wb") as f:
+                f.truncate(size)
+        else:
+            print(f"⏯️ Reanudando descarga: {len(done)}/{len(chunks)} trozos ya descargados")
+            self._report(sum(chunks[i][1] - chunks[i][0] + 1 for i in done))
+        self._chunk_offsets = [end + 1 if i in done else start for i, (start, end) in enumerate(chunks)]
+        self._chunk_progress(0, self._chunk_offsets[0])
+
+        hasher = hashlib.sha256()
+        next_to_hash = 0
+
+        def advance_hash():
+            # Se hashea el prefijo contiguo ya escrito: al llegar el último trozo queda poco por leer
+            nonlocal next_to_hash
+            with open(part_path, "rb") as f:
+                while next_to_hash < len(chunks) and next_to_hash in done:
+                    start, end = chunks[next_to_hash]
+                    f.seek(start)
+                    remaining = end - start + 1
+                    while remaining:
+                        data = f.read(min(READ_SIZE, remaining))
+                        hasher.update(data)
+                        remaining -= len(data)
+                    next_to_hash += 1
+
+        pending = [i for i in range(len(chunks)) if i not in done]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="download-chunk") as pool:
+            futures = {pool.submit(self._fetch_chunk, mirror["url"], part_path, i): i for i in pending}
+            try:
+                for future in as_completed(futures):
+                    future.result()
+                    done.add(futures[future])
+                    self._save_state(mirror, state_path, done)
+                    advance_hash()
+            except BaseException:
+                # Parar también los trozos en curso; lo ya completado queda anotado para reanudar
+                self._abort.set()
+                for future in futures:
+                    future.cancel()
+                wait(futures)
+                raise
+        advance_hash()
+        return hasher.hexdigest()
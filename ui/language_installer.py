@@ -24,6 +24,8 @@ from PySide6.QtCore import QSize, QThread, Signal
 
 from PySide6.QtWidgets import QApplication
 
+from ui.toolchain_detector import toolchain_detector
+
 
 class LanguageManager(QDialog):
     language_installed = Signal(str)
@@ -35,6 +37,7 @@ class LanguageManager(QDialog):
         self.progress_dialog = None
         self.version_selector = None
         self.setup_ui()
+        toolchain_detector().results_ready.connect(self.apply_detection)
         self.check_installed_languages()
 
         self.language_installed.connect(self.on_language_installed)
@@ -324,168 +327,23 @@ class LanguageManager(QDialog):
             }
         }
 
-        for lang_name in self.languages.keys():
-            check_method = getattr(self, f"check_{lang_name.lower().replace('/', '_').replace('#', 'sharp')}_installed")
-            installed, version = check_method()
-            
-            self.languages[lang_name]["installed"] = installed
-            self.languages[lang_name]["version"] = version
-            self.languages[lang_name]["compatible"] = self.is_version_compatible(
-                version, self.languages[lang_name]["min_version"]
-            )
-        
+        # Al instante con la caché; las sondas se revalidan en paralelo en segundo plano
+        detector = toolchain_detector()
+        self.apply_detection(detector.cached())
+        detector.refresh()
+
+    def apply_detection(self, results):
+        """Vuelca los resultados del detector en las tarjetas (installed None = comprobando)"""
+        for lang_name, data in self.languages.items():
+            result = results.get(lang_name)
+            if result is not None:
+                data["installed"] = result["installed"]
+                data["version"] = result["version"]
+                data["compatible"] = self.is_version_compatible(result["version"], data["min_version"])
+            elif data["version"] is None:
+                data["installed"] = None
         self.update_language_cards()
     
-    def check_java_installed(self):
-        """Verifica si Java está instalado"""
-        try:
-            commands = [
-                ["java", "-version"],
-                ["java", "--version"],
-                [os.path.join(os.environ.get("JAVA_HOME", ""), "bin", "java"), "-version"]
-            ]
-            
-            for cmd in commands:
-                try:
-                    use_shell = platform.system() == "Windows"
-                    result = subprocess.run(
-                        cmd,
-                        capture_output=True,
-                        text=True,
-                        timeout=5,
-                        shell=use_shell
-                    )
-                    if result.returncode == 0:
-                        version_output = result.stderr or result.stdout
-                        return True, self.extract_version(version_output)
-                except:
-                    continue
-                    
-            return False, "No instalado"
-        except:
-            return False, "No instalado"
-
-
-    def check_kotlin_installed(self):
-        """Verifica si Kotlin está instalado"""
-        try:
-            use_shell = platform.system() == "Windows"
-            result = subprocess.run(
-                ["kotlin", "-version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                shell=use_shell
-            )
-            if result.returncode == 0:
-                version_output = result.stdout or result.stderr
-                return True, self.extract_version(version_output)
-            return False, "No instalado"
-        except FileNotFoundError:
-            return False, "No instalado"
-        except Exception as e:
-            print(f"Error verificando Kotlin: {e}")
-            return False, "No instalado"
-
-    def check_flutter_installed(self):
-        """Verifica si Flutter está instalado"""
-        try:
-            use_shell = platform.system() == "Windows"
-            result = subprocess.run(
-                ["flutter", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                shell=use_shell
-            )
-            if result.returncode == 0:
-                version_output = result.stdout or result.stderr
-                return True, self.extract_version(version_output)
-            return False, "No instalado"
-        except:
-            return False, "No instalado"
-
-    def check_python_installed(self):
-        """Verifica si Python está instalado"""
-        try:
-            use_shell = platform.system() == "Windows"
-            try:
-                result = subprocess.run(
-                    ["python3", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                    shell=use_shell
-                )
-                if result.returncode == 0:
-                    return True, self.extract_version(result.stdout or result.stderr)
-            except:
-                pass
-
-            result = subprocess.run(
-                ["python", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                shell=use_shell
-            )
-            if result.returncode == 0:
-                return True, self.extract_version(result.stdout or result.stderr)
-            return False, "No instalado"
-        except:
-            return False, "No instalado"
-
-    def check_cpp_installed(self):
-        """Verifica si C++ (g++) está instalado"""
-        try:
-            use_shell = platform.system() == "Windows"
-            result = subprocess.run(
-                ["g++", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                shell=use_shell
-            )
-            if result.returncode == 0:
-                version_output = result.stdout or result.stderr
-                return True, self.extract_version(version_output)
-            return False, "No instalado"
-        except:
-            return False, "No instalado"
-
-    def check_csharp_installed(self):
-        """Verifica si C# (.NET) está instalado"""
-        try:
-            use_shell = platform.system() == "Windows"
-            result = subprocess.run(
-                ["dotnet", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                shell=use_shell
-            )
-            if result.returncode == 0:
-                version_output = result.stdout or result.stderr
-                return True, self.extract_version(version_output)
-            return False, "No instalado"
-        except:
-            return False, "No instalado"
-
-    def extract_version(self, version_output):
-        """Extrae la versión del output"""
-        try:
-            import re
-            match = re.search(r'(\d+\.\d+\.\d+|\d+\.\d+)', version_output)
-            if match:
-                return match.group(1)
-
-            lines = version_output.split('\n')
-            if lines:
-                return lines[0].strip()[:30]
-            return "Versión"
-        except:
-            return "Versión"
-    
     def update_language_cards(self):
         """Actualiza las tarjetas de lenguaje en la UI"""
         for i in reversed(range(self.cards_layout.count())):
@@ -522,7 +380,10 @@ class LanguageManager(QDialog):
         title.setStyleSheet("font-size: 16px; color: #333;")
 
         status_text = ""
-        if data["installed"]:
+        if data["installed"] is None:
+            status_text = f"⏳ Comprobando {lang}..."
+            status_color = "#666"
+        elif data["installed"]:
             if data["compatible"]:
                 status_text = f"✅ {lang} instalado | v{data['version']} (Compatible)"
                 status_color = "#2e7d32"
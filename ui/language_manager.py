@@ -23,6 +23,10 @@ from PySide6.QtCore import QSize, QThread, Signal
 
 from PySide6.QtWidgets import QApplication
 
+from ui.toolchain_detector import toolchain_detector, probe_language
+from ui.downloader import Downloader, DownloadCancelled, DownloadError
+from ui.streaming_installer import install_archive, ExtractError
+
 
 
 class LanguageManager(QDialog):
@@ -35,6 +39,7 @@ class LanguageManager(QDialog):
         self.setMinimumSize(800, 600)
         self.progress_dialog = None  
         self.setup_ui()
+        toolchain_detector().results_ready.connect(self.apply_detection)
         self.check_installed_languages()
 
         self.language_installed.connect(self.on_language_installed)
@@ -187,165 +192,22 @@ class LanguageManager(QDialog):
             }
         }
 
-        self.languages["Java"]["installed"], self.languages["Java"]["version"] = self.check_java_installed()
-        self.languages["Kotlin"]["installed"], self.languages["Kotlin"]["version"] = self.check_kotlin_installed()
-        self.languages["Dart/Flutter"]["installed"], self.languages["Dart/Flutter"]["version"] = self.check_flutter_installed()
-        self.languages["Python"]["installed"], self.languages["Python"]["version"] = self.check_python_installed()
-        self.languages["C++"]["installed"], self.languages["C++"]["version"] = self.check_cpp_installed()
-        self.languages["C#"]["installed"], self.languages["C#"]["version"] = self.check_csharp_installed()
-        
-        self.update_language_cards()
-
-    def check_java_installed(self):
-        """Verifica si Java está instalado"""
-        try:
-
-            commands = [
-                ["java", "-version"],
-                ["java", "--version"],
-                [os.path.join(os.environ.get("JAVA_HOME", ""), "bin", "java"), "-version"]
-            ]
-            
-            for cmd in commands:
-                try:
-                    use_shell = platform.system() == "Windows"
-                    result = subprocess.run(
-                        cmd,
-                        capture_output=True,
-                        text=True,
-                        timeout=5,
-                        shell=use_shell
-                    )
-                    if result.returncode == 0:
-                        version_output = result.stderr or result.stdout
-                        return True, self.extract_version(version_output)
-                except:
-                    continue
-                    
-            return False, "No instalado"
-        except:
-            return False, "No instalado"
-    def check_kotlin_installed(self):
-        """Verifica si Kotlin está instalado"""
-        try:
-            use_shell = platform.system() == "Windows"
-            result = subprocess.run(
-                ["kotlin", "-version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                shell=use_shell
-            )
-            if result.returncode == 0:
-                version_output = result.stdout or result.stderr
-                return True, self.extract_version(version_output)
-            return False, "No instalado"
-        except FileNotFoundError:
-
-            return False, "No instalado"
-        except Exception as e:
-            print(f"Error verificando Kotlin: {e}")
-            return False, "No instalado"
-
-    def check_flutter_installed(self):
-        """Verifica si Flutter está instalado"""
-        try:
-            use_shell = platform.system() == "Windows"
-            result = subprocess.run(
-                ["flutter", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-                shell=use_shell
-            )
-            if result.returncode == 0:
-                version_output = result.stdout or result.stderr
-                return True, self.extract_version(version_output)
-            return False, "No instalado"
-        except:
-            return False, "No instalado"
-
-    def check_python_installed(self):
-        """Verifica si Python está instalado"""
-        try:
-            use_shell = platform.system() == "Windows"
-            try:
-                result = subprocess.run(
-                    ["python3", "--version"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5,
-                    shell=use_shell
-                )
-                if result.returncode == 0:
-                    return True, self.extract_version(result.stdout or result.stderr)
-            except:
-                pass
-
-            result = subprocess.run(
-                ["python", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                shell=use_shell
-            )
-            if result.returncode == 0:
-                return True, self.extract_version(result.stdout or result.stderr)
-            return False, "No instalado"
-        except:
-            return False, "No instalado"
-
-    def check_cpp_installed(self):
-        """Verifica si C++ (g++) está instalado"""
-        try:
-            use_shell = platform.system() == "Windows"
-            result = subprocess.run(
-                ["g++", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                shell=use_shell
-            )
-            if result.returncode == 0:
-                version_output = result.stdout or result.stderr
-                return True, self.extract_version(version_output)
-            return False, "No instalado"
-        except:
-            return False, "No instalado"
-
-    def check_csharp_installed(self):
-        """Verifica si C# (.NET) está instalado"""
-        try:
-            use_shell = platform.system() == "Windows"
-            result = subprocess.run(
-                ["dotnet", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5,
-                shell=use_shell
-            )
-            if result.returncode == 0:
-                version_output = result.stdout or result.stderr
-                return True, self.extract_version(version_output)
-            return False, "No instalado"
-        except:
-            return False, "No instalado"
+        # Al instante con la caché; las sondas se revalidan en paralelo en segundo plano
+        detector = toolchain_detector()
+        self.apply_detection(detector.cached())
+        detector.refresh()
 
-    def extract_version(self, version_output):
-        """Extrae la versión del output"""
-        try:
-            import re
-            match = re.search(r'(\d+\.\d+\.\d+|\d+\.\d+)', version_output)
-            if match:
-                return match.group(1)
+    def apply_detection(self, results):
+        """Vuelca los resultados del detector en las tarjetas (installed None = comprobando)"""
+        for lang, data in self.languages.items():
+            result = results.get(lang)
+            if result is not None:
+                data["installed"] = result["installed"]
+                data["version"] = result["version"]
+            elif data["version"] is None:
+                data["installed"] = None
+        self.update_language_cards()
 
-            lines = version_output.split('\n')
-            if lines:
-                return lines[0].strip()[:30]
-            return "Versión"
-        except:
-            return "Versión"
-    
     def update_language_cards(self):
         """Actualiza las tarjetas de lenguaje en la UI"""
         for i in reversed(range(self.cards_layout.count())):
@@ -382,7 +244,10 @@ class LanguageManager(QDialog):
         title.setStyleSheet("font-size: 16px;")
         
         status = QLabel()
-        if data["installed"]:
+        if data["installed"] is None:
+            status.setText(f"⏳ Comprobando {lang}...")
+            status.setStyleSheet("color: #666;")
+        elif data["installed"]:
             status.setText(f"✅ {lang} instalado | {data['version']}")
             status.setStyleSheet("color: #2e7d32;")
         else:
@@ -532,54 +397,18 @@ class InstallThread(QThread):
                         "https://github.com/adoptium/temurin17-binaries/releases/latest/download/OpenJDK17U-jdk_x64_windows_hotspot_17.0.8_7.msi"
                     ]
                     
-                    download_path = os.path.join(os.environ["TEMP"], "jdk_installer.msi")
-                    success = False
-                    last_error = ""
-
-                    for i, java_url in enumerate(java_urls):
-                        if self._is_cancelled:
-                            break
-                            
-                        try:
-                            print(f"🔄 Intentando URL {i+1}/{len(java_urls)}: {java_url}")
-                            self.progress_updated.emit(30, f"Descargando desde fuente {i+1}...")
-
-                            opener = urllib.request.build_opener()
-                            opener.addheaders = [('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')]
-                            urllib.request.install_opener(opener)
-
-                            urllib.request.urlretrieve(java_url, download_path)
+                    try:
+                        download_path = self.download(java_urls, "Descargando Java", min_size=5000000)
+                        success = True
+                    except DownloadCancelled:
+                        self.finished.emit(False, "Instalación cancelada")
+                        return
+                    except DownloadError as e:
+                        print(f"❌ Error descargando Java: {e}")
+                        success = False
+                        last_error = str(e)
 
-                            if os.path.exists(download_path):
-                                file_size = os.path.getsize(download_path)
-                                print(f"📦 Tamaño del archivo: {file_size} bytes")
-                                
-                                if file_size > 5000000:  
-                                    print(f"✅ Éxito con URL {i+1}")
-                                    success = True
-                                    break
-                                else:
-                                    os.remove(download_path)
-                                    print("❌ Archivo demasiado pequeño, intentando siguiente...")
-                                    last_error = "Archivo descargado inválido"
-                            else:
-                                print("❌ El archivo no se descargó")
-                                last_error = "Error en la descarga"
-                                
-                        except urllib.error.HTTPError as http_err:
-                            print(f"❌ Error HTTP {http_err.code} con URL {i+1}")
-                            last_error = f"Error HTTP: {http_err.code}"
-                            continue
-                        except urllib.error.URLError as url_err:
-                            print(f"❌ Error URL {url_err.reason} con URL {i+1}")
-                            last_error = f"Error de conexión: {url_err.reason}"
-                            continue
-                        except Exception as e:
-                            print(f"❌ Error general con URL {i+1}: {e}")
-                            last_error = str(e)
-                            continue
-                    
-                    if not success or self._is_cancelled:
+                    if not success:
                         error_message = (
                             "No se pudo descargar Java automáticamente.\n\n"
                             f"Último error: {last_error}\n\n"
@@ -610,7 +439,8 @@ class InstallThread(QThread):
 
                         time.sleep(5)
 
-                        java_installed, java_version = self.check_java_installed()
+                        java = probe_language("Java")
+                        java_installed, java_version = java["installed"], java["version"]
                         
                         if java_installed:
                             self.progress_updated.emit(100, "✅ Java instalado correctamente!")
@@ -645,14 +475,6 @@ class InstallThread(QThread):
                         self.finished.emit(False, "Tiempo de espera agotado. La instalación tomó demasiado tiempo.")
                     except Exception as e:
                         self.finished.emit(False, f"Error ejecutando instalador: {str(e)}")
-                    finally:
-                        try:
-
-                            if os.path.exists(download_path):
-                                os.remove(download_path)
-                                print("🧹 Archivo temporal eliminado")
-                        except:
-                            pass
                             
                 elif system == "linux":
                     self.progress_updated.emit(30, "Instalando Java en Linux...")
@@ -715,55 +537,19 @@ class InstallThread(QThread):
                         "https://github.com/JetBrains/kotlin/releases/download/v1.9.0/kotlin-compiler-1.9.0.zip"
                     ]
                     
-                    download_path = os.path.join(os.environ["TEMP"], "kotlin-compiler.zip")
                     install_path = os.path.join(os.environ["LOCALAPPDATA"], "Kotlin")
-                    success = False
-                    last_error = ""
-                    
-                    for i, kotlin_url in enumerate(kotlin_urls):
-                        if self._is_cancelled:
-                            break
-                            
-                        try:
-                            print(f"🔄 Intentando URL {i+1}/{len(kotlin_urls)}: {kotlin_url}")
-                            self.progress_updated.emit(30, f"Descargando Kotlin desde fuente {i+1}...")
-
-                            opener = urllib.request.build_opener()
-                            opener.addheaders = [('User-Agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')]
-                            urllib.request.install_opener(opener)
-
-                            urllib.request.urlretrieve(kotlin_url, download_path)
+                    try:
+                        self.install_archive(kotlin_urls, install_path, "Descargando y extrayendo Kotlin", min_size=1000000)
+                        success = True
+                    except DownloadCancelled:
+                        self.finished.emit(False, "Instalación cancelada")
+                        return
+                    except (DownloadError, ExtractError) as e:
+                        print(f"❌ Error descargando Kotlin: {e}")
+                        success = False
+                        last_error = str(e)
 
-                            if os.path.exists(download_path):
-                                file_size = os.path.getsize(download_path)
-                                print(f"📦 Tamaño del archivo: {file_size} bytes")
-                                
-                                if file_size > 1000000:  
-                                    print(f"✅ Éxito con URL {i+1}")
-                                    success = True
-                                    break
-                                else:
-                                    os.remove(download_path)
-                                    print("❌ Archivo demasiado pequeño, intentando siguiente...")
-                                    last_error = "Archivo descargado inválido"
-                            else:
-                                print("❌ El archivo no se descargó")
-                                last_error = "Error en la descarga"
-                                
-                        except urllib.error.HTTPError as http_err:
-                            print(f"❌ Error HTTP {http_err.code} con URL {i+1}")
-                            last_error = f"Error HTTP: {http_err.code}"
-                            continue
-                        except urllib.error.URLError as url_err:
-                            print(f"❌ Error URL {url_err.reason} con URL {i+1}")
-                            last_error = f"Error de conexión: {url_err.reason}"
-                            continue
-                        except Exception as e:
-                            print(f"❌ Error general con URL {i+1}: {e}")
-                            last_error = str(e)
-                            continue
-                    
-                    if not success or self._is_cancelled:
+                    if not success:
                         error_message = (
                             "No se pudo descargar Kotlin automáticamente.\n\n"
                             f"Último error: {last_error}\n\n"
@@ -775,14 +561,7 @@ class InstallThread(QThread):
                         self.finished.emit(False, error_message)
                         return
 
-                    self.progress_updated.emit(60, "Extrayendo Kotlin...")
                     try:
-
-                        os.makedirs(install_path, exist_ok=True)
-
-                        with zipfile.ZipFile(download_path, 'r') as zip_ref:
-                            zip_ref.extractall(install_path)
-
                         kotlin_bin_path = None
                         for root, dirs, files in os.walk(install_path):
                             if "bin" in dirs and "kotlin" in files:
@@ -832,13 +611,6 @@ class InstallThread(QThread):
                             
                     except Exception as e:
                         self.finished.emit(False, f"Error extrayendo Kotlin: {str(e)}")
-                    finally:
-                        try:
-                            if os.path.exists(download_path):
-                                os.remove(download_path)
-                                print("🧹 Archivo ZIP temporal eliminado")
-                        except:
-                            pass
                                 
                 elif system == "linux":
                     if self._is_cancelled:
@@ -914,19 +686,8 @@ class InstallThread(QThread):
                     self.progress_updated.emit(30, "Descargando Flutter para Windows...")
                     try:
                         flutter_url = "https://storage.googleapis.com/flutter_infra_release/releases/stable/windows/flutter_windows_3.13.0-stable.zip"
-                        download_path = os.path.join(os.environ["TEMP"], "flutter.zip")
-
-                        opener = urllib.request.build_opener()
-                        opener.addheaders = [('User-Agent', 'Mozilla/5.0')]
-                        urllib.request.install_opener(opener)
-                        urllib.request.urlretrieve(flutter_url, download_path)
-
-                        self.progress_updated.emit(60, "Extrayendo Flutter...")
                         extract_path = os.path.join(os.environ["LOCALAPPDATA"], "flutter")
-                        os.makedirs(extract_path, exist_ok=True)
-                        
-                        with zipfile.ZipFile(download_path, 'r') as zip_ref:
-                            zip_ref.extractall(extract_path)
+                        self.install_archive(flutter_url, extract_path, "Descargando y extrayendo Flutter")
 
                         self.progress_updated.emit(100, "✅ Flutter instalado!")
                         self.finished.emit(True, 
@@ -943,18 +704,8 @@ class InstallThread(QThread):
                     try:
 
                         flutter_url = "https://storage.googleapis.com/flutter_infra_release/releases/stable/linux/flutter_linux_3.13.0-stable.tar.xz"
-                        download_path = os.path.join(tempfile.gettempdir(), "flutter.tar.xz")
-                        
-                        opener = urllib.request.build_opener()
-                        opener.addheaders = [('User-Agent', 'Mozilla/5.0')]
-                        urllib.request.install_opener(opener)
-                        urllib.request.urlretrieve(flutter_url, download_path)
-
-                        self.progress_updated.emit(60, "Extrayendo Flutter...")
                         extract_path = os.path.expanduser("~/flutter")
-                        os.makedirs(extract_path, exist_ok=True)
-                        
-                        subprocess.run(["tar", "-xf", download_path, "-C", extract_path], check=True)
+                        self.install_archive(flutter_url, extract_path, "Descargando y extrayendo Flutter")
                         
                         self.progress_updated.emit(100, "✅ Flutter instalado!")
                         self.finished.emit(True, 
@@ -995,12 +746,7 @@ class InstallThread(QThread):
                     self.progress_updated.emit(30, "Instalando Python en Windows...")
                     try:
                         python_url = "https://www.python.org/ftp/python/3.11.5/python-3.11.5-amd64.exe"
-                        download_path = os.path.join(os.environ["TEMP"], "python_installer.exe")
-                        
-                        opener = urllib.request.build_opener()
-                        opener.addheaders = [('User-Agent', 'Mozilla/5.0')]
-                        urllib.request.install_opener(opener)
-                        urllib.request.urlretrieve(python_url, download_path)
+                        download_path = self.download(python_url, "Descargando Python")
                         
 
                         self.progress_updated.emit(60, "Instalando Python...")
@@ -1097,12 +843,7 @@ class InstallThread(QThread):
                     self.progress_updated.emit(30, "Descargando .NET SDK...")
                     try:
                         dotnet_url = "https://dotnet.microsoft.com/download/dotnet/thank-you/sdk-7.0.400-windows-x64-installer"
-                        download_path = os.path.join(os.environ["TEMP"], "dotnet-sdk.exe")
-                        
-                        opener = urllib.request.build_opener()
-                        opener.addheaders = [('User-Agent', 'Mozilla/5.0')]
-                        urllib.request.install_opener(opener)
-                        urllib.request.urlretrieve(dotnet_url, download_path)
+                        download_path = self.download(dotnet_url, "Descargando .NET SDK")
 
                         self.progress_updated.emit(60, "Instalando .NET SDK...")
                         subprocess.run([download_path, "/install", "/quiet", "/norestart"], 
@@ -1149,6 +890,39 @@ class InstallThread(QThread):
             print(f"❌ ERROR CRÍTICO: {error_details}")
             self.finished.emit(False, f"Error inesperado: {str(e)}")
     
+    def download(self, urls, label, min_size=0, start=20, end=60):
+        """Descarga (o toma de la caché) un instalador con progreso real en [start, end] de la barra"""
+        last = {"percent": -1, "time": 0.0}
+
+        def progress(done, total):
+            percent = start + int((end - start) * done / total) if total else start
+            now = time.monotonic()
+            if percent == last["percent"] and now - last["time"] < 0.25 and done != total:
+                return
+            last.update(percent=percent, time=now)
+            megabytes = f"{done / 2**20:.1f}" + (f"/{total / 2**20:.1f}" if total else "")
+            self.progress_updated.emit(percent, f"{label}... {megabytes} MB")
+
+        downloader = Downloader(urls, min_size=min_size, progress=progress,
+                                cancelled=lambda: self._is_cancelled)
+        return str(downloader.download())
+
+    def install_archive(self, urls, dest, label, min_size=0, start=20, end=90):
+        """Descarga un SDK y lo extrae en dest mientras llega; progreso de bytes y ficheros en [start, end]"""
+        last = {"percent": -1, "time": 0.0}
+
+        def progress(done, total, files):
+            percent = start + int((end - start) * done / total) if total else start
+            now = time.monotonic()
+            if percent == last["percent"] and now - last["time"] < 0.25:
+                return
+            last.update(percent=percent, time=now)
+            megabytes = f"{done / 2**20:.1f}" + (f"/{total / 2**20:.1f}" if total else "")
+            self.progress_updated.emit(percent, f"{label}... {megabytes} MB · {files} archivos")
+
+        install_archive(urls, dest, progress=progress, cancelled=lambda: self._is_cancelled, min_size=min_size)
+        return dest
+
     def cancel_install(self):
         """Cancela la instalación actual"""
         print("🟡 Cancelando instalación...")
@@ -60,7 +60,8 @@ from PySide6.QtWidgets import (
     QHBoxLayout, QMenu, QMainWindow, QFileDialog, QComboBox,
     QApplication, QFrame, QSpacerItem, QSizePolicy, QStackedWidget,
     QGroupBox, QRadioButton, QCheckBox, QListWidget, QSplitter,
-    QScrollArea, QMessageBox, QDialog, QListWidgetItem, QInputDialog  
+    QScrollArea, QMessageBox, QDialog, QListWidgetItem, QInputDialog, QListView,
+    QProgressDialog
 )
 from PySide6.QtGui import (
     QIcon, QCursor, QColor, QPainter, QBrush, 
@@ -70,81 +71,14 @@ from PySide6.QtCore import (
     Qt, QPoint, QSize, Property, QPropertyAnimation, 
     QEvent, QEasingCurve, QRect, QTimer, QSettings, QThread, Signal
 )
+from ui.project_registry import ProjectRegistry, ProjectValidator
+from ui.project_scaffold import ScaffoldThread, template_params
+from ui.project_deletion import ProjectDeleteThread, move_to_trash
+from ui.toolchain_detector import toolchain_detector
+from modules.search_model import SearchListModel, SearchFilterProxyModel, connect_search
 
-class PathManager:
-    def __init__(self):
-        self.rutas_file = Path("rutas.txt")
-        self.ensure_rutas_file()
-    
-    def ensure_rutas_file(self):
-        """Crea el archivo rutas.txt si no existe"""
-        if not self.rutas_file.exists():
-            with open(self.rutas_file, 'w', encoding='utf-8') as f:
-                f.write("# Archivo de rutas de proyectos Creators Studio\n")
-                f.write("# Formato: nombre_proyecto|ruta_completa\n")
-
-    def add_project_path(self, project_name, project_path):
-        absolute_path = os.path.abspath(project_path)
-        
-        with open(self.rutas_file, 'a', encoding='utf-8') as f:
-            f.write(f"{project_name}|{absolute_path}\n")
-    
-    def get_all_projects(self):
-        """Obtiene todos los proyectos del archivo de rutas"""
-        projects = []
-        if self.rutas_file.exists():
-            with open(self.rutas_file, 'r', encoding='utf-8') as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith('#'):
-                        parts = line.split('|', 1)
-                        if len(parts) == 2:
-                            name, path = parts
-                            projects.append({"name": name, "path": path})
-        return projects
-    
-    def get_project_path(self, project_name, exact_match=True):
-        """Obtiene la ruta de un proyecto por nombre"""
-        projects = self.get_all_projects()
-        for project in projects:
-            if exact_match:
-                if project["name"] == project_name:
-                    return project["path"]
-            else:
-                if project_name in project["name"]:
-                    return project["path"]
-        return None
-    
-    def get_projects_by_name(self, project_name):
-        """Obtiene todos los proyectos que coinciden con el nombre"""
-        projects = self.get_all_projects()
-        return [p for p in projects if p["name"] == project_name]
-    
-    def remove_project(self, project_name, project_path):
-        """Elimina un proyecto del archivo de rutas"""
-        if not self.rutas_file.exists():
-            return False
-
-        lines = []
-        with open(self.rutas_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
- 
-        new_lines = []
-        for line in lines:
-            if line.strip() and not line.startswith('#'):
-                parts = line.split('|', 1)
-                if len(parts) == 2:
-                    name, path = parts
-                    if name.strip() == project_name and path.strip() == project_path:
-                        continue 
-            new_lines.append(line)
- 
-        with open(self.rutas_file, 'w', encoding='utf-8') as f:
-            f.writelines(new_lines)
-        
-        return True
-
-path_manager = PathManager()
+# Registro único de proyectos (sustituye a rutas.txt y a los JSON de ~/.myapp_projects)
+path_manager = ProjectRegistry()
 
 class GradientWidget(QWidget):
     def paintEvent(self, event):
@@ -290,6 +224,8 @@ class AndroidSetupWidget(ProjectSetupWidget):
         self.setup_android_specific_ui()
         self.load_last_location()
         self.progress_msg = None
+        self.scaffold_dialog = None
+        self.scaffold_thread = None
     
     def setup_android_specific_ui(self):
         self.layout.setContentsMargins(40, 20, 40, 20)
@@ -427,43 +363,40 @@ class AndroidSetupWidget(ProjectSetupWidget):
 
     def check_language_installed(self, language):
         """Verifica si el lenguaje seleccionado está instalado y en la versión correcta"""
+        probe_name = "Dart/Flutter" if language == "Dart (Flutter)" else language
+        if probe_name not in ("Java", "Kotlin", "Dart/Flutter"):
+            return None
         try:
+            # Caché del detector si sigue siendo válida; si no, una sola sonda
+            result = toolchain_detector().detect([probe_name])[probe_name]
+            if not result["installed"]:
+                return False
+            version_output = result["output"]
+
             if language == "Java":
-                result = subprocess.run(["java", "-version"], stderr=subprocess.PIPE, text=True)
-                if result.returncode == 0:
-                    version_output = result.stderr.lower()
-                    if 'jdk' in version_output:  
-                        version_line = version_output.split('\n')[0]
-                        version = version_line.split(' ')[2].replace('"', '')
-                        major_version = int(version.split('.')[0])
-                        return major_version in [11, 17] 
+                version_output = version_output.lower()
+                if 'jdk' in version_output:  
+                    version_line = version_output.split('\n')[0]
+                    version = version_line.split(' ')[2].replace('"', '')
+                    major_version = int(version.split('.')[0])
+                    return major_version in [11, 17] 
                 return False
                 
             elif language == "Kotlin":
-                result = subprocess.run(["kotlin", "-version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                if result.returncode == 0:
-                    version_output = result.stderr or result.stdout
-                    if 'version' in version_output.lower():
-                        version = version_output.split()[2].split('-')[0]
-                        major_version = int(version.split('.')[0])
-                        return major_version >= 1 
+                if 'version' in version_output.lower():
+                    version = version_output.split()[2].split('-')[0]
+                    major_version = int(version.split('.')[0])
+                    return major_version >= 1 
                 return False
                 
             elif language == "Dart (Flutter)":
-                try:
-                    result = subprocess.run(["flutter", "--version"], stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
-                    if result.returncode == 0:
-                        version_line = result.stdout.split('\n')[0]
-                        if 'flutter' in version_line.lower():
-                            return True
-                except FileNotFoundError:
-                    pass
-                return False
+                version_line = version_output.split('\n')[0]
+                return 'flutter' in version_line.lower()
                 
         except Exception as e:
             print(f"Error verificando {language}: {e}")
             return False
-        
+
     def create_project(self):
         if not self.name_input.text().strip():
             QMessageBox.critical(self, "Error", "El nombre del proyecto es requerido")
@@ -529,17 +462,8 @@ class AndroidSetupWidget(ProjectSetupWidget):
 
     def check_project_name_exists(self, project_name):
         """Verifica si ya existe un proyecto con el mismo nombre"""
-        projects_dir = Path.home() / ".myapp_projects"
-        projects_dir.mkdir(exist_ok=True, parents=True)
-        
-        for file in projects_dir.glob("*.json"):
-            try:
-                with open(file, 'r', encoding='utf-8') as f:
-                    project_data = json.load(f)
-                    if project_data.get("name") == project_name:
-                        return True
-            except:
-                continue
+        if path_manager.name_exists(project_name):
+            return True
         
         project_path = Path(self.location_input.text()) / project_name
         return project_path.exists()
@@ -550,8 +474,6 @@ class AndroidSetupWidget(ProjectSetupWidget):
         project_dir = os.path.join(base_dir, project_name)
         project_dir = os.path.abspath(project_dir)
 
-        os.makedirs(project_dir, exist_ok=True)
-
         project_data = {
             "name": project_name,
             "project_type": "Android",
@@ -565,20 +487,60 @@ class AndroidSetupWidget(ProjectSetupWidget):
             "last_modified": datetime.datetime.now().isoformat()
         }
 
-        projects_dir = Path.home() / ".myapp_projects"
-        projects_dir.mkdir(exist_ok=True, parents=True)
-        
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_name = "".join(c for c in project_name if c.isalnum() or c in " _-").rstrip()
-        filename = f"{safe_name}_{timestamp}.json"
-        filepath = projects_dir / filename
-        
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(project_data, f, indent=2, ensure_ascii=False)
+        self.create_project_structure(project_dir, selected_language, project_data)
 
-        self.create_project_structure(project_dir, selected_language)
-        
-        path_manager.add_project_path(project_name, project_dir)
+    def create_project_structure(self, project_dir, language, project_data):
+        """Crea la estructura de archivos desde la plantilla del lenguaje en segundo plano"""
+        if self.scaffold_thread is not None:
+            QMessageBox.information(self, "Nuevo proyecto", "Ya se está creando un proyecto")
+            return
+        self.scaffold_dialog = QProgressDialog(
+            f"Creando proyecto {project_data['name']}...",
+            "Cancelar",
+            0,
+            100,
+            self
+        )
+        self.scaffold_dialog.setWindowTitle("Nuevo proyecto")
+        self.scaffold_dialog.setWindowModality(Qt.WindowModal)
+        self.scaffold_dialog.setAutoClose(False)
+        self.scaffold_dialog.setAutoReset(False)
+        self.scaffold_dialog.setMinimumDuration(300)
+        self.scaffold_dialog.setValue(0)
+
+        self.scaffold_thread = ScaffoldThread(project_dir, language, template_params(project_data["name"]))
+        self.scaffold_thread.progress_updated.connect(self.update_scaffold_progress)
+        self.scaffold_thread.finished.connect(self.release_scaffold_thread)
+        self.scaffold_thread.done.connect(
+            lambda success, msg, data=project_data: self.on_project_scaffolded(success, msg, data)
+        )
+        self.scaffold_dialog.canceled.connect(self.scaffold_thread.cancel)
+        self.scaffold_thread.start()
+
+    def update_scaffold_progress(self, percent, message):
+        if self.scaffold_dialog is not None:
+            self.scaffold_dialog.setValue(percent)
+            self.scaffold_dialog.setLabelText(message)
+
+    def release_scaffold_thread(self):
+        """Suelta el hilo cuando QThread.finished confirma que run() ha terminado"""
+        if self.scaffold_thread is not None:
+            self.scaffold_thread.wait()
+            self.scaffold_thread = None
+
+    def on_project_scaffolded(self, success, message, project_data):
+        """Registra y abre el proyecto cuando su estructura está escrita"""
+        self.scaffold_dialog.close()
+        self.scaffold_dialog = None
+
+        if not success:
+            QMessageBox.warning(self, "Proyecto no creado", message)
+            return
+
+        project_name = project_data["name"]
+        project_dir = project_data["location_path"]
+        selected_language = project_data["language"]
+        path_manager.add_project(project_name, project_dir, selected_language, project_data)
         
         QMessageBox.information(
             self, 
@@ -604,144 +566,6 @@ class AndroidSetupWidget(ProjectSetupWidget):
         if hasattr(self.parent(), 'update_project_list'):
             self.parent().update_project_list()
 
-    def create_project_structure(self, project_dir, language):
-        """Crea la estructura de archivos según el lenguaje seleccionado"""
-        try:
-            if language == "Java":
-                self.create_java_structure(project_dir)
-            elif language == "Kotlin":
-                self.create_kotlin_structure(project_dir)
-            elif language == "Dart (Flutter)":
-                self.create_flutter_structure(project_dir)
-                
-        except Exception as e:
-            print(f"Error creando estructura: {e}")
-
-    def create_java_structure(self, project_dir):
-        """Estructura para proyecto Android Java"""
-        dirs = [
-            "app/src/main/java/com/example/myapp",
-            "app/src/main/res/layout",
-            "app/src/main/res/drawable",
-            "app/src/main/res/values",
-            "app/src/main/res/mipmap",
-            "gradle/wrapper"
-        ]
-        
-        for dir_path in dirs:
-            os.makedirs(os.path.join(project_dir, dir_path), exist_ok=True)
-        
-        self.create_java_main_activity(project_dir)
-        self.create_android_manifest(project_dir)
-        self.create_strings_xml(project_dir)
-        self.create_build_gradle(project_dir, "java")
-        self.create_gradle_wrapper(project_dir)
-
-    def create_java_main_activity(self, project_dir):
-        """Crea el archivo MainActivity.java"""
-        content = '''package com.example.myapp;
-
-import androidx.appcompat.app.AppCompatActivity;
-import android.os.Bundle;
-
-public class MainActivity extends AppCompatActivity {
-    @Override
-    protected void onCreate(Bundle savedInstanceState) {
-        super.onCreate(savedInstanceState);
-        setContentView(R.layout.activity_main);
-    }
-}
-'''
-        with open(os.path.join(project_dir, "app/src/main/java/com/example/myapp/MainActivity.java"), "w", encoding='utf-8') as f:
-            f.write(content)
-
-    def create_android_manifest(self, project_dir):
-        """Crea AndroidManifest.xml"""
-        content = '''<?xml version="1.0" encoding="utf-8"?>
-<manifest xmlns:android="http://schemas.android.com/apk/res/android"
-    package="com.example.myapp">
-
-    <application
-        android:allowBackup="true"
-        android:icon="@mipmap/ic_launcher"
-        android:label="@string/app_name"
-        android:roundIcon="@mipmap/ic_launcher_round"
-        android:supportsRtl="true"
-        android:theme="@style/AppTheme">
-        <activity
-            android:name=".MainActivity"
-            android:exported="true">
-            <intent-filter>
-                <action android:name="android.intent.action.MAIN" />
-                <category android:name="android.intent.category.LAUNCHER" />
-            </intent-filter>
-        </activity>
-    </application>
-
-</manifest>
-'''
-        with open(os.path.join(project_dir, "app/src/main/AndroidManifest.xml"), "w", encoding='utf-8') as f:
-            f.write(content)
-
-    def create_strings_xml(self, project_dir):
-        """Crea strings.xml"""
-        content = '''<resources>
-    <string name="app_name">My App</string>
-</resources>
-'''
-        with open(os.path.join(project_dir, "app/src/main/res/values/strings.xml"), "w", encoding='utf-8') as f:
-            f.write(content)
-
-    def create_build_gradle(self, project_dir, language):
-        """Crea build.gradle según el lenguaje"""
-        if language == "java":
-            content = '''plugins {
-    id 'com.android.application'
-}
-
-android {
-    compileSdk 33
-
-    defaultConfig {
-        applicationId "com.example.myapp"
-        minSdk 21
-        targetSdk 33
-        versionCode 1
-        versionName "1.0"
-    }
-
-    buildTypes {
-        release {
-            minifyEnabled false
-            proguardFiles getDefaultProguardFile('proguard-android-optimize.txt'), 'proguard-rules.pro'
-        }
-    }
-    compileOptions {
-        sourceCompatibility JavaVersion.VERSION_1_8
-        targetCompatibility JavaVersion.VERSION_1_8
-    }
-}
-
-dependencies {
-    implementation 'androidx.appcompat:appcompat:1.6.1'
-    implementation 'com.google.android.material:material:1.8.0'
-    implementation 'androidx.constraintlayout:constraintlayout:2.1.4'
-}
-'''
-        with open(os.path.join(project_dir, "app/build.gradle"), "w", encoding='utf-8') as f:
-            f.write(content)
-
-    def create_gradle_wrapper(self, project_dir):
-        """Crea archivos básicos de Gradle"""
-        wrapper_content = '''distributionBase=GRADLE_USER_HOME
-distributionPath=wrapper/dists
-distributionUrl=https\\://services.gradle.org/distributions/gradle-7.5-bin.zip
-zipStoreBase=GRADLE_USER_HOME
-zipStorePath=wrapper/dists
-'''
-        with open(os.path.join(project_dir, "gradle/wrapper/gradle-wrapper.properties"), "w", encoding='utf-8') as f:
-            f.write(wrapper_content)
-
     def on_language_installed(self, installed_language, required_language):
         """Se llama cuando se instala un lenguaje desde el gestor"""
         if installed_language == required_language:
@@ -754,11 +578,30 @@ zipStorePath=wrapper/dists
                     f"El lenguaje {required_language} sigue sin estar instalado correctamente."
                 )
 
+def format_size(size):
+    """Tamaño legible: 512 B, 3.4 MB..."""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
 class ProjectListWidget(QWidget):
     project_opened_signal = Signal(str, str, str) 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.projects_dir = Path.home() / ".myapp_projects"
+        self.delete_dialog = None
+        self.delete_thread = None
+        # Estado de las rutas comprobado en segundo plano; la lista se pinta antes con la caché
+        self.validator = ProjectValidator(path_manager, parent=self)
+        self.validator.validated.connect(self.on_project_validated)
+        self.destroyed.connect(self.validator.shutdown)
+        
+        # Modelo/vista: filtro difuso con claves precalculadas y orden por uso reciente
+        self.project_model = SearchListModel(self)
+        self.project_proxy = SearchFilterProxyModel(self)
+        self.project_proxy.setSourceModel(self.project_model)
+        self.project_rows = {}
         self.setup_ui()
     
     def setup_ui(self):
@@ -778,7 +621,7 @@ class ProjectListWidget(QWidget):
                 font-size: 14px;
             }
         """)
-        self.search_bar.textChanged.connect(self.filter_projects)
+        self.search_timer = connect_search(self.search_bar, self.project_proxy)
         
         self.title = QLabel("Tus proyectos locales")
         self.title.setStyleSheet("""
@@ -796,9 +639,11 @@ class ProjectListWidget(QWidget):
             QScrollArea { border: none; background: transparent; }
         """)
  
-        self.project_list = QListWidget()
+        self.project_list = QListView()
+        self.project_list.setModel(self.project_proxy)
+        self.project_list.setUniformItemSizes(True)
         self.project_list.setStyleSheet("""
-            QListWidget {
+            QListView {
                 background-color: #252525;
                 color: white;
                 border: 1px solid #555555;
@@ -806,19 +651,19 @@ class ProjectListWidget(QWidget):
                 padding: 5px;
                 font-size: 14px;
             }
-            QListWidget::item {
+            QListView::item {
                 padding: 12px;
                 border-bottom: 1px solid #333333;
             }
-            QListWidget::item:hover {
+            QListView::item:hover {
                 background-color: #333333;
             }
-            QListWidget::item:selected {
+            QListView::item:selected {
                 background-color: #BB86FC;
                 color: black;
             }
         """)
-        self.project_list.itemDoubleClicked.connect(self.open_project)
+        self.project_list.doubleClicked.connect(self.open_project)
 
         self.btn_refresh = QPushButton("Actualizar lista")
         self.btn_delete = QPushButton("Eliminar proyecto")
@@ -864,71 +709,72 @@ class ProjectListWidget(QWidget):
         self.load_projects()
     
     def load_projects(self):
-        self.project_list.clear()
+        self.project_rows = {}
         try:
+            # El registro ya devuelve rutas absolutas ordenadas por nombre y el último estado conocido
             projects = path_manager.get_all_projects()
-            for project in projects:
-                if not os.path.isabs(project["path"]):
-                    project["path"] = os.path.abspath(project["path"])
-
-            self.projects_dir.mkdir(exist_ok=True, parents=True)
-            for file in self.projects_dir.glob("*.json"):
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        project_data = json.load(f)
-
-                    json_path = project_data.get("location_path", "")
-                    if json_path and not os.path.isabs(json_path):
-                        json_path = os.path.abspath(json_path)
-
-                    existing = any(
-                        p["name"] == project_data["name"] and 
-                        os.path.abspath(p["path"]) == os.path.abspath(json_path)
-                        for p in projects
-                    )
-                    
-                    if not existing and json_path:
-                        path_manager.add_project_path(project_data["name"], json_path)
-                        projects.append({"name": project_data["name"], "path": json_path})
-                    
-                except json.JSONDecodeError:
-                    continue
-
-            projects.sort(key=lambda x: x["name"].lower())
             
-            for project in projects:
-                path_exists = os.path.exists(project["path"])
-                status = "✅" if path_exists else "❌"
-                
-                item_text = f"{status} {project['name']} - {project['path']}"
-                item = QListWidgetItem(item_text)
-                
-                if not path_exists:
-                    item.setForeground(QColor("red"))
-                    item.setToolTip("La ruta del proyecto no existe")
-                
-                item.setData(Qt.UserRole, project)
-                self.project_list.addItem(item)
+            entries = []
+            for row, project in enumerate(projects):
+                entry = SearchListModel.make_entry("", project, search_text=f"{project['name']} {project['path']}",
+                                                   recent=project.get("last_opened"))
+                entry.update(self.project_entry_fields(project))
+                entries.append(entry)
+                self.project_rows[(project["name"], project["path"])] = row
                 
             if not projects:
-                self.project_list.addItem("No hay proyectos creados aún")
+                entries.append(SearchListModel.make_entry("No hay proyectos creados aún"))
+            self.project_model.set_entries(entries)
+            
+            # Sin tocar el disco en el hilo de la GUI: las filas se actualizan al llegar cada resultado
+            self.validator.validate(projects)
                 
         except Exception as e:
-            self.project_list.addItem(f"Error al cargar proyectos: {str(e)}")
+            self.project_model.set_entries([SearchListModel.make_entry(f"Error al cargar proyectos: {str(e)}")])
+
+    def project_entry_fields(self, project):
+        """Texto, color y tooltip de una fila según el estado de ruta conocido (⏳ si aún no se ha comprobado)"""
+        exists = project.get("exists")
+        status = "⏳" if exists is None else ("✅" if exists else "❌")
+        
+        details = []
+        if project.get("size") is not None:
+            details.append(format_size(project["size"]))
+        if project.get("mtime"):
+            details.append(datetime.datetime.fromtimestamp(project["mtime"]).strftime("%Y-%m-%d %H:%M"))
+        suffix = f"  ({' · '.join(details)})" if details else ""
+        
+        if exists is False:
+            foreground, tooltip = QColor("red"), "La ruta del proyecto no existe"
+        else:
+            foreground = None
+            tooltip = "Comprobando la ruta del proyecto..." if exists is None else project["path"]
+        return {
+            "text": f"{status} {project['name']} - {project['path']}{suffix}",
+            "foreground": foreground,
+            "tooltip": tooltip,
+            "data": project,
+        }
+
+    def on_project_validated(self, key, status):
+        row = self.project_rows.get(key)
+        if row is None:
+            return
+        project = dict(self.project_model.entry(row)["data"])
+        project.update(status)
+        self.project_model.update_entry(row, **self.project_entry_fields(project))
 
     def filter_projects(self, text):
-        for i in range(self.project_list.count()):
-            item = self.project_list.item(i)
-            item.setHidden(text.lower() not in item.text().lower())
+        self.project_proxy.set_query(text)
 
     def open_project_folder(self):
-        selected = self.project_list.currentItem()
-        if not selected:
+        selected = self.project_list.currentIndex()
+        if not selected.isValid():
             QMessageBox.warning(self, "Advertencia", "Selecciona un proyecto primero")
             return
             
         project_data = selected.data(Qt.UserRole)
-        if isinstance(project_data, str):
+        if not project_data or isinstance(project_data, str):
             return
             
         try:
@@ -947,13 +793,17 @@ class ProjectListWidget(QWidget):
             QMessageBox.critical(self, "Error", f"No se pudo abrir la ubicación:\n{str(e)}")
 
     def delete_selected_project(self):
-        selected = self.project_list.currentItem()
-        if not selected:
+        selected = self.project_list.currentIndex()
+        if not selected.isValid():
             QMessageBox.warning(self, "Advertencia", "Selecciona un proyecto primero")
             return
             
         project_data = selected.data(Qt.UserRole)
-        if isinstance(project_data, str): 
+        if not project_data or isinstance(project_data, str):
+            return
+
+        if self.delete_thread is not None:
+            QMessageBox.information(self, "Eliminar proyecto", "Espera a que termine el borrado en curso")
             return
             
         reply = QMessageBox.question(
@@ -966,79 +816,101 @@ class ProjectListWidget(QWidget):
             QMessageBox.No  
         )
         
-        if reply == QMessageBox.Yes:
-            try:
-                project_path = Path(project_data["path"])
-                
-                if project_path.exists():
-                    import shutil
-                    try:
-                        shutil.rmtree(project_path)
-                        files_deleted = True
-                    except Exception as e:
-                        QMessageBox.warning(
-                            self, 
-                            "Advertencia", 
-                            f"No se pudieron eliminar todos los archivos:\n{str(e)}\n\n"
-                            "Pero se eliminará la referencia del proyecto."
-                        )
-                        files_deleted = False
-                else:
-                    files_deleted = False
-                    QMessageBox.information(
-                        self,
-                        "Proyecto no encontrado",
-                        "La carpeta del proyecto no existe en el sistema.\n"
-                        "Solo se eliminará la referencia del proyecto."
-                    )
-                
-                path_manager.remove_project(project_data["name"], project_data["path"])
-                projects_dir = Path.home() / ".myapp_projects"
-                json_deleted = False
-                for file in projects_dir.glob("*.json"):
-                    try:
-                        with open(file, 'r', encoding='utf-8') as f:
-                            json_data = json.load(f)
-                            if (json_data.get("name") == project_data["name"] and 
-                                json_data.get("location_path") == project_data["path"]):
-                                os.remove(file)
-                                json_deleted = True
-                                break
-                    except:
-                        continue
+        if reply != QMessageBox.Yes or self.delete_thread is not None:
+            return
+
+        project_path = Path(project_data["path"])
+        if not project_path.exists():
+            path_manager.remove_project(project_data["name"], project_data["path"])
+            self.load_projects()
+            QMessageBox.information(
+                self,
+                "Proyecto no encontrado",
+                "La carpeta del proyecto no existe en el sistema.\n"
+                "Solo se eliminó la referencia del proyecto."
+            )
+            return
+
+        # Renombrar a la papelera es instantáneo: el proyecto desaparece ya de la lista
+        trash_path = move_to_trash(project_path)
+        if trash_path is not None:
+            path_manager.remove_project(project_data["name"], project_data["path"])
+            self.load_projects()
+
+        self.delete_dialog = QProgressDialog(
+            f"Eliminando {project_data['name']}...",
+            "Cancelar",
+            0,
+            100,
+            self
+        )
+        self.delete_dialog.setWindowTitle("Eliminar proyecto")
+        self.delete_dialog.setWindowModality(Qt.WindowModal)
+        self.delete_dialog.setAutoClose(False)
+        self.delete_dialog.setAutoReset(False)
+        self.delete_dialog.setMinimumDuration(500)
+        self.delete_dialog.setValue(0)
+
+        self.delete_thread = ProjectDeleteThread(trash_path or project_path)
+        self.delete_thread.progress_updated.connect(self.update_delete_progress)
+        self.delete_thread.finished.connect(self.release_delete_thread)
+        self.delete_thread.done.connect(
+            lambda success, msg, data=project_data, trashed=trash_path is not None:
+                self.on_project_deleted(success, msg, data, trashed)
+        )
+        self.delete_dialog.canceled.connect(self.delete_thread.cancel)
+        self.delete_thread.start()
+
+    def update_delete_progress(self, percent, message):
+        if self.delete_dialog is not None:
+            self.delete_dialog.setValue(percent)
+            self.delete_dialog.setLabelText(message)
 
+    def release_delete_thread(self):
+        """Suelta el hilo cuando QThread.finished confirma que run() ha terminado"""
+        if self.delete_thread is not None:
+            self.delete_thread.wait()
+            self.delete_thread = None
+
+    def on_project_deleted(self, success, message, project_data, trashed):
+        self.delete_dialog.close()
+        self.delete_dialog = None
+
+        if success:
+            if not trashed:
+                path_manager.remove_project(project_data["name"], project_data["path"])
                 self.load_projects()
-                if files_deleted:
-                    QMessageBox.information(
-                        self, 
-                        "Éxito", 
-                        "Proyecto eliminado completamente:\n"
-                        "✓ Archivos físicos eliminados\n"
-                        "✓ Referencias removidas"
-                    )
-                else:
-                    QMessageBox.information(
-                        self, 
-                        "Éxito parcial", 
-                        "Referencia del proyecto eliminada.\n"
-                        "Los archivos físicos ya no existían o no se pudieron eliminar."
-                    )
-                    
-            except Exception as e:
-                QMessageBox.critical(
-                    self, 
-                    "Error", 
-                    f"No se pudo eliminar el proyecto completamente:\n{str(e)}"
-                )
+            QMessageBox.information(
+                self, 
+                "Éxito", 
+                "Proyecto eliminado completamente:\n"
+                "✓ Archivos físicos eliminados\n"
+                "✓ Referencias removidas"
+            )
+        elif trashed:
+            QMessageBox.warning(
+                self,
+                "Éxito parcial",
+                f"Referencia del proyecto eliminada.\n\n{message}"
+            )
+        else:
+            # Borrado en su sitio interrumpido: el proyecto sigue registrado con lo que quede
+            self.load_projects()
+            QMessageBox.warning(
+                self, 
+                "Advertencia", 
+                f"No se pudieron eliminar todos los archivos:\n{message}"
+            )
 
-    def open_project(self, item):
-        project_data = item.data(Qt.UserRole)
+    def open_project(self, index):
+        project_data = index.data(Qt.UserRole)
         if not project_data or isinstance(project_data, str):
             return
             
         try:
             project_name = project_data["name"]
             project_path = project_data["path"]
+            path_manager.mark_opened(project_name, project_path)
             project_language = self.load_project_language(project_name, project_path)
             
             if not project_path or not os.path.exists(project_path):
@@ -1056,18 +928,10 @@ class ProjectListWidget(QWidget):
     def load_project_language(self, project_name, project_path):
         """Carga el lenguaje del proyecto desde los metadatos"""
         try:
-            projects_dir = Path.home() / ".myapp_projects"
-            for file in projects_dir.glob("*.json"):
-                try:
-                    with open(file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        if data.get("name") == project_name and data.get("location_path") == project_path:
-                            return data.get("language", "Java")
-                except:
-                    continue
-        except:
-            pass
-        return "Java"  
+            return path_manager.get_language(project_name, project_path)
+        except Exception as e:
+            print(f"Error leyendo el lenguaje del proyecto: {e}")
+        return "Java"
     
 class MainApp(QWidget):
     project_opened = Signal(str, str, str)  
@@ -0,0 +1,149 @@
+import os
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PySide6.QtCore import QThread, Signal
+
+# Papelera junto al proyecto: el rename se queda en el mismo disco y es instantáneo
+TRASH_DIR_NAME = ".myapp_trash"
+DELETE_BATCH = 256
+
+
+def move_to_trash(project_path):
+    """Renombra la carpeta del proyecto a la papelera de su directorio padre; devuelve la nueva ruta o None
+
+    Falla (None) si la carpeta no existe o no se puede renombrar, p. ej. por
+    un fichero abierto en Windows; en ese caso se borra en su sitio.
+    """
+    project_path = Path(project_path)
+    trash_dir = project_path.parent / TRASH_DIR_NAME
+    target = trash_dir / f"{project_path.name}-{time.time_ns()}"
+    try:
+        trash_dir.mkdir(exist_ok=True)
+        os.replace(project_path, target)
+    except OSError as e:
+        print(f"⚠️ No se pudo mover a la papelera {project_path}: {e}")
+        return None
+    return target
+
+
+def _remove_file(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        # Ficheros de solo lectura (git, gradle) en Windows
+        os.chmod(path, stat.S_IWRITE)
+        os.unlink(path)
+
+
+def _remove_dir(path):
+    try:
+        os.rmdir(path)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        os.chmod(path, stat.S_IWRITE)
+        os.rmdir(path)
+
+
+def scan_tree(root):
+    """Ficheros (incluidos enlaces) y directorios bajo root, sin seguir enlaces simbólicos
+
+    Los directorios salen en preorden, así que borrarlos en orden inverso
+    deja siempre los hijos antes que el padre.
+    """
+    files, dirs = [], [str(root)]
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    dirs.append(entry.path)
+                    stack.append(entry.path)
+                else:
+                    files.append(entry.path)
+    return files, dirs
+
+
+class DeleteCancelled(Exception):
+    pass
+
+
+def delete_tree(root, progress=None, cancel_event=None, max_workers=8, batch_size=DELETE_BATCH):
+    """Borra root en lotes de ficheros repartidos en un pool de hilos
+
+    progress(borrados, total) se llama tras cada lote. Con cancel_event
+    activado se dejan de enviar lotes y se lanza DeleteCancelled.
+    """
+    files, dirs = scan_tree(root)
+    total = len(files) + len(dirs)
+    done = 0
+
+    def remove_batch(batch):
+        for path in batch:
+            _remove_file(path)
+        return len(batch)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = []
+        for start in range(0, len(files), batch_size):
+            futures.append(pool.submit(remove_batch, files[start:start + batch_size]))
+        for future in futures:
+            if cancel_event is not None and cancel_event.is_set():
+                for pending in futures:
+                    pending.cancel()
+                raise DeleteCancelled()
+            done += future.result()
+            if progress is not None:
+                progress(done, total)
+
+    for path in reversed(dirs):
+        if cancel_event is not None and cancel_event.is_set():
+            raise DeleteCancelled()
+        _remove_dir(path)
+        done += 1
+        if progress is not None and done % batch_size == 0:
+            progress(done, total)
+    if progress is not None:
+        progress(total, total)
+
+
+class ProjectDeleteThread(QThread):
+    """Hilo que borra la carpeta (ya en la papelera) de un proyecto con progreso real"""
+    progress_updated = Signal(int, str)
+    # No se llama finished: esa señal de QThread indica que el hilo ya terminó de verdad
+    done = Signal(bool, str)
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = Path(path)
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            if self.path.exists():
+                delete_tree(self.path, self._report, self._cancel_event)
+            trash_dir = self.path.parent
+            if trash_dir.name == TRASH_DIR_NAME:
+                try:
+                    trash_dir.rmdir()
+                except OSError:
+                    pass  # Quedan restos de otro borrado
+            self.done.emit(True, "Archivos eliminados")
+        except DeleteCancelled:
+            self.done.emit(False, f"Borrado cancelado. Los archivos restantes están en:\n{self.path}")
+        except Exception as e:
+            print(f"❌ Error eliminando {self.path}: {e}")
+            self.done.emit(False, str(e))
+
+    def _report(self, done, total):
+        percent = int(done * 100 / total) if total else 100
+        self.progress_updated.emit(percent, f"Eliminando archivos... {done}/{total}")
+
+    def cancel(self):
+        self._cancel_event.set()
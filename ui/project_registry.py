@@ -0,0 +1,316 @@
+import json
+import os
+import sqlite3
+import threading
+import datetime
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal
+
+REGISTRY_DIR = Path.home() / ".myapp_projects"
+REGISTRY_FILE = REGISTRY_DIR / "registry.sqlite3"
+LEGACY_RUTAS_FILE = Path("rutas.txt")
+
+SCHEMA_VERSION = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    name TEXT NOT NULL,
+    path TEXT NOT NULL,
+    language TEXT NOT NULL DEFAULT 'Java',
+    metadata TEXT NOT NULL DEFAULT '{}',
+    created_at TEXT,
+    last_modified TEXT,
+    path_exists INTEGER,
+    size INTEGER,
+    mtime REAL,
+    last_opened REAL,
+    PRIMARY KEY (name, path)
+);
+CREATE INDEX IF NOT EXISTS projects_by_name ON projects (name COLLATE NOCASE);
+"""
+
+
+def normalize_path(project_path):
+    return os.path.abspath(project_path) if project_path else ""
+
+
+class ProjectRegistry:
+    """Registro único de proyectos (SQLite) indexado por nombre + ruta
+
+    Sustituye a rutas.txt y a los JSON sueltos de ~/.myapp_projects: las
+    búsquedas usan el índice de la tabla y cada cambio es una transacción
+    atómica. La primera vez importa los proyectos de esos ficheros antiguos.
+    """
+
+    def __init__(self, db_path=REGISTRY_FILE, legacy_rutas=LEGACY_RUTAS_FILE, legacy_dir=REGISTRY_DIR):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(exist_ok=True, parents=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.executescript(SCHEMA)
+
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self._add_missing_columns()
+        if version < 1:
+            self.import_legacy(Path(legacy_rutas), Path(legacy_dir))
+        elif version < SCHEMA_VERSION:
+            with self.conn:
+                self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    # MIGRACIÓN
+    def _add_missing_columns(self):
+        """v2: estado de la ruta cacheado entre ejecuciones; v3: última apertura (orden por uso reciente)"""
+        columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(projects)")}
+        added = (("path_exists", "INTEGER"), ("size", "INTEGER"), ("mtime", "REAL"), ("last_opened", "REAL"))
+        with self.conn:
+            for column, kind in added:
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE projects ADD COLUMN {column} {kind}")
+
+    def import_legacy(self, rutas_file, projects_dir):
+        """Importa rutas.txt y los *.json de proyectos en una sola transacción"""
+        rows = {}
+        if rutas_file.exists():
+            with open(rutas_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        parts = line.split('|', 1)
+                        if len(parts) == 2:
+                            name, path = parts[0].strip(), normalize_path(parts[1].strip())
+                            rows[(name, path)] = ("Java", {})
+
+        if projects_dir.exists():
+            for file in projects_dir.glob("*.json"):
+                try:
+                    with open(file, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                name = data.get("name")
+                path = normalize_path(data.get("location_path", ""))
+                if name and path:
+                    rows[(name, path)] = (data.get("language", "Java"), data)
+
+        with self._lock, self.conn:
+            for (name, path), (language, metadata) in rows.items():
+                self._upsert(name, path, language, metadata)
+            self.conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        if rows:
+            print(f"📦 {len(rows)} proyectos importados al registro")
+
+    # ESCRITURA
+    def _upsert(self, name, path, language, metadata):
+        now = datetime.datetime.now().isoformat()
+        self.conn.execute(
+            """INSERT INTO projects (name, path, language, metadata, created_at, last_modified)
+               VALUES (?, ?, ?, ?, ?, ?)
+               ON CONFLICT (name, path) DO UPDATE SET
+                   language = excluded.language,
+                   metadata = excluded.metadata,
+                   last_modified = excluded.last_modified""",
+            (name, path, language or "Java", json.dumps(metadata or {}, ensure_ascii=False),
+             (metadata or {}).get("created_at", now), (metadata or {}).get("last_modified", now))
+        )
+
+    def add_project(self, project_name, project_path, language="Java", metadata=None):
+        """Registra (o actualiza) un proyecto con su lenguaje y metadatos"""
+        with self._lock, self.conn:
+            self._upsert(project_name, normalize_path(project_path), language, metadata)
+
+    def add_project_path(self, project_name, project_path):
+        """Compatibilidad con PathManager: registra solo nombre y ruta"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO projects (name, path, created_at, last_modified) VALUES (?, ?, ?, ?)",
+                (project_name, normalize_path(project_path),
+                 datetime.datetime.now().isoformat(), datetime.datetime.now().isoformat())
+            )
+
+    def update_status(self, project_name, project_path, status):
+        """Guarda el resultado de validar la ruta de un proyecto"""
+        exists = status.get("exists")
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE projects SET path_exists = ?, size = ?, mtime = ? WHERE name = ? AND path = ?",
+                (None if exists is None else int(exists), status.get("size"), status.get("mtime"),
+                 project_name, normalize_path(project_path))
+            )
+
+    def mark_opened(self, project_name, project_path):
+        """Anota la apertura del proyecto para ordenarlo por uso reciente"""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "UPDATE projects SET last_opened = ? WHERE name = ? AND path = ?",
+                (datetime.datetime.now().timestamp(), project_name, normalize_path(project_path))
+            )
+
+    def remove_project(self, project_name, project_path):
+        """Elimina un proyecto del registro"""
+        with self._lock, self.conn:
+            cursor = self.conn.execute(
+                "DELETE FROM projects WHERE name = ? AND path = ?",
+                (project_name, normalize_path(project_path))
+            )
+        return cursor.rowcount > 0
+
+    # CONSULTAS
+    def _rows(self, query, params=()):
+        with self._lock:
+            return self.conn.execute(query, params).fetchall()
+
+    @staticmethod
+    def _project(row):
+        return {"name": row["name"], "path": row["path"], "language": row["language"]}
+
+    def get_all_projects(self):
+        """Todos los proyectos ordenados por nombre, con el estado de ruta de la última validación"""
+        rows = self._rows("SELECT name, path, language, path_exists, size, mtime, last_opened FROM projects "
+                          "ORDER BY name COLLATE NOCASE, path")
+        projects = []
+        for row in rows:
+            project = self._project(row)
+            exists = row["path_exists"]
+            project["exists"] = None if exists is None else bool(exists)
+            project["size"] = row["size"]
+            project["mtime"] = row["mtime"]
+            project["last_opened"] = row["last_opened"]
+            projects.append(project)
+        return projects
+
+    def get_project(self, project_name, project_path):
+        """Proyecto con sus metadatos completos, o None"""
+        rows = self._rows("SELECT * FROM projects WHERE name = ? AND path = ?",
+                          (project_name, normalize_path(project_path)))
+        if not rows:
+            return None
+        project = self._project(rows[0])
+        project["metadata"] = json.loads(rows[0]["metadata"])
+        return project
+
+    def get_project_path(self, project_name, exact_match=True):
+        """Obtiene la ruta de un proyecto por nombre"""
+        if exact_match:
+            rows = self._rows("SELECT path FROM projects WHERE name = ? LIMIT 1", (project_name,))
+        else:
+            rows = self._rows("SELECT path FROM projects WHERE instr(name, ?) > 0 ORDER BY name LIMIT 1",
+                              (project_name,))
+        return rows[0]["path"] if rows else None
+
+    def get_projects_by_name(self, project_name):
+        """Obtiene todos los proyectos que coinciden con el nombre"""
+        rows = self._rows("SELECT name, path, language FROM projects WHERE name = ?", (project_name,))
+        return [self._project(row) for row in rows]
+
+    def name_exists(self, project_name):
+        return bool(self._rows("SELECT 1 FROM projects WHERE name = ? LIMIT 1", (project_name,)))
+
+    def get_language(self, project_name, project_path, default="Java"):
+        rows = self._rows("SELECT language FROM projects WHERE name = ? AND path = ?",
+                          (project_name, normalize_path(project_path)))
+        return rows[0]["language"] if rows else default
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+# Salidas de compilación y cachés: cientos de miles de ficheros que no son el proyecto
+SKIPPED_DIRS = frozenset({
+    "build", ".gradle", ".git", ".idea", ".dart_tool", ".cxx", ".externalNativeBuild",
+    "node_modules", "__pycache__", ".pub-cache", "bin", "obj",
+})
+
+
+class ValidationCancelled(Exception):
+    pass
+
+
+def directory_size(path, cancelled=None):
+    """Suma el tamaño de los ficheros bajo path sin seguir enlaces simbólicos ni entrar en SKIPPED_DIRS"""
+    total = 0
+    stack = [path]
+    while stack:
+        if cancelled is not None and cancelled():
+            raise ValidationCancelled()
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.name not in SKIPPED_DIRS:
+                                stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            total += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+    return total
+
+
+def inspect_project_path(path, previous=None, cancelled=None):
+    """Estado de la ruta de un proyecto: existe, tamaño en bytes y última modificación
+
+    Si la carpeta conserva el mtime de la validación anterior (previous) se
+    reutiliza su tamaño en vez de recorrerla otra vez.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {"exists": False, "size": None, "mtime": None}
+    if previous and previous.get("mtime") == stat.st_mtime and previous.get("size") is not None:
+        size = previous["size"]
+    else:
+        size = directory_size(path, cancelled)
+    return {"exists": True, "size": size, "mtime": stat.st_mtime}
+
+
+class ProjectValidator(QObject):
+    """Valida en un pool de hilos las rutas de los proyectos y avisa fila a fila
+
+    Una unidad lenta o de red solo ocupa un hilo del pool, nunca la GUI. Cada
+    resultado se guarda en el registro para mostrarlo al instante la próxima
+    vez; los de una carga anterior de la lista se descartan.
+    """
+    validated = Signal(object, object)  # (nombre, ruta), estado
+
+    def __init__(self, registry, max_workers=8, parent=None):
+        super().__init__(parent)
+        self.registry = registry
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="project-validator")
+        self._generation = 0
+
+    def validate(self, projects):
+        self._generation += 1
+        generation = self._generation
+        for project in projects:
+            previous = {"mtime": project.get("mtime"), "size": project.get("size")}
+            self.pool.submit(self._check, generation, project["name"], project["path"], previous)
+
+    def _check(self, generation, name, path, previous=None):
+        if generation != self._generation:
+            return
+        try:
+            # Una recarga o el cierre abandonan el recorrido en curso
+            status = inspect_project_path(path, previous, lambda: generation != self._generation)
+            self.registry.update_status(name, path, status)
+        except ValidationCancelled:
+            return
+        except Exception as e:
+            print(f"Error validando {path}: {e}")
+            return
+        if generation == self._generation:
+            self.validated.emit((name, path), status)
+
+    def shutdown(self):
+        self._generation += 1
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,422 @@
+import io
+import os
+import shutil
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_EXCEPTION, wait
+from pathlib import Path
+from string import Template
+
+from PySide6.QtCore import QThread, Signal
+
+# Archivos .tar/.tar.gz opcionales con plantillas ya preparadas (p. ej. con gradle-wrapper.jar o iconos)
+TEMPLATE_ARCHIVE_DIR = Path(__file__).parent / "templates"
+
+# Plantillas declarativas: directorios + ficheros con rutas y contenido parametrizados (${param})
+GRADLE_WRAPPER_PROPERTIES = '''distributionBase=GRADLE_USER_HOME
+distributionPath=wrapper/dists
+distributionUrl=https\\://services.gradle.org/distributions/gradle-7.5-bin.zip
+zipStoreBase=GRADLE_USER_HOME
+zipStorePath=wrapper/dists
+'''
+
+ANDROID_MANIFEST = '''<?xml version="1.0" encoding="utf-8"?>
+<manifest xmlns:android="http://schemas.android.com/apk/res/android"
+    package="${package}">
+
+    <application
+        android:allowBackup="true"
+        android:icon="@mipmap/ic_launcher"
+        android:label="@string/app_name"
+        android:roundIcon="@mipmap/ic_launcher_round"
+        android:supportsRtl="true"
+        android:theme="@style/AppTheme">
+        <activity
+            android:name=".MainActivity"
+            android:exported="true">
+            <intent-filter>
+                <action android:name="android.intent.action.MAIN" />
+                <category android:name="android.intent.category.LAUNCHER" />
+            </intent-filter>
+        </activity>
+    </application>
+
+</manifest>
+'''
+
+STRINGS_XML = '''<resources>
+    <string name="app_name">${app_name}</string>
+</resources>
+'''
+
+ANDROID_DIRS = [
+    "app/src/main/java/${package_path}",
+    "app/src/main/res/layout",
+    "app/src/main/res/drawable",
+    "app/src/main/res/values",
+    "app/src/main/res/mipmap",
+    "gradle/wrapper",
+]
+
+ANDROID_BUILD_TYPES = '''    buildTypes {
+        release {
+            minifyEnabled false
+            proguardFiles getDefaultProguardFile('proguard-android-optimize.txt'), 'proguard-rules.pro'
+        }
+    }
+    compileOptions {
+        sourceCompatibility JavaVersion.VERSION_1_8
+        targetCompatibility JavaVersion.VERSION_1_8
+    }
+'''
+
+TEMPLATES = {
+    "Java": {
+        "dirs": ANDROID_DIRS,
+        "files": {
+            "app/src/main/java/${package_path}/MainActivity.java": '''package ${package};
+
+import androidx.appcompat.app.AppCompatActivity;
+import android.os.Bundle;
+
+public class MainActivity extends AppCompatActivity {
+    @Override
+    protected void onCreate(Bundle savedInstanceState) {
+        super.onCreate(savedInstanceState);
+        setContentView(R.layout.activity_main);
+    }
+}
+''',
+            "app/src/main/AndroidManifest.xml": ANDROID_MANIFEST,
+            "app/src/main/res/values/strings.xml": STRINGS_XML,
+            "app/build.gradle": '''plugins {
+    id 'com.android.application'
+}
+
+android {
+    compileSdk 33
+
+    defaultConfig {
+        applicationId "${package}"
+        minSdk 21
+        targetSdk 33
+        versionCode 1
+        versionName "1.0"
+    }
+
+''' + ANDROID_BUILD_TYPES + '''}
+
+dependencies {
+    implementation 'androidx.appcompat:appcompat:1.6.1'
+    implementation 'com.google.android.material:material:1.8.0'
+    implementation 'androidx.constraintlayout:constraintlayout:2.1.4'
+}
+''',
+            "gradle/wrapper/gradle-wrapper.properties": GRADLE_WRAPPER_PROPERTIES,
+        },
+    },
+    "Kotlin": {
+        "dirs": ANDROID_DIRS,
+        "files": {
+            "app/src/main/java/${package_path}/MainActivity.kt": '''package ${package}
+
+import android.os.Bundle
+import androidx.appcompat.app.AppCompatActivity
+
+class MainActivity : AppCompatActivity() {
+    override fun onCreate(savedInstanceState: Bundle?) {
+        super.onCreate(savedInstanceState)
+        setContentView(R.layout.activity_main)
+    }
+}
+''',
+            "app/src/main/AndroidManifest.xml": ANDROID_MANIFEST,
+            "app/src/main/res/values/strings.xml": STRINGS_XML,
+            "app/build.gradle": '''plugins {
+    id 'com.android.application'
+    id 'org.jetbrains.kotlin.android'
+}
+
+android {
+    compileSdk 33
+
+    defaultConfig {
+        applicationId "${package}"
+        minSdk 21
+        targetSdk 33
+        versionCode 1
+        versionName "1.0"
+    }
+
+''' + ANDROID_BUILD_TYPES + '''    kotlinOptions {
+        jvmTarget = '1.8'
+    }
+}
+
+dependencies {
+    implementation 'androidx.core:core-ktx:1.10.1'
+    implementation 'androidx.appcompat:appcompat:1.6.1'
+    implementation 'com.google.android.material:material:1.8.0'
+    implementation 'androidx.constraintlayout:constraintlayout:2.1.4'
+}
+''',
+            "gradle/wrapper/gradle-wrapper.properties": GRADLE_WRAPPER_PROPERTIES,
+        },
+    },
+    "Dart (Flutter)": {
+        "dirs": ["lib", "test", "assets"],
+        "files": {
+            "pubspec.yaml": '''name: ${package_name}
+description: ${app_name}
+publish_to: 'none'
+version: 1.0.0+1
+
+environment:
+  sdk: '>=3.0.0 <4.0.0'
+
+dependencies:
+  flutter:
+    sdk: flutter
+
+flutter:
+  uses-material-design: true
+''',
+            "lib/main.dart": '''import 'package:flutter/material.dart';
+
+void main() => runApp(const MyApp());
+
+class MyApp extends StatelessWidget {
+  const MyApp({super.key});
+
+  @override
+  Widget build(BuildContext context) {
+    return const MaterialApp(
+      title: '${app_name}',
+      home: Scaffold(body: Center(child: Text('${app_name}'))),
+    );
+  }
+}
+''',
+        },
+    },
+}
+
+
+class ScaffoldCancelled(Exception):
+    pass
+
+
+def template_params(project_name, package="com.example.myapp"):
+    """Parámetros comunes de las plantillas"""
+    package_name = "".join(c if c.isalnum() else "_" for c in project_name.lower()).strip("_") or "app"
+    return {
+        "app_name": project_name,
+        "package": package,
+        "package_path": package.replace(".", "/"),
+        "package_name": package_name,
+    }
+
+
+def render_template(template, params):
+    """Directorios y ficheros (ruta relativa, bytes) ya renderizados"""
+    dirs = [Template(path).safe_substitute(params) for path in template.get("dirs", [])]
+    files = [
+        (Template(path).safe_substitute(params), Template(content).safe_substitute(params).encode("utf-8"))
+        for path, content in template.get("files", {}).items()
+    ]
+    return dirs, files
+
+
+def write_atomic(path, data):
+    """Escribe a un temporal y lo renombra: nunca queda un fichero a medias"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _staging_dir(project_dir):
+    project_dir = Path(project_dir)
+    return project_dir.parent / f".{project_dir.name}.scaffold"
+
+
+def _publish(staging, project_dir):
+    """Mueve el directorio preparado a su sitio en un solo rename"""
+    project_dir = Path(project_dir)
+    if project_dir.exists():
+        if any(project_dir.iterdir()):
+            raise FileExistsError(f"El directorio del proyecto no está vacío: {project_dir}")
+        project_dir.rmdir()
+    os.replace(staging, project_dir)
+
+
+def _check_cancel(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise ScaffoldCancelled()
+
+
+def scaffold_project(project_dir, template, params, progress=None, cancel_event=None, max_workers=8):
+    """Genera el proyecto desde una plantilla escribiendo los ficheros en paralelo
+
+    Todo se escribe en un directorio temporal junto al destino y se publica
+    con un rename al final; si se cancela o falla, el destino no se toca.
+    progress(hechos, total, ruta) se llama desde los hilos del pool.
+    """
+    dirs, files = render_template(template, params)
+    staging = _staging_dir(project_dir)
+    shutil.rmtree(staging, ignore_errors=True)
+    total = len(files)
+    done = 0
+    lock = threading.Lock()
+
+    def write(relative, data):
+        nonlocal done
+        _check_cancel(cancel_event)
+        write_atomic(staging / relative, data)
+        with lock:
+            done += 1
+            count = done
+        if progress is not None:
+            progress(count, total, relative)
+
+    try:
+        staging.mkdir(parents=True)
+        for directory in set(dirs) | {os.path.dirname(relative) for relative, _ in files}:
+            if directory:
+                (staging / directory).mkdir(parents=True, exist_ok=True)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(write, relative, data) for relative, data in files]
+            finished, _ = wait(futures, return_when=FIRST_EXCEPTION)
+            for future in finished:
+                if future.exception() is not None:
+                    for pending in futures:
+                        pending.cancel()
+                    raise future.exception()
+
+        _check_cancel(cancel_event)
+        _publish(staging, project_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return project_dir
+
+
+def find_template_archive(language):
+    """Archivo de plantilla preparado para el lenguaje, si existe"""
+    safe_name = "".join(c for c in language.lower() if c.isalnum())
+    for suffix in (".tar.gz", ".tgz", ".tar"):
+        path = TEMPLATE_ARCHIVE_DIR / f"{safe_name}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+def extract_template_archive(archive_path, project_dir, params, progress=None, cancel_event=None):
+    """Extrae un archivo de plantilla en una sola pasada secuencial (modo stream de tarfile)
+
+    Rutas y ficheros de texto se renderizan con los parámetros al vuelo; el
+    resto (jar, png...) se copia tal cual. Se publica con el mismo rename atómico.
+    """
+    staging = _staging_dir(project_dir)
+    shutil.rmtree(staging, ignore_errors=True)
+    text_suffixes = {".java", ".kt", ".xml", ".gradle", ".properties", ".dart", ".yaml", ".md", ".txt", ".pro"}
+    try:
+        staging.mkdir(parents=True)
+        root = staging.resolve()
+        count = 0
+        with tarfile.open(archive_path, mode="r|*") as archive:
+            for member in archive:
+                _check_cancel(cancel_event)
+                relative = Template(member.name).safe_substitute(params)
+                target = (staging / relative).resolve()
+                if root not in target.parents and target != root:
+                    raise ValueError(f"Ruta fuera del proyecto en la plantilla: {member.name}")
+                if member.isdir():
+                    target.mkdir(parents=True, exist_ok=True)
+                    continue
+                if not member.isfile():
+                    continue
+                data = archive.extractfile(member).read()
+                if target.suffix in text_suffixes:
+                    data = Template(data.decode("utf-8")).safe_substitute(params).encode("utf-8")
+                target.parent.mkdir(parents=True, exist_ok=True)
+                write_atomic(target, data)
+                count += 1
+                if progress is not None:
+                    progress(count, 0, relative)
+        _check_cancel(cancel_event)
+        _publish(staging, project_dir)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    return project_dir
+
+
+def build_template_archive(language, archive_path=None, extra_files=None):
+    """Empaqueta una plantilla declarativa (sin renderizar) como archivo .tar.gz
+
+    extra_files {ruta relativa: ruta en disco} permite añadir binarios como
+    gradle-wrapper.jar o iconos, que no caben en la plantilla de texto.
+    """
+    template = TEMPLATES[language]
+    if archive_path is None:
+        TEMPLATE_ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+        safe_name = "".join(c for c in language.lower() if c.isalnum())
+        archive_path = TEMPLATE_ARCHIVE_DIR / f"{safe_name}.tar.gz"
+    with tarfile.open(archive_path, mode="w:gz") as archive:
+        for directory in template.get("dirs", []):
+            info = tarfile.TarInfo(directory)
+            info.type = tarfile.DIRTYPE
+            info.mode = 0o755
+            archive.addfile(info)
+        for relative, content in template.get("files", {}).items():
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(relative)
+            info.size = len(data)
+            info.mode = 0o644
+            archive.addfile(info, io.BytesIO(data))
+        for relative, source in (extra_files or {}).items():
+            archive.add(source, arcname=relative)
+    return archive_path
+
+
+class ScaffoldThread(QThread):
+    """Hilo que crea la estructura del proyecto (plantilla o archivo) sin bloquear la GUI"""
+    progress_updated = Signal(int, str)
+    # No se llama finished: esa señal de QThread indica que el hilo ya terminó de verdad
+    done = Signal(bool, str)
+
+    def __init__(self, project_dir, language, params):
+        super().__init__()
+        self.project_dir = project_dir
+        self.language = language
+        self.params = params
+        self._cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            archive = find_template_archive(self.language)
+            if archive is not None:
+                extract_template_archive(archive, self.project_dir, self.params,
+                                         self._report, self._cancel_event)
+            else:
+                template = TEMPLATES.get(self.language)
+                if template is None:
+                    raise ValueError(f"No hay plantilla para {self.language}")
+                scaffold_project(self.project_dir, template, self.params,
+                                 self._report, self._cancel_event)
+            self.done.emit(True, f"Estructura de {self.language} creada")
+        except ScaffoldCancelled:
+            self.done.emit(False, "Creación cancelada")
+        except Exception as e:
+            print(f"❌ Error creando estructura: {e}")
+            self.done.emit(False, str(e))
+
+    def _report(self, done, total, relative):
+        percent = int(done * 100 / total) if total else 0
+        self.progress_updated.emit(percent, f"Creando {relative}")
+
+    def cancel(self):
+        """Cancela la creación; no queda nada a medias en el destino"""
+        self._cancel_event.set()
@@ -0,0 +1,398 @@
+import hashlib
+import os
+import shutil
+import stat
+import struct
+import tarfile
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from ui.downloader import Downloader, DownloadCancelled, url_suffix
+
+READ_SIZE = 256 * 1024
+# Ficheros más grandes se escriben por partes desde el hilo que descomprime, sin pasar por memoria
+INLINE_LIMIT = 4 * 1024 * 1024
+MAX_PENDING_WRITES = 64
+
+LOCAL_HEADER = 0x04034b50
+CENTRAL_HEADER = 0x02014b50
+END_OF_CENTRAL = 0x06054b50
+ZIP64_END = 0x06064b50
+DATA_DESCRIPTOR = 0x08074b50
+
+
+class ExtractError(Exception):
+    pass
+
+
+class StreamingUnsupported(ExtractError):
+    pass
+
+
+def archive_kind(url):
+    """'zip', 'tar' o None según la extensión de la URL"""
+    suffix = url_suffix(url).lower()
+    if suffix == ".zip":
+        return "zip"
+    if suffix.startswith(".tar") or suffix in (".tgz", ".txz"):
+        return "tar"
+    return None
+
+
+class _Stream:
+    """Lector con retroceso sobre un fichero que puede devolver lecturas cortas"""
+
+    def __init__(self, fileobj):
+        self.fileobj = fileobj
+        self._buffer = b""
+
+    def read(self, size):
+        if self._buffer:
+            data, self._buffer = self._buffer[:size], self._buffer[size:]
+            return data
+        return self.fileobj.read(size)
+
+    def read_exact(self, size):
+        parts = []
+        while size:
+            data = self.read(size)
+            if not data:
+                raise ExtractError("Archivo truncado")
+            parts.append(data)
+            size -= len(data)
+        return b"".join(parts)
+
+    def unread(self, data):
+        self._buffer = data + self._buffer
+
+
+class StreamingExtractor:
+    """Extrae zip/tar en una sola pasada secuencial sobre un flujo (p. ej. una descarga en curso)
+
+    El hilo que lee descomprime y verifica (CRC-32 de cada entrada zip y, si
+    se da un manifest {ruta: sha256}, el hash de cada fichero); la escritura
+    de los ficheros pequeños se reparte en un pool de hilos. Cada fichero se
+    escribe a un temporal y se renombra.
+    """
+
+    def __init__(self, dest, manifest=None, workers=8, cancelled=None, progress=None):
+        self.dest = Path(dest)
+        self.root = self.dest.resolve()
+        self.manifest = manifest or {}
+        self.cancelled = cancelled or (lambda: False)
+        self.progress = progress
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="extract-write")
+        self._slots = threading.BoundedSemaphore(MAX_PENDING_WRITES)
+        self._futures = []
+        self._modes = {}
+        # Enlaces simbólicos por crear al final: nombre -> destino (None: texto del fichero zip)
+        self._links = {}
+        self._hardlinks = []
+        self._real_dirs = set()
+        self.files = 0
+
+    def _check_cancel(self):
+        if self.cancelled():
+            raise DownloadCancelled("Instalación cancelada")
+
+    def _target(self, name):
+        """Ruta de destino de una entrada; rechaza rutas fuera de dest
+
+        Se comprueba la ruta escrita y la carpeta real que la contiene, para
+        que un enlace ya presente en dest no lleve la escritura fuera.
+        """
+        target = Path(os.path.normpath(self.root / name))
+        if not self._inside(target):
+            raise ExtractError(f"Ruta fuera del destino en el archivo: {name}")
+        self._check_real(target if target == self.root else target.parent, name)
+        return target
+
+    def _inside(self, path):
+        return path == self.root or self.root in path.parents
+
+    def _check_real(self, path, name):
+        """Rechaza path si al seguir sus enlaces acaba fuera de dest"""
+        key = str(path)
+        if key in self._real_dirs:
+            return
+        if not self._inside(Path(os.path.realpath(path))):
+            raise ExtractError(f"Ruta fuera del destino en el archivo: {name}")
+        self._real_dirs.add(key)
+
+    # ESCRITURA
+    def _verify(self, name, sha256):
+        expected = self.manifest.get(name)
+        if expected and expected.lower() != sha256:
+            raise ExtractError(f"Hash incorrecto en {name}")
+
+    def _write_small(self, name, target, data, mode):
+        try:
+            if self.manifest:
+                self._verify(name, hashlib.sha256(data).hexdigest())
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = target.with_name(target.name + ".part")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+            if mode:
+                os.chmod(target, mode)
+        finally:
+            self._slots.release()
+
+    def _submit(self, name, target, data, mode=None):
+        self._raise_failed_writes()
+        self._slots.acquire()
+        self._futures.append(self.pool.submit(self._write_small, name, target, data, mode))
+        self._file_done(name)
+
+    def _raise_failed_writes(self):
+        pending = []
+        for future in self._futures:
+            if future.done():
+                future.result()
+            else:
+                pending.append(future)
+        self._futures = pending
+
+    def _file_done(self, name):
+        self.files += 1
+        if self.progress is not None:
+            self.progress(self.files, name)
+
+    def _write_chunks(self, name, target, chunks, mode=None):
+        """Escribe una entrada grande según se descomprime; devuelve los bytes escritos"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + ".part")
+        hasher = hashlib.sha256() if self.manifest else None
+        size = 0
+        with open(tmp_path, "wb") as f:
+            for data in chunks:
+                self._check_cancel()
+                f.write(data)
+                size += len(data)
+                if hasher is not None:
+                    hasher.update(data)
+        if hasher is not None:
+            self._verify(name, hasher.hexdigest())
+        os.replace(tmp_path, target)
+        if mode:
+            os.chmod(target, mode)
+        self._file_done(name)
+        return size
+
+    def finish(self):
+        """Espera a las escrituras pendientes y aplica permisos y enlaces"""
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+        for name, mode in self._modes.items():
+            target = self._target(name)
+            if target.is_file():
+                os.chmod(target, mode)
+        for source, target in self._hardlinks:
+            self._check_real(source, source.name)
+            shutil.copy2(source, target)
+        # Los enlaces se crean los últimos y de uno en uno: cada uno se comprueba
+        # siguiendo los anteriores, así una cadena (x/y -> .., x/y/w -> ..) no escapa
+        for name, link in self._links.items():
+            target = self._target(name)
+            if link is None:
+                link = target.read_text(encoding="utf-8")
+            self._target(os.path.join(os.path.dirname(name), link))
+            target.parent.mkdir(parents=True, exist_ok=True)
+            if target.is_dir() and not target.is_symlink():
+                raise ExtractError(f"Enlace sobre una carpeta extraída en el archivo: {name}")
+            if target.is_symlink() or target.exists():
+                target.unlink()
+            os.symlink(link, target)
+            self._real_dirs.clear()
+            if not self._inside(Path(os.path.realpath(target))):
+                target.unlink()
+                raise ExtractError(f"Enlace fuera del destino en el archivo: {name}")
+
+    # TAR
+    def extract_tar(self, fileobj):
+        with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+            for member in archive:
+                self._check_cancel()
+                target = self._target(member.name)
+                if member.isdir():
+                    target.mkdir(parents=True, exist_ok=True)
+                elif member.issym():
+                    # Se crea al final, como en zip: ningún fichero se escribe a través de él
+                    self._target(os.path.join(os.path.dirname(member.name), member.linkname))
+                    self._links.pop(member.name, None)
+                    self._links[member.name] = member.linkname
+                elif member.isfile():
+                    mode = member.mode & 0o777 if os.name != "nt" else None
+                    source = archive.extractfile(member)
+                    if member.size <= INLINE_LIMIT:
+                        self._submit(member.name, target, source.read(member.size), mode)
+                    else:
+                        self._write_chunks(member.name, target, iter(lambda: source.read(READ_SIZE), b""), mode)
+                elif member.islnk():
+                    # Se copia al final, cuando el original ya está escrito
+                    self._hardlinks.append((self._target(member.linkname), target))
+        self.finish()
+
+    # ZIP
+    def extract_zip(self, fileobj):
+        stream = _Stream(fileobj)
+        while True:
+            self._check_cancel()
+            signature, = struct.unpack("<I", stream.read_exact(4))
+            if signature == LOCAL_HEADER:
+                self._zip_entry(stream)
+            elif signature == CENTRAL_HEADER:
+                self._zip_central_entry(stream)
+            elif signature in (END_OF_CENTRAL, ZIP64_END):
+                break
+            else:
+                raise ExtractError(f"Cabecera zip desconocida: {signature:#x}")
+        self.finish()
+
+    def _zip_entry(self, stream):
+        (_, flags, method, _, _, crc, compressed, size,
+         name_length, extra_length) = struct.unpack("<HHHHHIIIHH", stream.read_exact(26))
+        name = stream.read_exact(name_length).decode("utf-8" if flags & 0x800 else "cp437")
+        extra = stream.read_exact(extra_length)
+        zip64 = False
+        position = 0
+        while position + 4 <= len(extra):
+            header_id, length = struct.unpack_from("<HH", extra, position)
+            if header_id == 0x0001:
+                zip64 = True
+                values = list(struct.unpack_from(f"<{length // 8}Q", extra, position + 4))
+                if size == 0xFFFFFFFF and values:
+                    size = values.pop(0)
+                if compressed == 0xFFFFFFFF and values:
+                    compressed = values.pop(0)
+            position += 4 + length
+
+        descriptor = bool(flags & 0x08)
+        if method not in (0, 8):
+            raise ExtractError(f"Método de compresión no soportado en {name}: {method}")
+        if descriptor and method == 0:
+            raise StreamingUnsupported(f"Entrada sin tamaño conocido en {name}: no se puede extraer en streaming")
+
+        target = None if name.endswith("/") else self._target(name)
+        checksum = 0
+
+        def entry_data():
+            nonlocal checksum
+            if method == 0:
+                remaining = compressed
+                while remaining:
+                    data = stream.read(min(READ_SIZE, remaining))
+                    if not data:
+                        raise ExtractError("Archivo truncado")
+                    remaining -= len(data)
+                    checksum = zlib.crc32(data, checksum)
+                    yield data
+                return
+            decompressor = zlib.decompressobj(-15)
+            while not decompressor.eof:
+                data = stream.read(READ_SIZE)
+                if not data:
+                    raise ExtractError("Archivo truncado")
+                output = decompressor.decompress(data)
+                if output:
+                    checksum = zlib.crc32(output, checksum)
+                    yield output
+            stream.unread(decompressor.unused_data)
+
+        if target is None:
+            self._target(name.rstrip("/")).mkdir(parents=True, exist_ok=True)
+            for _ in entry_data():
+                pass
+        elif not descriptor and size <= INLINE_LIMIT:
+            data = b"".join(entry_data())
+            self._submit(name, target, data)
+        else:
+            self._write_chunks(name, target, entry_data())
+
+        if descriptor:
+            signature = stream.read_exact(4)
+            if struct.unpack("<I", signature)[0] != DATA_DESCRIPTOR:
+                stream.unread(signature)
+            crc, = struct.unpack("<I", stream.read_exact(4))
+            stream.read_exact(16 if zip64 else 8)
+        if checksum != crc:
+            raise ExtractError(f"CRC incorrecto en {name}")
+
+    def _zip_central_entry(self, stream):
+        """Del directorio central solo interesan los permisos Unix y los enlaces simbólicos"""
+        header = struct.unpack("<HHHHHHIIIHHHHHII", stream.read_exact(42))
+        made_by, flags = header[0], header[2]
+        name_length, extra_length, comment_length = header[9], header[10], header[11]
+        external = header[14]
+        name = stream.read_exact(name_length).decode("utf-8" if flags & 0x800 else "cp437")
+        stream.read_exact(extra_length + comment_length)
+        if made_by >> 8 == 3 and os.name != "nt":
+            mode = external >> 16
+            if stat.S_ISLNK(mode):
+                self._links[name] = None
+            elif stat.S_ISREG(mode) and mode & 0o111:
+                self._modes[name] = stat.S_IMODE(mode)
+
+    def extract(self, fileobj, kind):
+        try:
+            if kind == "zip":
+                self.extract_zip(fileobj)
+            elif kind == "tar":
+                self.extract_tar(fileobj)
+            else:
+                raise ExtractError(f"Formato de archivo no soportado: {kind}")
+        except BaseException:
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            raise
+
+
+def install_archive(urls, dest, progress=None, cancelled=None, sha256=None, manifest=None,
+                    min_size=0, workers=8):
+    """Descarga un SDK y lo extrae en dest a la vez que llega (en una sola pasada)
+
+    progress(bytes, total, ficheros) informa de la descarga y de los ficheros
+    ya extraídos. Si la descarga se corta, el .part queda para reanudar; si el
+    zip no se puede leer en streaming, se extrae al terminar la descarga.
+    """
+    urls = [urls] if isinstance(urls, str) else list(urls)
+    kind = archive_kind(urls[0])
+    state = {"bytes": 0, "total": None, "files": 0}
+
+    def report():
+        if progress is not None:
+            progress(state["bytes"], state["total"], state["files"])
+
+    def download_progress(done, total):
+        state["bytes"], state["total"] = done, total
+        report()
+
+    def extract_progress(files, name):
+        state["files"] = files
+        report()
+
+    downloader = Downloader(urls, sha256=sha256, min_size=min_size, progress=download_progress,
+                            cancelled=cancelled)
+    fallback = {}
+
+    def consume(fileobj):
+        os.makedirs(dest, exist_ok=True)
+        extractor = StreamingExtractor(dest, manifest, workers, cancelled, extract_progress)
+        try:
+            extractor.extract(fileobj, kind)
+        except StreamingUnsupported as e:
+            # Zip sin tamaños en las cabeceras locales: se extrae del fichero completo
+            print(f"⚠️ {e}")
+            fallback["needed"] = True
+
+    path = downloader.download(consume)
+    if fallback:
+        with zipfile.ZipFile(path) as archive:
+            archive.extractall(dest)
+    return dest
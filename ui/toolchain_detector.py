@@ -0,0 +1,200 @@
+import hashlib
+import json
+import os
+import platform
+import re
+import shutil
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal
+
+CACHE_FILE = Path.home() / ".myapp_projects" / "toolchains.json"
+
+# Lenguaje -> comandos candidatos (se usa el primero que responde), timeout en segundos
+# y salida donde buscar la versión (stdout si no se indica; la otra solo si esa va vacía)
+PROBES = {
+    "Java": {
+        "commands": [["java", "-version"], ["java", "--version"]],
+        "timeout": 5,
+        "stream": "stderr",
+    },
+    "Kotlin": {"commands": [["kotlin", "-version"]], "timeout": 5},
+    "Dart/Flutter": {"commands": [["flutter", "--version"]], "timeout": 10},
+    "Python": {"commands": [["python3", "--version"], ["python", "--version"]], "timeout": 5},
+    "C++": {"commands": [["g++", "--version"]], "timeout": 5},
+    "C#": {"commands": [["dotnet", "--version"]], "timeout": 5},
+}
+
+NOT_INSTALLED = "No instalado"
+
+
+def extract_version(version_output):
+    """Extrae la versión del output"""
+    match = re.search(r'(\d+\.\d+\.\d+|\d+\.\d+)', version_output or "")
+    if match:
+        return match.group(1)
+    lines = (version_output or "").split('\n')
+    if lines and lines[0].strip():
+        return lines[0].strip()[:30]
+    return "Versión"
+
+
+def _commands(language):
+    """Comandos candidatos; para Java también el de JAVA_HOME (leído en cada llamada)"""
+    commands = list(PROBES[language]["commands"])
+    java_home = os.environ.get("JAVA_HOME")
+    if language == "Java" and java_home:
+        commands.append([os.path.join(java_home, "bin", "java"), "-version"])
+    return commands
+
+
+def _resolve(command):
+    """Ruta real del ejecutable (o None) sin lanzarlo"""
+    return shutil.which(command[0])
+
+
+def fingerprint(language):
+    """Clave de caché: sonda, PATH, JAVA_HOME y ruta + mtime de cada binario candidato
+
+    Solo hace stat de ficheros: es barato y cambia en cuanto se instala,
+    actualiza o desinstala la herramienta (o cambia la definición de la sonda).
+    """
+    binaries = []
+    for command in _commands(language):
+        path = _resolve(command)
+        try:
+            mtime = os.stat(path).st_mtime if path else None
+        except OSError:
+            mtime = None
+        binaries.append([command[0], path, mtime])
+    data = json.dumps([PROBES[language], os.environ.get("PATH", ""), os.environ.get("JAVA_HOME", ""), binaries])
+    return hashlib.sha1(data.encode("utf-8")).hexdigest()
+
+
+def probe_language(language):
+    """Ejecuta las sondas de un lenguaje: {"installed", "version", "output"}"""
+    probe = PROBES[language]
+    use_shell = platform.system() == "Windows"
+    for command in _commands(language):
+        path = _resolve(command)
+        if path is None:
+            continue
+        try:
+            result = subprocess.run(
+                [path] + command[1:],
+                capture_output=True,
+                text=True,
+                timeout=probe["timeout"],
+                shell=use_shell
+            )
+        except (OSError, subprocess.SubprocessError):
+            continue
+        if result.returncode == 0:
+            # java -version escribe en stderr; el resto en stdout y stderr solo trae avisos
+            if probe.get("stream", "stdout") == "stderr":
+                output = result.stderr or result.stdout
+            else:
+                output = result.stdout or result.stderr
+            return {"installed": True, "version": extract_version(output), "output": output}
+    return {"installed": False, "version": NOT_INSTALLED, "output": ""}
+
+
+class ToolchainDetector(QObject):
+    """Detección de lenguajes instalados: sondas en paralelo con caché en disco
+
+    cached() devuelve al instante los resultados cuya clave (PATH, JAVA_HOME,
+    binarios y sus mtimes) sigue siendo válida; refresh() vuelve a lanzar todas
+    las sondas en un pool y emite results_ready al terminar.
+    """
+    results_ready = Signal(object)  # {lenguaje: resultado}
+
+    def __init__(self, cache_file=CACHE_FILE, parent=None):
+        super().__init__(parent)
+        self.cache_file = Path(cache_file)
+        self.pool = ThreadPoolExecutor(max_workers=len(PROBES), thread_name_prefix="toolchain-probe")
+        self._lock = threading.Lock()
+        self._cache = self._load()
+        self._refreshing = None
+
+    def _load(self):
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self):
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_file.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._cache, f, indent=2)
+        os.replace(tmp_path, self.cache_file)
+
+    def cached(self, languages=None):
+        """Resultados en caché aún válidos, sin lanzar ningún proceso"""
+        results = {}
+        with self._lock:
+            cache = dict(self._cache)
+        for language in languages or PROBES:
+            entry = cache.get(language)
+            if entry and entry.get("key") == fingerprint(language):
+                results[language] = entry
+        return results
+
+    def _probe(self, language):
+        key = fingerprint(language)
+        result = probe_language(language)
+        result["key"] = key
+        result["checked_at"] = time.time()
+        with self._lock:
+            self._cache[language] = result
+        return language, result
+
+    def _probe_all(self, languages):
+        futures = [self.pool.submit(self._probe, language) for language in languages]
+        wait(futures)
+        results = dict(future.result() for future in futures)
+        with self._lock:
+            try:
+                self._save()
+            except OSError as e:
+                print(f"⚠️ No se pudo guardar la caché de lenguajes: {e}")
+        return results
+
+    def detect(self, languages=None, use_cache=True):
+        """Resultados (bloqueante): la caché válida si existe y las sondas que falten, en paralelo"""
+        languages = list(languages or PROBES)
+        results = self.cached(languages) if use_cache else {}
+        missing = [language for language in languages if language not in results]
+        if missing:
+            results.update(self._probe_all(missing))
+        return results
+
+    def refresh(self, languages=None):
+        """Revalida en segundo plano; results_ready llega con todos los resultados"""
+        if self._refreshing is not None and self._refreshing.is_alive():
+            return
+        languages = list(languages or PROBES)
+
+        def run():
+            try:
+                self.results_ready.emit(self._probe_all(languages))
+            except Exception as e:
+                print(f"❌ Error detectando lenguajes: {e}")
+        self._refreshing = threading.Thread(target=run, daemon=True, name="toolchain-refresh")
+        self._refreshing.start()
+
+
+_detector = None
+
+
+def toolchain_detector():
+    """Detector compartido (se crea la primera vez que se pide)"""
+    global _detector
+    if _detector is None:
+        _detector = ToolchainDetector()
+    return _detector